@@ -1,34 +1,223 @@
+import abc
+import asyncio
 import json
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from chats.presence import get_presence, typing_interval
+from users.profile_cache import sender_profiles
+
+MAX_CLIENT_KEY_LENGTH = 64
+
+
+async def get_sender_profile(sender):
+    """Sender profile from the process-wide cache, loading it on a miss."""
+    profile = sender_profiles.get(sender)
+    if profile is None:
+        profiles = await sync_to_async(sender_profiles.load)([sender])
+        profile = profiles.get(int(sender))
+    return profile
+
+
+def _scope_user_id(scope):
+    """Id of the session user AuthMiddlewareStack put in scope, or None."""
+    user = scope.get("user")
+    return user.id if user is not None and user.is_authenticated else None
+
+
+def _parse_send(data: dict) -> tuple:
+    """Validate a send frame and return its (content, client_key)."""
+    content = data.get("message")
+    client_key = data.get("client_key")
+    if not isinstance(content, str) or not content.strip():
+        raise ValidationError("Message content is required.")
+    if client_key is not None and (
+        not isinstance(client_key, str)
+        or not 0 < len(client_key) <= MAX_CLIENT_KEY_LENGTH
+    ):
+        raise ValidationError(
+            f"client_key must be a string of 1 to {MAX_CLIENT_KEY_LENGTH} characters."
+        )
+    return content, client_key
+
+
+async def _presence(method: str, *args):
+    # Presence I/O goes to Redis on a worker thread, never to the database
+    return await sync_to_async(getattr(get_presence(), method), thread_sensitive=False)(
+        *args
+    )
+
+
+class TypingConsumerMixin:
+    """
+    A frame with "action": "typing" tells the room the user is typing, at
+    most once per PRESENCE["TYPING_INTERVAL"] seconds per user and room.
+    """
+
+    async def broadcast_typing(self) -> None:
+        key = f"typing:{self.room_group_name}:{self.user_id}"
+        if not await _presence("throttle", key, typing_interval()):
+            return
+        profile = sender_profiles.get(self.user_id) or {}
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                "type": "typing_event",
+                "sender_id": self.user_id,
+                "full_name": profile.get("full_name", ""),
+            },
+        )
+
+    async def typing_event(self, event):
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "typing",
+                    "sender_id": event["sender_id"],
+                    "full_name": event["full_name"],
+                }
+            )
+        )
+
+
+class PersistingConsumerMixin(abc.ABC):
+    """
+    Websocket-native send path: a frame with "action": "send" is validated,
+    saved by persist(), acked to the sender with the stored id and broadcast
+    to the room once. A retry with the same "client_key" is acked again
+    with the original id and not broadcast twice. Frames without an action
+    keep the broadcast-only behaviour, for messages saved over REST.
+    """
+
+    broadcast_type = None
+
+    @abc.abstractmethod
+    def persist(self, content: str, client_key):
+        """Save the message; returns (message, created). Runs in a thread."""
+
+    async def persist_async(self, content: str, client_key):
+        return await database_sync_to_async(self.persist)(content, client_key)
+
+    async def send_and_broadcast(self, data: dict) -> None:
+        client_key = data.get("client_key")
+        try:
+            content, client_key = _parse_send(data)
+            message, created = await self.persist_async(content, client_key)
+        except ValidationError as error:
+            await self.send_json_frame(
+                {"type": "error", "client_key": client_key, "error": error.messages[0]}
+            )
+            return
+
+        timestamp = str(message.sent_at)
+        await self.send_json_frame(
+            {
+                "type": "ack",
+                "client_key": client_key,
+                "id": message.id,
+                "timestamp": timestamp,
+                "duplicate": not created,
+            }
+        )
+        if not created:
+            return
+
+        profile = await get_sender_profile(self.user_id)
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                "type": self.broadcast_type,
+                "id": message.id,
+                "message": message.content,
+                "sender_id": self.user_id,
+                **profile,
+                "timestamp": timestamp,
+            },
+        )
+
+    async def send_json_frame(self, payload: dict) -> None:
+        await self.send(text_data=json.dumps(payload))
+
+
+class ChatConsumer(
+    TypingConsumerMixin, PersistingConsumerMixin, AsyncWebsocketConsumer
+):
+    broadcast_type = "chat_message"
 
-class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         print("🟥 ChatConsumer connected")
         self.chat_id = self.scope["url_route"]["kwargs"]["chat_id"]
         self.room_group_name = f"chat_{self.chat_id}"
 
+        # Identity and membership are settled here, once per connection
+        self.user_id = await sync_to_async(self._authorize)()
+        if self.user_id is None:
+            await self.close()
+            return
+
         # Join chat group
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
 
         await self.accept()
 
+    def _authorize(self):
+        """
+        Return the session user's id if they take part in this chat, warming
+        the profiles of every participant on the way; None otherwise.
+        """
+        from chats.daos import ChatDao
+
+        user_id = _scope_user_id(self.scope)
+        if user_id is None or not self.chat_id.isdigit():
+            return None
+        participant_ids = ChatDao.get_participant_ids(int(self.chat_id))
+        if user_id not in participant_ids:
+            return None
+        sender_profiles.load(participant_ids)
+        return user_id
+
+    def persist(self, content: str, client_key):
+        from chats.daos import ChatDao
+        from chats.services import MessageServices
+        from chats.types import CreateMessageData
+
+        message, created = MessageServices.create_message_once(
+            CreateMessageData(
+                user_id=self.user_id,
+                chat_id=int(self.chat_id),
+                content=content,
+                sent_at=timezone.now(),
+                client_key=client_key,
+            )
+        )
+        if created:
+            # Unhide chat for all participants so the recipient sees it
+            ChatDao.unhide_chat(message.chat_id)
+        return message, created
+
     async def disconnect(self, close_code):
         # Leave chat group
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
-    # Receive message from WebSocket (broadcast only — saved via REST API)
+    # Receive message from WebSocket; broadcast only unless it asks to be saved
     async def receive(self, text_data):
-        from users.models import User
-
         data = json.loads(text_data)
+        if data.get("action") == "send":
+            await self.send_and_broadcast(data)
+            return
+        if data.get("action") == "typing":
+            await self.broadcast_typing()
+            return
+
         message = data["message"]
-        sender = data["sender"]
         message_id = data.get("id")
 
-        user = await sync_to_async(User.objects.get)(id=sender)
+        profile = await get_sender_profile(self.user_id)
+        if profile is None:
+            return
 
         # Broadcast to chat group
         await self.channel_layer.group_send(
@@ -37,12 +226,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 "type": "chat_message",
                 "id": message_id,
                 "message": message,
-                "sender_id": sender,
-                "full_name": user.full_name,
-                "organization": user.primary_organization,
-                "profile_image": (
-                    user.profile_image.url if user.profile_image else None
-                ),
+                "sender_id": self.user_id,
+                **profile,
                 "timestamp": str(timezone.now()),
             },
         )
@@ -75,11 +260,29 @@ class UserConsumer(AsyncWebsocketConsumer):
         self.user_id = self.scope["url_route"]["kwargs"]["user_id"]
         self.group_name = f"user_{self.user_id}"
 
+        # Only the session user may listen to their own DMs and notifications
+        self.online = False
+        if str(_scope_user_id(self.scope)) != self.user_id:
+            await self.close()
+            return
+
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
 
+        # The user socket doubles as the presence heartbeat
+        await _presence("heartbeat", int(self.user_id), self.channel_name)
+        self.online = True
+
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if self.online:
+            await _presence("disconnect", int(self.user_id), self.channel_name)
+
+    # Clients send {"type": "heartbeat"} well within PRESENCE["TTL"] seconds
+    async def receive(self, text_data):
+        data = json.loads(text_data)
+        if self.online and data.get("type") == "heartbeat":
+            await _presence("heartbeat", int(self.user_id), self.channel_name)
 
     async def user_message(self, event):
         await self.send(
@@ -91,6 +294,7 @@ class UserConsumer(AsyncWebsocketConsumer):
                     "sender": event["sender"],
                     "full_name": event.get("full_name", ""),
                     "profile_image": event.get("profile_image"),
+                    "unread_count": event.get("unread_count"),
                 }
             )
         )
@@ -106,40 +310,87 @@ class UserConsumer(AsyncWebsocketConsumer):
         )
 
 
-class GroupConsumer(AsyncWebsocketConsumer):
+class GroupConsumer(
+    TypingConsumerMixin, PersistingConsumerMixin, AsyncWebsocketConsumer
+):
+    broadcast_type = "group_message"
+
     async def connect(self):
         group_info = self.scope["url_route"]["kwargs"]["group_name"]
         print("🟩 GroupConsumer connected for group:", group_info)
         self.group_name = self.scope["url_route"]["kwargs"]["group_name"]
         self.room_group_name = f"group_{self.group_name}"
 
+        # Groups are open to every signed-in user
+        self.user_id = _scope_user_id(self.scope)
+        if self.user_id is None:
+            await self.close()
+            return
+
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
+        await sync_to_async(sender_profiles.load)([self.user_id])
+
+    def persist(self, content: str, client_key):
+        from chats.services import GroupMessageServices
+
+        return GroupMessageServices.create_group_message_once(
+            self._message_data(content, client_key)
+        )
+
+    async def persist_async(self, content: str, client_key):
+        from chats.group_writer import get_writer
+
+        writer = get_writer()
+        if writer is None:
+            return await super().persist_async(content, client_key)
+        # Wait for the batch to commit without holding a thread; the shield
+        # keeps a timeout from cancelling a message the batch may still save
+        future = writer.submit(self._message_data(content, client_key), timeout=0)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), writer.result_timeout
+            )
+        except asyncio.TimeoutError:
+            raise ValidationError("Group message was not saved in time.")
+
+    def _message_data(self, content: str, client_key):
+        from chats.types import CreateGroupMessageData
+
+        return CreateGroupMessageData(
+            user_id=self.user_id,
+            group_name=self.group_name,
+            content=content,
+            client_key=client_key,
+        )
+
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
-    # Receive message from WebSocket (broadcast only — saved via REST API)
+    # Receive message from WebSocket; broadcast only unless it asks to be saved
     async def receive(self, text_data):
-        from users.models import User
-
         data = json.loads(text_data)
+        if data.get("action") == "send":
+            await self.send_and_broadcast(data)
+            return
+        if data.get("action") == "typing":
+            await self.broadcast_typing()
+            return
+
         message = data["message"]
-        sender = data["sender"]
 
-        user = await sync_to_async(User.objects.get)(id=sender)
+        profile = await get_sender_profile(self.user_id)
+        if profile is None:
+            return
 
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 "type": "group_message",
                 "message": message,
-                "sender_id": sender,
-                "full_name": user.full_name,
-                "organization": user.primary_organization,
-                "profile_image": (
-                    user.profile_image.url if user.profile_image else None
-                ),
+                "sender_id": self.user_id,
+                **profile,
                 "timestamp": str(timezone.now()),
             },
         )
@@ -148,6 +399,7 @@ class GroupConsumer(AsyncWebsocketConsumer):
         await self.send(
             text_data=json.dumps(
                 {
+                    "id": event.get("id"),
                     "message": event["message"],
                     "sender_id": event["sender_id"],
                     "full_name": event["full_name"],
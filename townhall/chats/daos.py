@@ -1,12 +1,46 @@
+import hashlib
+from collections import defaultdict
+from datetime import datetime
 from typing import Optional
-from .models import Chat, Message
-from .types import CreateChatData, CreateMessageData, UpdateMessageData
-from django.db.models import QuerySet
-from django.db import DatabaseError
+from .models import Chat, ChatReadStatus, GroupMessage, Message
+from .types import (
+    CreateChatData,
+    CreateGroupMessageData,
+    CreateMessageData,
+    UpdateMessageData,
+)
+from django.db.models import F, Q, QuerySet
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from users.services import UserServices
 
 
+def keyset_page(
+    qs: QuerySet,
+    before: tuple[datetime, int] | None,
+    after: tuple[datetime, int] | None,
+    limit: int,
+) -> list:
+    """
+    Return up to ``limit`` rows of a message queryset, oldest first.
+
+    ``before``/``after`` are the ``(sent_at, id)`` of a message the client
+    already has. Without ``after`` the page is the newest rows older than
+    ``before`` (or the newest overall). Either way the query seeks down a
+    (..., sent_at, id) index instead of reading the whole history.
+    """
+    if after is not None:
+        sent_at, row_id = after
+        qs = qs.filter(Q(sent_at__gt=sent_at) | Q(sent_at=sent_at, id__gt=row_id))
+        return list(qs.order_by("sent_at", "id")[:limit])
+
+    if before is not None:
+        sent_at, row_id = before
+        qs = qs.filter(Q(sent_at__lt=sent_at) | Q(sent_at=sent_at, id__lt=row_id))
+    return list(qs.order_by("-sent_at", "-id")[:limit])[::-1]
+
+
 class ChatDao:
     @staticmethod
     def get_chat(id: int) -> Optional[Chat]:
@@ -20,17 +54,73 @@ class ChatDao:
             print(f"A Database Error has occured {error}")
             return None
 
+    @staticmethod
+    def get_participant_ids(chat_id: int) -> list[int]:
+        return list(
+            Chat.participants.through.objects.filter(chat_id=chat_id).values_list(
+                "user_id", flat=True
+            )
+        )
+
+    @staticmethod
+    def unhide_chat(chat_id: int) -> None:
+        Chat.hidden_by.through.objects.filter(chat_id=chat_id).delete()
+
     @staticmethod
     def delete_chat(id: int) -> None:
         Chat.objects.get(id=id).delete()
 
+    @staticmethod
+    def participant_key(participant_ids) -> Optional[str]:
+        """
+        Canonical key of a participant set, independent of order. None for
+        fewer than two participants: such chats are not deduplicated.
+        """
+        ids = sorted({int(pid) for pid in participant_ids})
+        if len(ids) < 2:
+            return None
+        return hashlib.sha1(",".join(map(str, ids)).encode()).hexdigest()
+
+    @staticmethod
+    def get_chat_by_participants(participant_ids) -> Optional[Chat]:
+        key = ChatDao.participant_key(participant_ids)
+        if key is None:
+            return None
+        return Chat.objects.filter(participant_key=key).first()
+
+    @staticmethod
+    def refresh_participant_keys(chat_ids) -> None:
+        """
+        Recompute the participant key of each chat from its participants.
+
+        When another chat already holds the resulting key, that chat stays
+        canonical and this one is left unkeyed, like the duplicates the
+        backfill found, so leaving or joining a chat never fails on it.
+        """
+        participants = defaultdict(list)
+        rows = Chat.participants.through.objects.filter(chat_id__in=chat_ids)
+        for chat_id, user_id in rows.values_list("chat_id", "user_id"):
+            participants[chat_id].append(user_id)
+        for chat_id in chat_ids:
+            key = ChatDao.participant_key(participants[chat_id])
+            taken = Chat.objects.filter(participant_key=key).exclude(id=chat_id)
+            if key is not None and taken.exists():
+                key = None
+            Chat.objects.filter(id=chat_id).update(participant_key=key)
+
     @staticmethod
     def create_chat(create_chat_data: CreateChatData) -> Optional[Chat]:
-        chat = Chat.objects.create(
-            name=create_chat_data.name,
-        )
+        # The key is set up front so a concurrent identical chat fails here
+        # (IntegrityError) rather than after both have been populated
+        with transaction.atomic():
+            chat = Chat.objects.create(
+                name=create_chat_data.name,
+                participant_key=ChatDao.participant_key(
+                    create_chat_data.participant_ids
+                ),
+            )
 
-        chat.participants.add(*create_chat_data.participant_ids)
+            chat.participants.add(*create_chat_data.participant_ids)
         return chat
 
     @staticmethod
@@ -47,12 +137,15 @@ class ChatDao:
             )
 
         user = UserServices.get_user(user_id)
-        chat.participants.add(user)
+        ChatDao._change_participants(lambda: chat.participants.add(user))
 
     @staticmethod
     def update_chat_participants(chat_id: int, new_participant_ids: list[int]) -> Chat:
         chat = Chat.objects.get(id=chat_id)
-        chat.participants.set(new_participant_ids)
+        existing = ChatDao.get_chat_by_participants(new_participant_ids)
+        if existing is not None and existing.id != chat.id:
+            raise ValidationError("A chat with these participants already exists.")
+        ChatDao._change_participants(lambda: chat.participants.set(new_participant_ids))
         return chat
 
     @staticmethod
@@ -68,7 +161,104 @@ class ChatDao:
             )
 
         user = UserServices.get_user(user_id)
-        chat.participants.remove(user)
+        ChatDao._change_participants(lambda: chat.participants.remove(user))
+
+    @staticmethod
+    def _change_participants(change) -> None:
+        # The m2m_changed receiver rewrites participant_key, which fails if
+        # a concurrent change gave another chat the same participants
+        try:
+            with transaction.atomic():
+                change()
+        except IntegrityError:
+            raise ValidationError("A chat with these participants already exists.")
+
+    @staticmethod
+    def get_unread_statuses(user_id: int) -> QuerySet[ChatReadStatus]:
+        """
+        Read statuses of the visible chats the user is still in that have
+        unread messages.
+        """
+        return (
+            ChatReadStatus.objects.filter(
+                user_id=user_id, unread_count__gt=0, chat__participants__id=user_id
+            )
+            .exclude(chat__hidden_by__id=user_id)
+            .select_related("latest_unread__user")
+        )
+
+    @staticmethod
+    def record_message(message: Message) -> dict[int, int]:
+        """
+        Count a new message as unread for every other participant.
+
+        Returns the updated unread count per recipient id.
+        """
+        recipient_ids = list(
+            Chat.participants.through.objects.filter(chat_id=message.chat_id)
+            .exclude(user_id=message.user_id)
+            .values_list("user_id", flat=True)
+        )
+        if not recipient_ids:
+            return {}
+
+        with transaction.atomic():
+            # A recipient's first status counts from this message on, the
+            # same window recount_unread uses
+            ChatReadStatus.objects.bulk_create(
+                [
+                    ChatReadStatus(
+                        user_id=user_id,
+                        chat_id=message.chat_id,
+                        last_read_at=message.sent_at,
+                    )
+                    for user_id in recipient_ids
+                ],
+                ignore_conflicts=True,
+            )
+            statuses = ChatReadStatus.objects.filter(
+                chat_id=message.chat_id, user_id__in=recipient_ids
+            )
+            statuses.update(unread_count=F("unread_count") + 1, latest_unread=message)
+            return dict(statuses.values_list("user_id", "unread_count"))
+
+    @staticmethod
+    def recount_unread(message: Message) -> None:
+        """
+        Recompute the unread counters a deleted message may have been
+        counted in: those of other participants who had not read the chat
+        since it was sent.
+        """
+        statuses = list(
+            ChatReadStatus.objects.filter(
+                chat_id=message.chat_id,
+                unread_count__gt=0,
+                last_read_at__lte=message.sent_at,
+            ).exclude(user_id=message.user_id)
+        )
+        for status in statuses:
+            unread = (
+                Message.objects.filter(
+                    chat_id=status.chat_id, sent_at__gte=status.last_read_at
+                )
+                .exclude(user_id=status.user_id)
+                .order_by("-sent_at", "-id")
+            )
+            status.unread_count = unread.count()
+            status.latest_unread = unread.first()
+        ChatReadStatus.objects.bulk_update(statuses, ["unread_count", "latest_unread"])
+
+    @staticmethod
+    def mark_read(chat_id: int, user_id: int) -> None:
+        ChatReadStatus.objects.update_or_create(
+            user_id=user_id,
+            chat_id=chat_id,
+            defaults={
+                "last_read_at": timezone.now(),
+                "unread_count": 0,
+                "latest_unread": None,
+            },
+        )
 
 
 class MessageDao:
@@ -80,10 +270,33 @@ class MessageDao:
             content=create_message_data.content,
             image_content=create_message_data.image_content,
             sent_at=create_message_data.sent_at,
+            client_key=create_message_data.client_key,
         )
 
         return message
 
+    @staticmethod
+    def get_by_client_key(
+        user_id: int, chat_id: int, client_key: str
+    ) -> Optional[Message]:
+        return Message.objects.filter(
+            user_id=user_id, chat_id=chat_id, client_key=client_key
+        ).first()
+
+    @staticmethod
+    def get_page(
+        chat_id: int,
+        before: tuple[datetime, int] | None,
+        after: tuple[datetime, int] | None,
+        limit: int,
+    ) -> list[Message]:
+        """
+        Return up to ``limit`` messages of a chat, oldest first, with senders
+        joined in. See keyset_page for ``before``/``after``.
+        """
+        qs = Message.objects.select_related("user", "chat").filter(chat_id=chat_id)
+        return keyset_page(qs, before, after, limit)
+
     @staticmethod
     def get_message(id: int) -> Optional[Message]:
         return Message.objects.get(id=id)
@@ -108,3 +321,35 @@ class MessageDao:
             message.sent_at = update_message_data.sent_at
 
         message.save()
+
+
+class GroupMessageDao:
+    @staticmethod
+    def create_group_message(data: CreateGroupMessageData) -> GroupMessage:
+        return GroupMessage.objects.create(
+            user_id=data.user_id,
+            group_name=data.group_name,
+            content=data.content,
+            image=data.image,
+            sent_at=data.sent_at or timezone.now(),
+            client_key=data.client_key,
+        )
+
+    @staticmethod
+    def get_by_client_key(
+        user_id: int, group_name: str, client_key: str
+    ) -> Optional[GroupMessage]:
+        return GroupMessage.objects.filter(
+            user_id=user_id, group_name=group_name, client_key=client_key
+        ).first()
+
+    @staticmethod
+    def get_page(
+        group_name: str,
+        before: tuple[datetime, int] | None,
+        after: tuple[datetime, int] | None,
+        limit: int,
+    ) -> list[GroupMessage]:
+        """Like MessageDao.get_page, for a group channel."""
+        qs = GroupMessage.objects.select_related("user").filter(group_name=group_name)
+        return keyset_page(qs, before, after, limit)
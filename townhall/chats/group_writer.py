@@ -0,0 +1,223 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history
+
+from .models import GroupMessage
+from .types import CreateGroupMessageData
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GroupMessageWriter:
+    """
+    Write-behind buffer for group messages.
+
+    submit() queues a message and returns a Future. A background thread
+    gathers what arrives within flush_interval seconds, up to max_batch
+    messages, and saves it with one bulk INSERT into GroupMessage and one
+    into its history table. Futures resolve to (message, created) only once
+    the batch has committed, so an ack sent on them is durable.
+
+    The queue is bounded by max_queue: submit() waits up to timeout seconds
+    for room and then rejects the message, so a stalled database pushes
+    back on senders instead of growing the buffer. Callers wait at most
+    result_timeout seconds for a future. close(), also registered with
+    atexit, stops accepting messages and drains the queue; anything the
+    writer thread could not save by then fails instead of hanging.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 200,
+        flush_interval: float = 0.005,
+        max_queue: int = 10000,
+        result_timeout: float = 10.0,
+    ):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.result_timeout = result_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        # Orders submit() against close(): nothing is queued once closed
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="group-message-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, data: CreateGroupMessageData, timeout: float = 1.0) -> Future:
+        """
+        Queue a message; with timeout=0 never block, for callers on an
+        event loop. Raises ValidationError when closed or full.
+        """
+        future = Future()
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise ValidationError("Group messages are not being accepted.")
+                try:
+                    self._queue.put_nowait((data, future))
+                    return future
+                except queue.Full:
+                    pass
+            # Wait for room outside the lock so close() is never held up
+            if time.monotonic() >= deadline:
+                raise ValidationError("Too many group messages in flight, try again.")
+            time.sleep(0.001)
+
+    def close(self, timeout: float = None) -> None:
+        """Stop accepting messages and wait until the queued ones are saved."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        # Left over only if the writer thread died or did not finish in time
+        error = ValidationError("Group message writer stopped before saving.")
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                _resolve(item[1], error=error)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                self._flush(batch)
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _flush(self, batch) -> None:
+        close_old_connections()
+        try:
+            results = self._write([data for data, _ in batch])
+        except Exception as error:
+            logger.exception("Failed to save %d group messages", len(batch))
+            for _, future in batch:
+                _resolve(future, error=error)
+        else:
+            for (_, future), result in zip(batch, results):
+                _resolve(future, result)
+        finally:
+            close_old_connections()
+
+    def _write(self, batch):
+        try:
+            with transaction.atomic():
+                return self._bulk_insert(batch)
+        except IntegrityError:
+            # A concurrent writer took one of the client keys; settle the
+            # batch row by row so the other messages still go through
+            from .services import GroupMessageServices
+
+            return [GroupMessageServices.create_group_message_once(d) for d in batch]
+
+    @staticmethod
+    def _bulk_insert(batch):
+        """Insert the batch; returns (message, created) per item, in order."""
+        keyed = [(d.user_id, d.group_name, d.client_key) for d in batch if d.client_key]
+        known = {}
+        if keyed:
+            for message in GroupMessage.objects.filter(
+                user_id__in={user_id for user_id, _, _ in keyed},
+                group_name__in={group_name for _, group_name, _ in keyed},
+                client_key__in={key for _, _, key in keyed},
+            ):
+                key = (message.user_id, message.group_name, message.client_key)
+                known[key] = message
+
+        now = timezone.now()
+        new, slots = [], []
+        for data in batch:
+            key = (
+                (data.user_id, data.group_name, data.client_key)
+                if data.client_key
+                else None
+            )
+            if key in known:
+                slots.append((known[key], False))
+                continue
+            message = GroupMessage(
+                user_id=data.user_id,
+                group_name=data.group_name,
+                content=data.content,
+                image=data.image,
+                sent_at=data.sent_at or now,
+                client_key=data.client_key,
+            )
+            new.append(message)
+            slots.append((message, True))
+            if key is not None:
+                # A retry within the same batch resolves to this message
+                known[key] = message
+
+        if new:
+            saved = bulk_create_with_history(new, GroupMessage)
+            for message, saved_message in zip(new, saved):
+                message.pk = saved_message.pk
+        return slots
+
+
+def _resolve(future: Future, result=None, error: Exception = None) -> None:
+    # A caller that gave up may have cancelled its future
+    if future.set_running_or_notify_cancel():
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Writer configured by settings.GROUP_MESSAGE_WRITER, or None if off."""
+    global _writer
+    options = getattr(settings, "GROUP_MESSAGE_WRITER", None) or {}
+    if not options.get("ENABLED"):
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = GroupMessageWriter(
+                max_batch=options.get("MAX_BATCH", 200),
+                flush_interval=options.get("FLUSH_INTERVAL", 0.005),
+                max_queue=options.get("MAX_QUEUE", 10000),
+                result_timeout=options.get("RESULT_TIMEOUT", 10.0),
+            )
+            atexit.register(_writer.close)
+    return _writer
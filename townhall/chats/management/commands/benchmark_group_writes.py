@@ -0,0 +1,90 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from chats.group_writer import GroupMessageWriter
+from chats.models import GroupMessage
+from chats.services import GroupMessageServices
+from chats.types import CreateGroupMessageData
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare group messages saved per second row by row and through the "
+        "write-behind GroupMessageWriter. Concurrent senders each wait for "
+        "their message to be saved, as websocket senders wait for the ack. "
+        "Writes to the configured database and removes its rows afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument("--senders", type=int, default=16)
+        parser.add_argument("--max-batch", type=int, default=200)
+        parser.add_argument("--flush-interval", type=float, default=0.005)
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:12]
+        group_name = f"benchmark-{run_id}"
+        user = User.objects.create(email=f"benchmark-{run_id}@example.invalid")
+        try:
+            self.stdout.write(
+                f"{'path':<10}{'messages':>10}{'seconds':>10}{'msg/s':>10}"
+            )
+            self._report(
+                "per-row",
+                lambda data: GroupMessageServices.create_group_message_once(data),
+                user,
+                group_name,
+                options,
+            )
+            writer = GroupMessageWriter(
+                max_batch=options["max_batch"],
+                flush_interval=options["flush_interval"],
+                max_queue=options["messages"],
+            )
+            try:
+                self._report(
+                    "batched",
+                    lambda data: writer.submit(data).result(),
+                    user,
+                    group_name,
+                    options,
+                )
+            finally:
+                writer.close()
+        finally:
+            GroupMessage.history.filter(group_name=group_name).delete()
+            GroupMessage.objects.filter(group_name=group_name).delete()
+            user.delete()
+
+    def _report(self, label, save, user, group_name, options):
+        senders = options["senders"]
+        per_sender = max(1, options["messages"] // senders)
+
+        def send(sender):
+            try:
+                for n in range(per_sender):
+                    save(
+                        CreateGroupMessageData(
+                            user_id=user.id,
+                            group_name=group_name,
+                            content=f"{label} message {sender}-{n}",
+                        )
+                    )
+            finally:
+                # Each sender thread opened its own connection
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(senders) as pool:
+            list(pool.map(send, range(senders)))
+        elapsed = time.perf_counter() - started
+
+        total = per_sender * senders
+        self.stdout.write(
+            f"{label:<10}{total:>10}{elapsed:>10.2f}{total / elapsed:>10.0f}"
+        )
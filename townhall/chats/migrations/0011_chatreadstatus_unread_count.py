@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-17 23:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_unread_counts(apps, schema_editor):
+    """Seed the counters with what get_unread_counts used to compute."""
+    Chat = apps.get_model("chats", "Chat")
+    Message = apps.get_model("chats", "Message")
+    ChatReadStatus = apps.get_model("chats", "ChatReadStatus")
+
+    for chat in Chat.objects.prefetch_related("participants"):
+        statuses = {s.user_id: s for s in ChatReadStatus.objects.filter(chat=chat)}
+        for user in chat.participants.all():
+            read_status = statuses.get(user.id)
+            unread = Message.objects.filter(chat=chat).exclude(user=user)
+            if read_status:
+                unread = unread.filter(sent_at__gt=read_status.last_read_at)
+            latest = unread.order_by("-sent_at", "-id").first()
+            if latest is None:
+                continue
+            if read_status is None:
+                read_status = ChatReadStatus(user=user, chat=chat)
+            read_status.unread_count = unread.count()
+            read_status.latest_unread = latest
+            read_status.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chats", "0010_chatreadstatus"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatreadstatus",
+            name="latest_unread",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chats.message",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatreadstatus",
+            name="unread_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
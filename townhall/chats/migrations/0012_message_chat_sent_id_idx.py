@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 23:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chats", "0011_chatreadstatus_unread_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["chat", "sent_at", "id"], name="message_chat_sent_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 23:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chats", "0012_message_chat_sent_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="groupmessage",
+            index=models.Index(
+                fields=["group_name", "sent_at", "id"],
+                name="groupmsg_group_sent_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-17 23:18
+
+import hashlib
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def backfill_participant_keys(apps, schema_editor):
+    """
+    Key every chat by its participant set. When duplicates already exist the
+    oldest chat keeps the key; the others stay unkeyed so they no longer
+    match get_or_create_chat, but their messages are untouched.
+    """
+    Chat = apps.get_model("chats", "Chat")
+
+    participants = defaultdict(list)
+    rows = Chat.participants.through.objects.values_list("chat_id", "user_id")
+    for chat_id, user_id in rows:
+        participants[chat_id].append(user_id)
+
+    seen = set()
+    for chat in Chat.objects.order_by("created_at", "id"):
+        ids = sorted(set(participants[chat.id]))
+        if not ids:
+            continue
+        key = hashlib.sha1(",".join(map(str, ids)).encode()).hexdigest()
+        if key in seen:
+            continue
+        seen.add(key)
+        Chat.objects.filter(id=chat.id).update(participant_key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chats", "0013_groupmessage_group_sent_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chat",
+            name="participant_key",
+            field=models.CharField(blank=True, max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="historicalchat",
+            name="participant_key",
+            field=models.CharField(blank=True, db_index=True, max_length=40, null=True),
+        ),
+        migrations.RunPython(backfill_participant_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="chat",
+            name="participant_key",
+            field=models.CharField(blank=True, max_length=40, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-17 23:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chats", "0015_message_client_key"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="groupmessage",
+            name="groupmsg_user_client_key_uniq",
+        ),
+        migrations.RemoveConstraint(
+            model_name="message",
+            name="message_user_client_key_uniq",
+        ),
+        migrations.AddConstraint(
+            model_name="groupmessage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("client_key__isnull", False)),
+                fields=("user", "group_name", "client_key"),
+                name="groupmsg_user_group_client_key_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="message",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("client_key__isnull", False)),
+                fields=("user", "chat", "client_key"),
+                name="message_user_chat_client_key_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def unkey_single_participant_chats(apps, schema_editor):
+    """Chats with fewer than two participants are no longer deduplicated."""
+    Chat = apps.get_model("chats", "Chat")
+    Chat.objects.annotate(n=Count("participants")).filter(
+        n__lt=2, participant_key__isnull=False
+    ).update(participant_key=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chats", "0016_message_client_key_per_room"),
+    ]
+
+    operations = [
+        migrations.RunPython(unkey_single_participant_chats, migrations.RunPython.noop),
+    ]
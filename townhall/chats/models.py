@@ -10,6 +10,11 @@ class Chat(models.Model):
     hidden_by = models.ManyToManyField(User, related_name="hidden_chats", blank=True)
     name = models.CharField(max_length=127)
     created_at = models.DateTimeField(default=timezone.now)
+    # Digest of the sorted participant ids (ChatDao.participant_key), kept in
+    # sync by chats/signals.py; unique so each participant set has one chat
+    participant_key = models.CharField(
+        max_length=40, null=True, blank=True, unique=True
+    )
     history = HistoricalRecords()
 
     def __str__(self):
@@ -22,8 +27,25 @@ class Message(models.Model):
     content = models.TextField()
     image_content = CloudinaryField("image", null=True, blank=True)
     sent_at = models.DateTimeField(default=timezone.now)
+    # Sender-chosen idempotency key for websocket sends (ChatConsumer)
+    client_key = models.CharField(max_length=64, null=True, blank=True)
     history = HistoricalRecords()
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a chat's history (MessageDao.get_page)
+            models.Index(
+                fields=["chat", "sent_at", "id"], name="message_chat_sent_id_idx"
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "chat", "client_key"],
+                condition=models.Q(client_key__isnull=False),
+                name="message_user_chat_client_key_uniq",
+            ),
+        ]
+
     def __str__(self):
         return str(self.id)
 
@@ -32,6 +54,11 @@ class ChatReadStatus(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE)
     last_read_at = models.DateTimeField(default=timezone.now)
+    # Maintained on write by ChatDao.record_message, reset by mark_read
+    unread_count = models.IntegerField(default=0)
+    latest_unread = models.ForeignKey(
+        Message, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
 
     class Meta:
         unique_together = ("user", "chat")
@@ -46,7 +73,25 @@ class GroupMessage(models.Model):
     content = models.TextField()
     image = CloudinaryField("image", blank=True, null=True)
     sent_at = models.DateTimeField(default=timezone.now)
+    # Sender-chosen idempotency key for websocket sends (GroupConsumer)
+    client_key = models.CharField(max_length=64, null=True, blank=True)
     history = HistoricalRecords()
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a group's history (GroupMessageDao.get_page)
+            models.Index(
+                fields=["group_name", "sent_at", "id"],
+                name="groupmsg_group_sent_id_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "group_name", "client_key"],
+                condition=models.Q(client_key__isnull=False),
+                name="groupmsg_user_group_client_key_uniq",
+            ),
+        ]
+
     def __str__(self):
         return str(self.id)
@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+import typing
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryPresenceBackend:
+    """
+    Presence for a single process (tests and local development).
+
+    Same semantics as RedisPresenceBackend: a user is online while at least
+    one of their connections has sent a heartbeat within the last ttl
+    seconds, so one closed tab does not hide a user who still has another.
+    """
+
+    # Size of the throttle table that triggers a sweep of expired keys
+    PRUNE_AT = 1024
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._connections = {}
+        self._throttles = {}
+        self._lock = threading.Lock()
+
+    def heartbeat(self, user_id: int, connection_id: str) -> None:
+        with self._lock:
+            expires = self._connections.setdefault(int(user_id), {})
+            expires[connection_id] = time.monotonic() + self.ttl
+
+    def disconnect(self, user_id: int, connection_id: str) -> None:
+        with self._lock:
+            expires = self._connections.get(int(user_id), {})
+            expires.pop(connection_id, None)
+            if not expires:
+                self._connections.pop(int(user_id), None)
+
+    def online_among(self, user_ids: typing.Iterable[int]) -> typing.Set[int]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                int(user_id)
+                for user_id in user_ids
+                if any(
+                    expiry > now
+                    for expiry in self._connections.get(int(user_id), {}).values()
+                )
+            }
+
+    def throttle(self, key: str, interval: float) -> bool:
+        """True at most once per interval seconds for a key."""
+        now = time.monotonic()
+        with self._lock:
+            if self._throttles.get(key, 0) > now:
+                return False
+            if len(self._throttles) >= self.PRUNE_AT:
+                # Drop expired keys so one-off rooms and users do not pile up
+                self._throttles = {
+                    k: expiry for k, expiry in self._throttles.items() if expiry > now
+                }
+            self._throttles[key] = now + interval
+            return True
+
+
+class RedisPresenceBackend:
+    """
+    Presence shared by every worker, kept entirely in Redis.
+
+    Each user has a sorted set of their connections scored by expiry time;
+    the key itself expires ttl seconds after the last heartbeat. The bulk
+    lookup is one pipelined round trip. Redis failures are logged and
+    presence degrades to "nobody online" rather than failing the caller.
+    """
+
+    PREFIX = "presence"
+
+    def __init__(self, url: str, ttl: float = 60):
+        import redis
+
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def heartbeat(self, user_id: int, connection_id: str) -> None:
+        now = time.time()
+        key = self._user_key(user_id)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(key, {connection_id: now + self.ttl})
+        # Connections that vanished without a disconnect
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.expire(key, int(self.ttl) + 1)
+        self._execute(pipe)
+
+    def disconnect(self, user_id: int, connection_id: str) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zrem(self._user_key(user_id), connection_id)
+        self._execute(pipe)
+
+    def online_among(self, user_ids: typing.Iterable[int]) -> typing.Set[int]:
+        user_ids = [int(user_id) for user_id in user_ids]
+        if not user_ids:
+            return set()
+        now = time.time()
+        pipe = self._client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.zcount(self._user_key(user_id), now, "+inf")
+        counts = self._execute(pipe) or [0] * len(user_ids)
+        return {user_id for user_id, count in zip(user_ids, counts) if count}
+
+    def throttle(self, key: str, interval: float) -> bool:
+        """True at most once per interval seconds for a key."""
+        pipe = self._client.pipeline(transaction=False)
+        pipe.set(
+            f"{self.PREFIX}:throttle:{key}", 1, nx=True, px=max(1, int(interval * 1000))
+        )
+        result = self._execute(pipe)
+        return bool(result and result[0])
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.PREFIX}:user:{int(user_id)}"
+
+    def _execute(self, pipe):
+        try:
+            return pipe.execute()
+        except self._redis.RedisError:
+            logger.warning("Presence update failed", exc_info=True)
+            return None
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_presence():
+    """Backend configured by settings.PRESENCE (in-memory if unset)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            options = getattr(settings, "PRESENCE", None) or {"BACKEND": "memory"}
+            ttl = options.get("TTL", 60)
+            if options["BACKEND"] == "redis":
+                _backend = RedisPresenceBackend(options["REDIS_URL"], ttl)
+            else:
+                _backend = InMemoryPresenceBackend(ttl)
+    return _backend
+
+
+def typing_interval() -> float:
+    """Minimum seconds between typing events of one user in one room."""
+    options = getattr(settings, "PRESENCE", None) or {}
+    return options.get("TYPING_INTERVAL", 3)
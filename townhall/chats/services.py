@@ -1,12 +1,66 @@
+import base64
+import binascii
+import json
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import datetime
 from django.core.exceptions import ValidationError
 from typing import Optional
-from .models import Chat, Message
-from .daos import ChatDao, MessageDao
-from .types import CreateChatData, CreateMessageData, UpdateMessageData
+from .models import Chat, GroupMessage, Message
+from .daos import ChatDao, GroupMessageDao, MessageDao
+from .group_writer import get_writer
+from .presence import get_presence
+from .types import (
+    CreateChatData,
+    CreateGroupMessageData,
+    CreateMessageData,
+    UpdateMessageData,
+)
+from django.db import IntegrityError, transaction
 from django.db.models import QuerySet
+from core.fanout import fan_out
 from users.models import User
 import typing
 
+MAX_PAGE_SIZE = 100
+
+
+def encode_message_cursor(message) -> str:
+    raw = json.dumps([message.sent_at.isoformat(), message.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_message_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode())
+        sent_at, message_id = json.loads(raw)
+        return datetime.fromisoformat(sent_at), int(message_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValidationError("Invalid cursor.")
+
+
+def paginate_messages(messages: list, limit: int, after: Optional[str] = None):
+    """
+    Trim a page fetched with ``limit + 1`` rows and build its cursors.
+
+    Forward pages (``after`` given) overflow at their newest end, the others
+    at their oldest end. ``before`` is None once the start of the history is
+    on the page; ``after`` always points at the newest message, so clients
+    can use it to poll for new ones. An empty forward page echoes ``after``
+    back, so a poll that finds nothing keeps its place.
+    """
+    forward = after is not None
+    has_more = len(messages) > limit
+    if forward:
+        messages = messages[:limit]
+        has_older = True
+    else:
+        messages = messages[len(messages) - limit :] if has_more else messages
+        has_older = has_more
+    if not messages:
+        return messages, None, after
+    before = encode_message_cursor(messages[0]) if has_older else None
+    return messages, before, encode_message_cursor(messages[-1])
+
 
 class ChatServices:
     @staticmethod
@@ -34,27 +88,26 @@ class ChatServices:
     @staticmethod
     def get_or_create_chat(data: CreateChatData):
         try:
-            participant_ids = sorted(data.participant_ids)
-
-            # Find chats containing ALL specified participants
-            possible_chats = Chat.objects.all()
-            for pid in participant_ids:
-                possible_chats = possible_chats.filter(participants__id=pid)
-
-            # Verify exact participant match (no extra participants)
-            for chat in possible_chats:
-                existing_ids = sorted(chat.participants.values_list("id", flat=True))
-                if existing_ids == participant_ids:
-                    return chat, False  # Found existing chat
+            # One indexed lookup on the canonical participant key
+            chat = ChatDao.get_chat_by_participants(data.participant_ids)
+            if chat is not None:
+                return chat, False  # Found existing chat
 
             # Check if any participant has disabled DMs before creating
-            participants = User.objects.filter(id__in=participant_ids)
+            participants = User.objects.filter(id__in=data.participant_ids)
             for participant in participants:
                 if not participant.allow_dms:
                     raise ValidationError("This user does not accept direct messages.")
 
             # Create new chat if none found
-            chat = ChatDao.create_chat(create_chat_data=data)
+            try:
+                chat = ChatDao.create_chat(create_chat_data=data)
+            except IntegrityError:
+                # Lost a race with an identical request; reuse its chat
+                chat = ChatDao.get_chat_by_participants(data.participant_ids)
+                if chat is None:
+                    raise
+                return chat, False
             return chat, True
 
         except ValidationError:
@@ -94,17 +147,128 @@ class ChatServices:
         except ValidationError as e:
             raise ValidationError(f"Failed to remove user: {e}")
 
+    @staticmethod
+    def get_unread_counts(user_id: int) -> dict:
+        """
+        Unread message count and latest unread message per chat, keyed by
+        chat id. Reads the counters maintained on ChatReadStatus.
+        """
+        result = {}
+        for read_status in ChatDao.get_unread_statuses(user_id):
+            message = read_status.latest_unread
+            result[read_status.chat_id] = {
+                "count": read_status.unread_count,
+                "sender_id": message.user.id if message else None,
+                "sender_name": message.user.full_name if message else None,
+                "sender_image": (
+                    message.user.profile_image.url
+                    if message and message.user.profile_image
+                    else None
+                ),
+                "last_message": message.content if message else None,
+                "timestamp": message.sent_at.isoformat() if message else None,
+            }
+        return result
+
+    @staticmethod
+    def mark_chat_read(chat_id: int, user_id: int) -> None:
+        if not Chat.objects.filter(id=chat_id).exists():
+            raise ValidationError(f"Chat with the given id: {chat_id}, does not exist.")
+        ChatDao.mark_read(chat_id=chat_id, user_id=user_id)
+
 
 class MessageServices:
     @staticmethod
     def create_message(create_message_data: CreateMessageData) -> Optional[Message]:
         try:
-            message = MessageDao.create_message(create_message_data=create_message_data)
-
+            message, _ = MessageServices.create_message_once(create_message_data)
             return message
         except ValidationError:
             raise
 
+    @staticmethod
+    def create_message_once(
+        create_message_data: CreateMessageData,
+    ) -> tuple[Message, bool]:
+        """
+        Save a message, count it as unread and push it to the participants.
+
+        A client_key the sender already used in this chat returns their
+        earlier message instead, without writing, counting or pushing it
+        again, so clients can retry a send safely. Returns (message, created).
+        """
+        data = create_message_data
+        if data.client_key:
+            existing = MessageDao.get_by_client_key(
+                data.user_id, data.chat_id, data.client_key
+            )
+            if existing is not None:
+                return existing, False
+        try:
+            # The message and its unread counters commit together
+            with transaction.atomic():
+                message = MessageDao.create_message(create_message_data=data)
+                unread_counts = ChatDao.record_message(message)
+        except IntegrityError:
+            if not data.client_key:
+                raise
+            # A concurrent retry with the same key won the insert
+            existing = MessageDao.get_by_client_key(
+                data.user_id, data.chat_id, data.client_key
+            )
+            if existing is None:
+                raise
+            return existing, False
+
+        MessageServices.push_to_participants(message, unread_counts)
+        return message, True
+
+    @staticmethod
+    def push_to_participants(message: Message, unread_counts: dict) -> None:
+        """
+        Send a user_message event to every participant's user_<id> group,
+        carrying the recipient's new unread count. Best effort: a channel
+        layer failure never fails the message write.
+        """
+        user = message.user
+        event = {
+            "type": "user_message",
+            "chat_id": message.chat_id,
+            "message": message.content,
+            "sender": user.id,
+            "full_name": user.full_name,
+            "profile_image": user.profile_image.url if user.profile_image else None,
+        }
+        participant_ids = [message.user_id, *unread_counts]
+        fan_out(
+            (
+                f"user_{participant_id}",
+                {**event, "unread_count": unread_counts.get(participant_id)},
+            )
+            for participant_id in participant_ids
+        )
+
+    @staticmethod
+    def get_chat_messages(
+        chat_id: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 50,
+    ) -> tuple[list[Message], Optional[str], Optional[str]]:
+        """
+        Return one page of a chat's history, oldest first, plus the
+        ``before`` and ``after`` cursors of its first and last message.
+        """
+        if before and after:
+            raise ValidationError("Use either before or after, not both.")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        before_key = decode_message_cursor(before) if before else None
+        after_key = decode_message_cursor(after) if after else None
+
+        # Fetch one extra row to learn whether the page has a neighbour
+        messages = MessageDao.get_page(chat_id, before_key, after_key, limit + 1)
+        return paginate_messages(messages, limit, after)
+
     @staticmethod
     def get_message(id: int) -> typing.Optional[Message]:
         try:
@@ -126,3 +290,90 @@ class MessageServices:
             MessageDao.update_message(id=id, update_message_data=update_message_data)
         except Message.DoesNotExist:
             raise ValidationError(f"Message with the given id: {id}, does not exist.")
+
+
+class GroupMessageServices:
+    @staticmethod
+    def create_group_message(data: CreateGroupMessageData) -> GroupMessage:
+        """
+        Save a group message, through the write-behind writer when
+        GROUP_MESSAGE_WRITER is enabled (images are always saved directly).
+        """
+        writer = get_writer()
+        if writer is not None and not data.image:
+            try:
+                message, _ = writer.submit(data).result(writer.result_timeout)
+            except FuturesTimeoutError:
+                raise ValidationError("Group message was not saved in time.")
+            return message
+        message, _ = GroupMessageServices.create_group_message_once(data)
+        return message
+
+    @staticmethod
+    def create_group_message_once(
+        data: CreateGroupMessageData,
+    ) -> tuple[GroupMessage, bool]:
+        """
+        Save a group message; like MessageServices.create_message_once, a
+        repeated client_key in the same group returns the sender's earlier
+        message.
+        """
+        if data.client_key:
+            existing = GroupMessageDao.get_by_client_key(
+                data.user_id, data.group_name, data.client_key
+            )
+            if existing is not None:
+                return existing, False
+        try:
+            with transaction.atomic():
+                return GroupMessageDao.create_group_message(data), True
+        except IntegrityError:
+            if not data.client_key:
+                raise
+            existing = GroupMessageDao.get_by_client_key(
+                data.user_id, data.group_name, data.client_key
+            )
+            if existing is None:
+                raise
+            return existing, False
+
+    @staticmethod
+    def get_group_messages(
+        group_name: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 50,
+    ) -> tuple[list[GroupMessage], Optional[str], Optional[str]]:
+        """Like MessageServices.get_chat_messages, for a group channel."""
+        if before and after:
+            raise ValidationError("Use either before or after, not both.")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        before_key = decode_message_cursor(before) if before else None
+        after_key = decode_message_cursor(after) if after else None
+
+        messages = GroupMessageDao.get_page(
+            group_name, before_key, after_key, limit + 1
+        )
+        return paginate_messages(messages, limit, after)
+
+
+class PresenceServices:
+    # Upper bound on ids per "who is online" lookup
+    MAX_USER_IDS = 500
+
+    @staticmethod
+    def get_online_users(user_ids: list) -> list[int]:
+        """
+        Return the subset of user_ids that is online, in input order.
+        Answered from the presence backend alone, never the database.
+        """
+        try:
+            user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        except (TypeError, ValueError):
+            raise ValidationError("user_ids must be integers.")
+        if len(user_ids) > PresenceServices.MAX_USER_IDS:
+            raise ValidationError(
+                f"At most {PresenceServices.MAX_USER_IDS} user_ids per request."
+            )
+        online = get_presence().online_among(user_ids)
+        return [user_id for user_id in user_ids if user_id in online]
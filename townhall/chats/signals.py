@@ -0,0 +1,28 @@
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+
+from .daos import ChatDao
+from .models import Chat, Message
+
+
+@receiver(m2m_changed, sender=Chat.participants.through)
+def refresh_participant_key(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Chat.participant_key in step with the participant set."""
+    if action == "pre_clear":
+        # The cleared chats are gone by post_clear, so remember them now
+        if reverse:
+            instance._participant_chat_ids = set(
+                instance.chats.values_list("id", flat=True)
+            )
+        else:
+            instance._participant_chat_ids = {instance.id}
+    elif action == "post_clear":
+        ChatDao.refresh_participant_keys(getattr(instance, "_participant_chat_ids", ()))
+    elif action in ("post_add", "post_remove"):
+        ChatDao.refresh_participant_keys(pk_set if reverse else {instance.id})
+
+
+@receiver(post_delete, sender=Message)
+def recount_unread_on_message_delete(sender, instance, **kwargs):
+    """A deleted message no longer counts as unread."""
+    ChatDao.recount_unread(instance)
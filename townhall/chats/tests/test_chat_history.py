@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chats.models import Chat, Message
+from users.models import User
+
+# Running only this specific test file:
+#   python3 manage.py test chats.tests.test_chat_history
+
+
+class TestChatHistory(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = User.objects.create(email="alice@example.com")
+        self.bob = User.objects.create(email="bob@example.com")
+        self.client.force_authenticate(user=self.alice)
+        self.chat = Chat.objects.create(name="DM")
+        self.chat.participants.add(self.alice, self.bob)
+        self.url = f"/chats/{self.chat.id}/messages/"
+
+        start = timezone.now() - timedelta(hours=1)
+        self.messages = [
+            Message.objects.create(
+                user=self.bob if i % 2 else self.alice,
+                chat=self.chat,
+                content=f"Message {i}",
+                sent_at=start + timedelta(minutes=i),
+            )
+            for i in range(12)
+        ]
+
+    def _page(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _contents(self, page):
+        return [m["content"] for m in page["messages"]]
+
+    def test_first_page_is_latest_messages_oldest_first(self):
+        # Act
+        page = self._page(limit=5)
+
+        # Assert
+        self.assertEqual(self._contents(page), [f"Message {i}" for i in range(7, 12)])
+        self.assertIsNotNone(page["before"])
+
+    def test_before_walks_back_to_start_of_history(self):
+        # Arrange
+        contents = []
+        page = self._page(limit=5)
+
+        # Act
+        while True:
+            contents = self._contents(page) + contents
+            if page["before"] is None:
+                break
+            page = self._page(limit=5, before=page["before"])
+
+        # Assert
+        self.assertEqual(contents, [m.content for m in self.messages])
+
+    def test_after_returns_newer_messages(self):
+        # Arrange
+        page = self._page(limit=3)
+        newest = Message.objects.create(user=self.bob, chat=self.chat, content="New")
+
+        # Act
+        newer = self._page(after=page["after"])
+
+        # Assert
+        self.assertEqual(self._contents(newer), [newest.content])
+
+    def test_empty_poll_echoes_the_after_cursor(self):
+        # Arrange
+        page = self._page(limit=3)
+
+        # Act
+        newer = self._page(after=page["after"])
+
+        # Assert
+        self.assertEqual(newer["messages"], [])
+        self.assertEqual(newer["after"], page["after"])
+
+    def test_ties_on_sent_at_are_broken_by_id(self):
+        # Arrange
+        Message.objects.all().delete()
+        same_time = timezone.now()
+        for i in range(4):
+            Message.objects.create(
+                user=self.bob, chat=self.chat, content=f"Tie {i}", sent_at=same_time
+            )
+
+        # Act
+        latest = self._page(limit=2)
+        older = self._page(limit=2, before=latest["before"])
+
+        # Assert
+        self.assertEqual(
+            self._contents(older) + self._contents(latest),
+            [f"Tie {i}" for i in range(4)],
+        )
+
+    def test_page_size_is_capped(self):
+        # Arrange
+        Message.objects.bulk_create(
+            Message(user=self.bob, chat=self.chat, content="Bulk") for _ in range(150)
+        )
+
+        # Act
+        page = self._page(limit=1000)
+
+        # Assert
+        self.assertEqual(len(page["messages"]), 100)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        # Act / Assert - one query joins each message's user and chat
+        with self.assertNumQueries(1):
+            self._page(limit=12)
+
+    def test_invalid_cursor_returns_400(self):
+        # Act
+        response = self.client.get(self.url, {"before": "garbage"})
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "Invalid cursor.")
@@ -0,0 +1,194 @@
+from unittest.mock import patch
+
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase, override_settings
+
+from chats.models import Chat, ChatReadStatus, GroupMessage, Message
+from townhall.routing import websocket_urlpatterns
+from users.models import User
+from users.profile_cache import sender_profiles
+
+# Running only this specific test file:
+#   python3 manage.py test chats.tests.test_consumers
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class ConsumerTests(TestCase):
+    def setUp(self):
+        sender_profiles.clear()
+        self.sender = User.objects.create(
+            email="sender@example.com", full_name="Sam", primary_organization="Co-op"
+        )
+        self.other = User.objects.create(email="other@example.com", full_name="Ola")
+        self.outsider = User.objects.create(email="outsider@example.com")
+        self.chat = Chat.objects.create(name="Garden")
+        self.chat.participants.add(self.sender, self.other)
+
+    def _communicator(self, path, user):
+        # AuthMiddlewareStack resolves scope["user"] from the session cookie
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        communicator.scope["user"] = user
+        return communicator
+
+    async def test_chat_broadcast_uses_session_user_and_warm_profiles(self):
+        # Arrange
+        communicator = self._communicator(f"/ws/chats/{self.chat.id}/", self.sender)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        # Act - the client claims to be someone else
+        with patch.object(sender_profiles, "load") as load:
+            await communicator.send_json_to(
+                {"message": "hello", "sender": self.other.id, "id": 1}
+            )
+            event = await communicator.receive_json_from()
+
+        # Assert - served from the profiles loaded on connect
+        load.assert_not_called()
+        self.assertEqual(event["sender_id"], self.sender.id)
+        self.assertEqual(event["full_name"], "Sam")
+        self.assertEqual(event["organization"], "Co-op")
+        await communicator.disconnect()
+
+    async def test_chat_rejects_anonymous_users_and_non_participants(self):
+        for user in (AnonymousUser(), self.outsider):
+            # Arrange
+            communicator = self._communicator(f"/ws/chats/{self.chat.id}/", user)
+
+            # Act
+            connected, _ = await communicator.connect()
+
+            # Assert
+            self.assertFalse(connected)
+
+    async def test_group_broadcast_uses_session_user(self):
+        # Arrange
+        communicator = self._communicator("/ws/groups/gardeners/", self.other)
+        await communicator.connect()
+
+        # Act
+        with patch.object(sender_profiles, "load") as load:
+            for text in ("one", "two"):
+                await communicator.send_json_to(
+                    {"message": text, "sender": self.sender.id}
+                )
+                event = await communicator.receive_json_from()
+
+        # Assert
+        load.assert_not_called()
+        self.assertEqual(event["sender_id"], self.other.id)
+        self.assertEqual(event["full_name"], "Ola")
+        await communicator.disconnect()
+
+    async def test_group_rejects_anonymous_users(self):
+        # Arrange
+        communicator = self._communicator("/ws/groups/gardeners/", AnonymousUser())
+
+        # Act
+        connected, _ = await communicator.connect()
+
+        # Assert
+        self.assertFalse(connected)
+
+    async def test_user_channel_is_only_open_to_its_owner(self):
+        # Arrange
+        own = self._communicator(f"/ws/users/{self.sender.id}/", self.sender)
+        other = self._communicator(f"/ws/users/{self.other.id}/", self.sender)
+
+        # Act
+        own_connected, _ = await own.connect()
+        other_connected, _ = await other.connect()
+
+        # Assert
+        self.assertTrue(own_connected)
+        self.assertFalse(other_connected)
+        await own.disconnect()
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class ConsumerSendTests(TestCase):
+    def setUp(self):
+        sender_profiles.clear()
+        self.sender = User.objects.create(email="sender@example.com", full_name="Sam")
+        self.other = User.objects.create(email="other@example.com", full_name="Ola")
+        self.chat = Chat.objects.create(name="Garden")
+        self.chat.participants.add(self.sender, self.other)
+
+    async def _connect(self, path, user):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_chat_send_persists_acks_and_broadcasts_once(self):
+        # Arrange
+        path = f"/ws/chats/{self.chat.id}/"
+        sender = await self._connect(path, self.sender)
+        listener = await self._connect(path, self.other)
+        frame = {"action": "send", "message": "hello", "client_key": "k-1"}
+
+        # Act
+        await sender.send_json_to(frame)
+        ack = await sender.receive_json_from()
+        echo = await sender.receive_json_from()
+        broadcast = await listener.receive_json_from()
+        await sender.send_json_to(frame)
+        retry_ack = await sender.receive_json_from()
+
+        # Assert
+        message = await Message.objects.aget()
+        self.assertEqual(ack["type"], "ack")
+        self.assertEqual(ack["id"], message.id)
+        self.assertFalse(ack["duplicate"])
+        self.assertEqual(echo["id"], message.id)
+        self.assertEqual(broadcast["message"], "hello")
+        self.assertEqual(broadcast["full_name"], "Sam")
+        self.assertEqual(retry_ack["id"], message.id)
+        self.assertTrue(retry_ack["duplicate"])
+        self.assertTrue(await listener.receive_nothing())
+        status = await ChatReadStatus.objects.aget(user=self.other)
+        self.assertEqual(status.unread_count, 1)
+        await sender.disconnect()
+        await listener.disconnect()
+
+    async def test_invalid_send_is_rejected_without_saving(self):
+        # Arrange
+        sender = await self._connect(f"/ws/chats/{self.chat.id}/", self.sender)
+
+        # Act
+        await sender.send_json_to({"action": "send", "message": " ", "client_key": "k"})
+        error = await sender.receive_json_from()
+
+        # Assert
+        self.assertEqual(error["type"], "error")
+        self.assertEqual(error["client_key"], "k")
+        self.assertFalse(await Message.objects.aexists())
+        await sender.disconnect()
+
+    async def test_group_send_is_idempotent(self):
+        # Arrange
+        sender = await self._connect("/ws/groups/gardeners/", self.sender)
+        frame = {"action": "send", "message": "hi all", "client_key": "g-1"}
+
+        # Act
+        await sender.send_json_to(frame)
+        ack = await sender.receive_json_from()
+        broadcast = await sender.receive_json_from()
+        await sender.send_json_to(frame)
+        retry_ack = await sender.receive_json_from()
+
+        # Assert
+        message = await GroupMessage.objects.aget()
+        self.assertEqual(message.group_name, "gardeners")
+        self.assertEqual(ack["id"], broadcast["id"])
+        self.assertEqual(retry_ack["id"], message.id)
+        self.assertTrue(retry_ack["duplicate"])
+        self.assertTrue(await sender.receive_nothing())
+        await sender.disconnect()
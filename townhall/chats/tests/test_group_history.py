@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chats.models import GroupMessage
+from users.models import User
+
+# Running only this specific test file:
+#   python3 manage.py test chats.tests.test_group_history
+
+
+class TestGroupHistory(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create(email=f"member{i}@example.com", full_name=f"M{i}")
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.users[0])
+        self.url = "/groups/gardening/messages/"
+
+        start = timezone.now() - timedelta(hours=1)
+        GroupMessage.objects.bulk_create(
+            GroupMessage(
+                user=self.users[i % 3],
+                group_name="gardening",
+                content=f"Message {i}",
+                sent_at=start + timedelta(minutes=i),
+            )
+            for i in range(10)
+        )
+        GroupMessage.objects.create(
+            user=self.users[0], group_name="cooking", content="Other group"
+        )
+
+    def _page(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _contents(self, page):
+        return [m["content"] for m in page["messages"]]
+
+    def test_latest_screen_then_older_pages(self):
+        # Act
+        latest = self._page(limit=6)
+        older = self._page(limit=6, before=latest["before"])
+
+        # Assert
+        self.assertEqual(self._contents(latest), [f"Message {i}" for i in range(4, 10)])
+        self.assertEqual(self._contents(older), [f"Message {i}" for i in range(4)])
+        self.assertIsNone(older["before"])
+        self.assertEqual(latest["messages"][-1]["full_name"], "M0")
+
+    def test_after_returns_only_newer_messages_of_group(self):
+        # Arrange
+        latest = self._page()
+        GroupMessage.objects.create(
+            user=self.users[1], group_name="gardening", content="Fresh"
+        )
+
+        # Act
+        newer = self._page(after=latest["after"])
+
+        # Assert
+        self.assertEqual(self._contents(newer), ["Fresh"])
+
+    def test_senders_are_joined_in(self):
+        # Act / Assert
+        with self.assertNumQueries(1):
+            self._page(limit=10)
@@ -0,0 +1,148 @@
+import threading
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TransactionTestCase
+
+from chats.group_writer import _STOP, GroupMessageWriter
+from chats.models import GroupMessage
+from chats.services import GroupMessageServices
+from chats.types import CreateGroupMessageData
+from users.models import User
+
+# Running only this specific test file:
+#   python3 manage.py test chats.tests.test_group_writer
+
+
+class GroupMessageWriterTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="writer@example.com")
+        self.writer = GroupMessageWriter(flush_interval=0.05)
+
+    def tearDown(self):
+        self.writer.close()
+
+    def _data(self, content, client_key=None, group_name="gardeners"):
+        return CreateGroupMessageData(
+            user_id=self.user.id,
+            group_name=group_name,
+            content=content,
+            client_key=client_key,
+        )
+
+    def test_messages_are_saved_in_one_batch_with_history(self):
+        # Act
+        futures = [self.writer.submit(self._data(f"m{i}")) for i in range(20)]
+        results = [future.result(timeout=5) for future in futures]
+
+        # Assert
+        saved = dict(GroupMessage.objects.values_list("id", "content"))
+        self.assertEqual(
+            [(saved[message.id], created) for message, created in results],
+            [(f"m{i}", True) for i in range(20)],
+        )
+        self.assertEqual(GroupMessage.history.count(), 20)
+
+    def test_repeated_client_keys_resolve_to_one_message(self):
+        # Arrange
+        earlier, _ = GroupMessageServices.create_group_message_once(
+            self._data("earlier", client_key="a")
+        )
+
+        # Act
+        futures = [
+            self.writer.submit(self._data("again", client_key="a")),
+            self.writer.submit(self._data("first", client_key="b")),
+            self.writer.submit(self._data("retry", client_key="b")),
+        ]
+        results = [future.result(timeout=5) for future in futures]
+
+        # Assert
+        self.assertEqual(results[0], (earlier, False))
+        self.assertTrue(results[1][1])
+        self.assertEqual(results[2], (results[1][0], False))
+        self.assertEqual(GroupMessage.objects.count(), 2)
+
+    def test_client_keys_are_scoped_to_the_group(self):
+        # Arrange
+        earlier, _ = GroupMessageServices.create_group_message_once(
+            self._data("earlier", client_key="a")
+        )
+
+        # Act
+        message, created = self.writer.submit(
+            self._data("elsewhere", client_key="a", group_name="beekeepers")
+        ).result(timeout=5)
+
+        # Assert
+        self.assertTrue(created)
+        self.assertNotEqual(message.id, earlier.id)
+        self.assertEqual(GroupMessage.objects.count(), 2)
+
+    def test_close_drains_the_queue_and_rejects_new_messages(self):
+        # Arrange
+        futures = [self.writer.submit(self._data(f"m{i}")) for i in range(5)]
+
+        # Act
+        self.writer.close()
+
+        # Assert
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(GroupMessage.objects.count(), 5)
+        with self.assertRaises(ValidationError):
+            self.writer.submit(self._data("late"))
+
+    def test_messages_left_by_a_dead_writer_fail_on_close(self):
+        # Arrange - the writer thread has died with a message still queued
+        self.writer._queue.put(_STOP)
+        self.writer._thread.join(5)
+        future = self.writer.submit(self._data("orphaned"))
+
+        # Act
+        self.writer.close()
+
+        # Assert
+        with self.assertRaises(ValidationError):
+            future.result(timeout=0)
+        with self.assertRaises(ValidationError):
+            self.writer.submit(self._data("after close"))
+
+    def test_service_gives_up_on_a_stalled_writer(self):
+        # Arrange
+        self.writer._queue.put(_STOP)
+        self.writer._thread.join(5)
+        self.writer.result_timeout = 0.05
+
+        # Act / Assert
+        with patch("chats.services.get_writer", return_value=self.writer):
+            with self.assertRaises(ValidationError):
+                GroupMessageServices.create_group_message(self._data("hi"))
+
+    def test_full_queue_pushes_back(self):
+        # Arrange - the writer is stuck flushing its first message
+        writer = GroupMessageWriter(flush_interval=0, max_queue=1)
+        flushing, release = threading.Event(), threading.Event()
+
+        def stuck_write(batch):
+            flushing.set()
+            release.wait(5)
+            return [(None, False)] * len(batch)
+
+        with patch.object(writer, "_write", side_effect=stuck_write):
+            writer.submit(self._data("in flight"))
+            self.assertTrue(flushing.wait(5))
+            writer.submit(self._data("queued"))
+
+            # Act / Assert
+            with self.assertRaises(ValidationError):
+                writer.submit(self._data("rejected"), timeout=0)
+            release.set()
+            writer.close()
+
+    def test_service_goes_through_the_writer_when_enabled(self):
+        # Act
+        with patch("chats.services.get_writer", return_value=self.writer):
+            message = GroupMessageServices.create_group_message(self._data("hi"))
+
+        # Assert
+        self.assertEqual(GroupMessage.objects.get().id, message.id)
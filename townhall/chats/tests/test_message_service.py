@@ -2,6 +2,7 @@ from django.test import TestCase
 from django.core.management import call_command
 from unittest.mock import patch
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from chats.models import Chat, Message
 from users.models import User
 from chats.types import CreateMessageData, UpdateMessageData
@@ -40,6 +41,74 @@ class TestMessageService(TestCase):
             message.sent_at, timezone.make_aware(datetime(2024, 7, 19, 10, 0))
         )
 
+    @patch("chats.services.fan_out")
+    def test_create_message_once_returns_earlier_message_for_repeated_key(
+        self, mock_fan_out
+    ):
+        # Arrange
+        create_message_data = CreateMessageData(
+            user_id=1,
+            chat_id=3,
+            content="Test message",
+            sent_at=timezone.now(),
+            client_key="retry-1",
+        )
+        first, created = MessageServices.create_message_once(create_message_data)
+
+        # Act
+        second, created_again = MessageServices.create_message_once(create_message_data)
+
+        # Assert
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(Message.objects.filter(client_key="retry-1").count(), 1)
+        self.assertEqual(mock_fan_out.call_count, 1)
+
+    @patch("chats.services.fan_out")
+    def test_create_message_once_scopes_keys_to_the_chat(self, mock_fan_out):
+        # Arrange
+        other_chat = Chat.objects.create(name="Other")
+        first, _ = MessageServices.create_message_once(
+            CreateMessageData(
+                user_id=1,
+                chat_id=3,
+                content="one",
+                sent_at=timezone.now(),
+                client_key="k-1",
+            )
+        )
+
+        # Act
+        second, created = MessageServices.create_message_once(
+            CreateMessageData(
+                user_id=1,
+                chat_id=other_chat.id,
+                content="two",
+                sent_at=timezone.now(),
+                client_key="k-1",
+            )
+        )
+
+        # Assert
+        self.assertTrue(created)
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(second.chat_id, other_chat.id)
+
+    @patch("chats.daos.MessageDao.create_message")
+    def test_create_message_once_reraises_other_integrity_errors(
+        self, mock_create_message
+    ):
+        # Arrange
+        mock_create_message.side_effect = IntegrityError("FOREIGN KEY failed")
+        create_message_data = CreateMessageData(
+            user_id=1, chat_id=3, content="x", sent_at=timezone.now(), client_key="k"
+        )
+
+        # Act & Assert
+        with self.assertRaises(IntegrityError):
+            MessageServices.create_message_once(create_message_data)
+
     @patch("chats.daos.MessageDao.create_message")
     def test_create_message_validation_error(self, mock_create_message):
         mock_create_message.side_effect = ValidationError("Random Error Message")
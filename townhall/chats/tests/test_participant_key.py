@@ -0,0 +1,158 @@
+from importlib import import_module
+from unittest.mock import patch
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.test import TestCase
+
+from chats.daos import ChatDao
+from chats.models import Chat
+from chats.services import ChatServices
+from chats.types import CreateChatData
+from users.models import User
+
+# Running only this specific test file:
+#   python3 manage.py test chats.tests.test_participant_key
+
+
+class TestParticipantKey(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(email=f"user{i}@example.com") for i in range(4)
+        ]
+        self.ids = [user.id for user in self.users]
+
+    def _get_or_create(self, ids):
+        return ChatServices.get_or_create_chat(
+            CreateChatData(participant_ids=ids, name="Chat")
+        )
+
+    def test_existing_chat_is_found_in_any_order(self):
+        # Arrange
+        chat, created = self._get_or_create(self.ids[:2])
+
+        # Act
+        found, found_created = self._get_or_create(self.ids[1::-1])
+
+        # Assert
+        self.assertTrue(created)
+        self.assertFalse(found_created)
+        self.assertEqual(found.id, chat.id)
+
+    def test_other_integrity_errors_are_not_swallowed(self):
+        # Arrange - no chat exists, so this is not a lost race
+        error = IntegrityError("FOREIGN KEY constraint failed")
+
+        # Act / Assert
+        with patch.object(ChatDao, "create_chat", side_effect=error):
+            with self.assertRaises(IntegrityError):
+                self._get_or_create(self.ids[:2])
+
+    def test_superset_is_a_different_chat(self):
+        # Arrange
+        pair, _ = self._get_or_create(self.ids[:2])
+
+        # Act
+        trio, created = self._get_or_create(self.ids[:3])
+
+        # Assert
+        self.assertTrue(created)
+        self.assertNotEqual(trio.id, pair.id)
+
+    def test_lookup_is_a_single_query(self):
+        # Arrange
+        for i in range(1, 4):
+            self._get_or_create([self.ids[0], self.ids[i]])
+
+        # Act / Assert
+        with self.assertNumQueries(1):
+            self._get_or_create([self.ids[3], self.ids[0]])
+
+    def test_key_follows_add_and_remove(self):
+        # Arrange
+        chat, _ = self._get_or_create(self.ids[:2])
+
+        # Act
+        ChatDao.add_user(chat.id, self.ids[2])
+
+        # Assert
+        self.assertEqual(ChatDao.get_chat_by_participants(self.ids[:3]), chat)
+        self.assertIsNone(ChatDao.get_chat_by_participants(self.ids[:2]))
+
+        # Act
+        ChatDao.remove_user(chat.id, self.ids[0])
+
+        # Assert
+        self.assertEqual(ChatDao.get_chat_by_participants(self.ids[1:3]), chat)
+
+    def test_key_follows_direct_participant_changes(self):
+        # Arrange
+        chat = Chat.objects.create(name="Direct")
+
+        # Act
+        chat.participants.add(*self.users[:2])
+        self.users[2].chats.add(chat)
+
+        # Assert
+        chat.refresh_from_db()
+        self.assertEqual(chat.participant_key, ChatDao.participant_key(self.ids[:3]))
+
+    def test_chats_left_with_one_participant_are_unkeyed(self):
+        # Arrange - the first user has a chat with each of the others
+        first, _ = self._get_or_create(self.ids[:2])
+        second, _ = self._get_or_create([self.ids[0], self.ids[2]])
+
+        # Act - both end up with the first user alone
+        ChatServices.remove_user(first.id, self.ids[1])
+        ChatServices.remove_user(second.id, self.ids[2])
+
+        # Assert
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertIsNone(first.participant_key)
+        self.assertIsNone(second.participant_key)
+
+    def test_unkeyed_duplicate_stays_unkeyed(self):
+        # Arrange - a duplicate left without a key by the backfill
+        canonical, _ = self._get_or_create(self.ids[:2])
+        duplicate = Chat.objects.create(name="Duplicate")
+        duplicate.participants.add(*self.users[:2])
+
+        # Act
+        ChatServices.add_user(duplicate.id, self.ids[2])
+        ChatServices.remove_user(duplicate.id, self.ids[2])
+
+        # Assert
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.participant_key)
+        self.assertEqual(ChatDao.get_chat_by_participants(self.ids[:2]), canonical)
+
+    def test_migration_unkeys_single_participant_chats(self):
+        # Arrange - keyed before chats with one participant were unkeyed
+        chat = Chat.objects.create(name="Solo")
+        chat.participants.add(self.users[0])
+        Chat.objects.filter(id=chat.id).update(participant_key="stale")
+        pair, _ = self._get_or_create(self.ids[:2])
+        migration = import_module(
+            "chats.migrations.0017_unkey_single_participant_chats"
+        )
+
+        # Act
+        migration.unkey_single_participant_chats(apps, None)
+
+        # Assert
+        chat.refresh_from_db()
+        self.assertIsNone(chat.participant_key)
+        self.assertEqual(ChatDao.get_chat_by_participants(self.ids[:2]), pair)
+
+    def test_update_to_existing_participant_set_is_rejected(self):
+        # Arrange
+        self._get_or_create(self.ids[:2])
+        other, _ = self._get_or_create(self.ids[:3])
+
+        # Act / Assert
+        with self.assertRaises(ValidationError):
+            ChatServices.update_chat_participants(other.id, self.ids[:2])
+        other.refresh_from_db()
+        self.assertEqual(other.participant_key, ChatDao.participant_key(self.ids[:3]))
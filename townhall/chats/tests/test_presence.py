@@ -0,0 +1,158 @@
+from unittest.mock import patch
+
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from chats.models import Chat
+from chats.presence import InMemoryPresenceBackend, get_presence
+from townhall.routing import websocket_urlpatterns
+from users.models import User
+from users.profile_cache import sender_profiles
+
+# Running only this specific test file:
+#   python3 manage.py test chats.tests.test_presence
+
+
+class InMemoryPresenceBackendTests(TestCase):
+    def test_user_stays_online_until_their_last_connection_leaves(self):
+        # Arrange
+        presence = InMemoryPresenceBackend()
+        presence.heartbeat(1, "tab-a")
+        presence.heartbeat(1, "tab-b")
+        presence.heartbeat(2, "tab-c")
+
+        # Act / Assert
+        presence.disconnect(1, "tab-a")
+        self.assertEqual(presence.online_among([1, 2, 3]), {1, 2})
+        presence.disconnect(1, "tab-b")
+        self.assertEqual(presence.online_among([1, 2, 3]), {2})
+
+    def test_connections_expire_without_heartbeats(self):
+        # Arrange
+        presence = InMemoryPresenceBackend(ttl=0)
+
+        # Act
+        presence.heartbeat(1, "tab-a")
+
+        # Assert
+        self.assertEqual(presence.online_among([1]), set())
+
+    def test_throttle_allows_one_event_per_interval(self):
+        # Arrange
+        presence = InMemoryPresenceBackend()
+
+        # Act / Assert
+        self.assertTrue(presence.throttle("typing:chat_1:1", 60))
+        self.assertFalse(presence.throttle("typing:chat_1:1", 60))
+        self.assertTrue(presence.throttle("typing:chat_1:2", 60))
+        self.assertTrue(presence.throttle("typing:chat_2:1", 0))
+        self.assertTrue(presence.throttle("typing:chat_2:1", 0))
+
+    def test_expired_throttles_are_pruned(self):
+        # Arrange
+        presence = InMemoryPresenceBackend()
+        for i in range(presence.PRUNE_AT):
+            presence.throttle(f"typing:chat_{i}:1", 0)
+
+        # Act
+        presence.throttle("typing:chat_live:1", 60)
+
+        # Assert
+        self.assertEqual(list(presence._throttles), ["typing:chat_live:1"])
+        self.assertFalse(presence.throttle("typing:chat_live:1", 60))
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class PresenceConsumerTests(TestCase):
+    def setUp(self):
+        sender_profiles.clear()
+        patcher = patch("chats.presence._backend", InMemoryPresenceBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.alice = User.objects.create(email="alice@example.com", full_name="Al")
+        self.bob = User.objects.create(email="bob@example.com")
+        self.chat = Chat.objects.create(name="Garden")
+        self.chat.participants.add(self.alice, self.bob)
+
+    async def _connect(self, path, user):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_user_socket_marks_user_online_until_it_closes(self):
+        # Act
+        communicator = await self._connect(f"/ws/users/{self.alice.id}/", self.alice)
+        await communicator.send_json_to({"type": "heartbeat"})
+        online = get_presence().online_among([self.alice.id, self.bob.id])
+        await communicator.disconnect()
+
+        # Assert
+        self.assertEqual(online, {self.alice.id})
+        self.assertEqual(get_presence().online_among([self.alice.id]), set())
+
+    async def test_typing_events_are_throttled_per_user(self):
+        # Arrange
+        path = f"/ws/chats/{self.chat.id}/"
+        alice = await self._connect(path, self.alice)
+        bob = await self._connect(path, self.bob)
+
+        # Act
+        for _ in range(3):
+            await alice.send_json_to({"action": "typing"})
+        event = await bob.receive_json_from()
+
+        # Assert
+        self.assertEqual(
+            event, {"type": "typing", "sender_id": self.alice.id, "full_name": "Al"}
+        )
+        self.assertTrue(await bob.receive_nothing())
+        await alice.disconnect()
+        await bob.disconnect()
+
+
+class OnlineUsersEndpointTests(TestCase):
+    def setUp(self):
+        self.presence = InMemoryPresenceBackend()
+        patcher = patch("chats.presence._backend", self.presence)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=User.objects.create(email="viewer@example.com")
+        )
+
+    def test_returns_online_subset_without_touching_the_database(self):
+        # Arrange
+        self.presence.heartbeat(7, "tab")
+        self.presence.heartbeat(3, "tab")
+
+        # Act
+        with self.assertNumQueries(0):
+            response = self.client.get("/presence/online/?user_ids=3,5,7,3")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["online"], [3, 7])
+
+    def test_rejects_bad_or_too_many_ids(self):
+        # Act
+        bad = self.client.get("/presence/online/?user_ids=1,abc")
+        many = ",".join(str(i) for i in range(501))
+        too_many = self.client.get(f"/presence/online/?user_ids={many}")
+
+        # Assert
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(too_many.status_code, 400)
+
+    def test_requires_authentication(self):
+        # Act
+        response = APIClient().get("/presence/online/?user_ids=1")
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
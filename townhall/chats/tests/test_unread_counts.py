@@ -0,0 +1,167 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chats.models import Chat, ChatReadStatus, Message
+from chats.services import ChatServices, MessageServices
+from chats.types import CreateMessageData
+from users.models import User
+
+# Running only this specific test file:
+#   python3 manage.py test chats.tests.test_unread_counts
+
+
+class TestUnreadCounts(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.reader = User.objects.create(email="reader@example.com")
+        self.sender = User.objects.create(email="sender@example.com", full_name="S")
+        self.client.force_authenticate(user=self.reader)
+
+    def _chat(self, other=None):
+        chat = Chat.objects.create(name="DM")
+        chat.participants.add(self.reader, other or self.sender)
+        return chat
+
+    def _send(self, chat, content="Hi", sender=None):
+        return MessageServices.create_message(
+            CreateMessageData(
+                user_id=(sender or self.sender).id,
+                chat_id=chat.id,
+                content=content,
+                sent_at=timezone.now(),
+            )
+        )
+
+    def _unread(self):
+        response = self.client.get("/chats/unread-counts/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"]
+
+    def test_counts_messages_since_mark_read(self):
+        # Arrange
+        chat = self._chat()
+        self._send(chat, "Message 0")
+        self.client.post(f"/chats/{chat.id}/read/")
+        self._send(chat, "Message 1")
+        self._send(chat, "Message 2")
+
+        # Act
+        data = self._unread()
+
+        # Assert
+        self.assertEqual(data[chat.id]["count"], 2)
+        self.assertEqual(data[chat.id]["last_message"], "Message 2")
+        self.assertEqual(data[chat.id]["sender_id"], self.sender.id)
+        self.assertEqual(data[chat.id]["sender_name"], "S")
+
+    def test_sender_is_not_counted(self):
+        # Arrange
+        chat = self._chat()
+
+        # Act
+        self._send(chat, sender=self.reader)
+
+        # Assert
+        self.assertEqual(self._unread(), {})
+        status = ChatReadStatus.objects.get(user=self.sender, chat=chat)
+        self.assertEqual(status.unread_count, 1)
+
+    def test_mark_read_resets_counter(self):
+        # Arrange
+        chat = self._chat()
+        self._send(chat)
+
+        # Act
+        response = self.client.post(f"/chats/{chat.id}/read/")
+
+        # Assert
+        self.assertEqual(response.data, {"success": True})
+        self.assertEqual(self._unread(), {})
+
+    def test_mark_read_missing_chat_returns_404(self):
+        # Act
+        response = self.client.post("/chats/9999/read/")
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+
+    def test_hidden_chats_are_skipped(self):
+        # Arrange
+        chat = self._chat()
+        self._send(chat)
+
+        # Act
+        chat.hidden_by.add(self.reader)
+
+        # Assert
+        self.assertEqual(self._unread(), {})
+
+    def test_removed_participants_are_skipped(self):
+        # Arrange
+        chat = Chat.objects.create(name="Group")
+        third = User.objects.create(email="third@example.com")
+        chat.participants.add(self.reader, self.sender, third)
+        self._send(chat)
+
+        # Act
+        ChatServices.remove_user(chat.id, self.reader.id)
+
+        # Assert
+        self.assertEqual(self._unread(), {})
+
+    def test_unread_counts_is_a_single_query(self):
+        # Arrange - session auth is forced, so only the counters are read
+        for i in range(5):
+            other = User.objects.create(email=f"other{i}@example.com")
+            self._send(self._chat(other), sender=other)
+
+        # Act / Assert
+        with self.assertNumQueries(1):
+            data = self._unread()
+        self.assertEqual(len(data), 5)
+
+    def test_deleting_unread_messages_updates_counters(self):
+        # Arrange
+        chat = self._chat()
+        first = self._send(chat, "Message 1")
+        last = self._send(chat, "Message 2")
+
+        # Act / Assert
+        MessageServices.delete_message(last.id)
+        data = self._unread()
+        self.assertEqual(data[chat.id]["count"], 1)
+        self.assertEqual(data[chat.id]["last_message"], "Message 1")
+        Message.objects.filter(id=first.id).delete()
+        self.assertEqual(self._unread(), {})
+
+    def test_failed_count_rolls_back_the_message(self):
+        # Arrange
+        chat = self._chat()
+
+        # Act
+        with patch(
+            "chats.daos.ChatDao.record_message", side_effect=RuntimeError("db down")
+        ):
+            with self.assertRaises(RuntimeError):
+                self._send(chat)
+
+        # Assert
+        self.assertFalse(Message.objects.exists())
+
+    def test_new_count_is_pushed_to_recipients(self):
+        # Arrange
+        chat = self._chat()
+        self._send(chat)
+
+        # Act
+        with patch("chats.services.fan_out") as fan_out:
+            self._send(chat)
+
+        # Assert
+        events = dict(fan_out.call_args.args[0])
+        self.assertEqual(events[f"user_{self.reader.id}"]["unread_count"], 2)
+        self.assertIsNone(events[f"user_{self.sender.id}"]["unread_count"])
+        self.assertEqual(events[f"user_{self.reader.id}"]["type"], "user_message")
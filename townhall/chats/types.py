@@ -16,6 +16,17 @@ class CreateMessageData:
     content: str
     image_content: Optional[str] = None
     sent_at: Optional[datetime] = None
+    client_key: Optional[str] = None
+
+
+@dataclass
+class CreateGroupMessageData:
+    user_id: int
+    group_name: str
+    content: str
+    image: Optional[str] = None
+    sent_at: Optional[datetime] = None
+    client_key: Optional[str] = None
 
 
 @dataclass
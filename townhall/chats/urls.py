@@ -43,6 +43,11 @@ urlpatterns = [
         ChatViewSet.as_view({"post": "mark_chat_read"}),
         name="mark_chat_read",
     ),
+    path(
+        "presence/online/",
+        ChatViewSet.as_view({"get": "get_online_users"}),
+        name="online_users",
+    ),
     path(
         "groups/<str:group_name>/messages/",
         ChatViewSet.as_view({"get": "get_group_messages"}),
@@ -10,12 +10,20 @@ from .serializers import (
     CreateChatSerializer,
     OptionalMessageSerializer,
 )
-from .services import ChatServices, MessageServices
-from .types import CreateChatData, CreateMessageData, UpdateMessageData
+from .services import (
+    ChatServices,
+    GroupMessageServices,
+    MessageServices,
+    PresenceServices,
+)
+from .types import (
+    CreateChatData,
+    CreateGroupMessageData,
+    CreateMessageData,
+    UpdateMessageData,
+)
 from django.utils import timezone
-from .models import Chat, Message, GroupMessage, ChatReadStatus
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .models import Chat, GroupMessage
 
 
 class ChatViewSet(viewsets.ModelViewSet):
@@ -190,9 +198,34 @@ class ChatViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="messages")
     @permission_classes([IsAuthenticated])
     def get_chat_messages(self, request, id):
-        messages = Message.objects.filter(chat_id=id).order_by("sent_at")
+        """
+        One page of the chat's history, oldest first: the newest ``limit``
+        messages (default 50, at most 100), or those just before/after a
+        cursor. Walk back with ``before`` until it is null to load the full
+        history, which this endpoint returned in one response until it was
+        paginated; poll with ``after`` for new messages.
+        """
+        try:
+            limit = int(request.query_params.get("limit", 50))
+            messages, before, after = MessageServices.get_chat_messages(
+                chat_id=id,
+                before=request.query_params.get("before"),
+                after=request.query_params.get("after"),
+                limit=limit,
+            )
+        except ValueError:
+            return Response(
+                {"message": "Invalid limit", "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValidationError as e:
+            return Response(
+                {"message": e.messages[0], "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         serializer = MessageSerializer(messages, many=True)
-        return Response({"messages": serializer.data})
+        return Response({"messages": serializer.data, "before": before, "after": after})
 
     # POST Message
     @action(detail=False, methods=["post"], url_path="direct-message")
@@ -210,36 +243,20 @@ class ChatViewSet(viewsets.ModelViewSet):
                     status=400,
                 )
 
-            message = Message.objects.create(
-                user=user, chat_id=chat_id, content=content, image_content=image
+            # Counts the message as unread for the other participants and
+            # pushes it to their user_<id> groups with the new count
+            message = MessageServices.create_message(
+                CreateMessageData(
+                    user_id=user.id,
+                    chat_id=chat_id,
+                    content=content,
+                    image_content=image,
+                    sent_at=timezone.now(),
+                )
             )
 
             # Unhide chat for all participants so the recipient sees it
-            chat = Chat.objects.get(id=chat_id)
-            chat.hidden_by.clear()
-
-            # Broadcast to all participants via channel layer (like bell notifications)
-            channel_layer = get_channel_layer()
-            if channel_layer:
-                participant_ids = list(
-                    chat.participants.values_list("id", flat=True)
-                )
-                for pid in participant_ids:
-                    async_to_sync(channel_layer.group_send)(
-                        f"user_{pid}",
-                        {
-                            "type": "user_message",
-                            "chat_id": chat_id,
-                            "message": content,
-                            "sender": user.id,
-                            "full_name": user.full_name,
-                            "profile_image": (
-                                user.profile_image.url
-                                if user.profile_image
-                                else None
-                            ),
-                        },
-                    )
+            Chat.objects.get(id=chat_id).hidden_by.clear()
 
             return Response(
                 {
@@ -269,38 +286,7 @@ class ChatViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="unread-counts")
     @permission_classes([IsAuthenticated])
     def get_unread_counts(self, request):
-        user = request.user
-
-        chats = Chat.objects.filter(participants=user).exclude(hidden_by=user)
-
-        result = {}
-        for chat in chats:
-            read_status = ChatReadStatus.objects.filter(
-                user=user, chat=chat
-            ).first()
-            last_read = read_status.last_read_at if read_status else None
-
-            msg_qs = Message.objects.filter(chat=chat).exclude(user=user)
-            if last_read:
-                msg_qs = msg_qs.filter(sent_at__gt=last_read)
-
-            count = msg_qs.count()
-            if count == 0:
-                continue
-
-            latest = msg_qs.order_by("-sent_at").first()
-            result[chat.id] = {
-                "count": count,
-                "sender_id": latest.user.id,
-                "sender_name": latest.user.full_name,
-                "sender_image": (
-                    latest.user.profile_image.url
-                    if latest.user.profile_image
-                    else None
-                ),
-                "last_message": latest.content,
-                "timestamp": latest.sent_at.isoformat(),
-            }
+        result = ChatServices.get_unread_counts(request.user.id)
 
         return Response({"success": True, "data": result})
 
@@ -309,19 +295,32 @@ class ChatViewSet(viewsets.ModelViewSet):
     @permission_classes([IsAuthenticated])
     def mark_chat_read(self, request, id):
         try:
-            chat = Chat.objects.get(id=id)
-            ChatReadStatus.objects.update_or_create(
-                user=request.user,
-                chat=chat,
-                defaults={"last_read_at": timezone.now()},
-            )
+            ChatServices.mark_chat_read(chat_id=id, user_id=request.user.id)
             return Response({"success": True})
-        except Chat.DoesNotExist:
+        except ValidationError:
             return Response(
                 {"success": False, "error": "Chat not found"},
                 status=404,
             )
 
+    # GET which of the given users are online (?user_ids=1,2,3)
+    @action(detail=False, methods=["get"], url_path="presence/online")
+    def get_online_users(self, request):
+        if not request.user.is_authenticated:
+            return Response(
+                {"error": "Not authenticated"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        raw_ids = request.query_params.get("user_ids", "")
+        user_ids = [part for part in raw_ids.split(",") if part.strip()]
+        try:
+            online = PresenceServices.get_online_users(user_ids)
+        except ValidationError as e:
+            return Response({"success": False, "error": e.messages[0]}, status=400)
+
+        return Response({"success": True, "data": {"online": online}})
+
     # GET Group Message
     @action(
         detail=False,
@@ -330,10 +329,30 @@ class ChatViewSet(viewsets.ModelViewSet):
     )
     @permission_classes([IsAuthenticated])
     def get_group_messages(self, request, group_name=None):
-        msgs = GroupMessage.objects.filter(group_name=group_name).order_by("sent_at")
+        """Paginated like get_chat_messages."""
+        try:
+            limit = int(request.query_params.get("limit", 50))
+            msgs, before, after = GroupMessageServices.get_group_messages(
+                group_name=group_name,
+                before=request.query_params.get("before"),
+                after=request.query_params.get("after"),
+                limit=limit,
+            )
+        except ValueError:
+            return Response(
+                {"message": "Invalid limit", "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValidationError as e:
+            return Response(
+                {"message": e.messages[0], "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         return Response(
             {
+                "before": before,
+                "after": after,
                 "messages": [
                     {
                         "id": m.id,
@@ -348,7 +367,7 @@ class ChatViewSet(viewsets.ModelViewSet):
                         "image": m.image.url if m.image else None,
                     }
                     for m in msgs
-                ]
+                ],
             }
         )
 
@@ -362,8 +381,13 @@ class ChatViewSet(viewsets.ModelViewSet):
             content = request.data.get("content", "")
             image = request.FILES.get("image", None)
 
-            msg = GroupMessage.objects.create(
-                user=user, group_name=group_name, content=content, image=image
+            msg = GroupMessageServices.create_group_message(
+                CreateGroupMessageData(
+                    user_id=user.id,
+                    group_name=group_name,
+                    content=content,
+                    image=image,
+                )
             )
 
             return Response(
@@ -1,8 +1,42 @@
-from django.core.cache import cache
-from .key_builder import build_list_key
+import math
+import random
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .key_builder import build_list_key, build_generation_key, build_versioned_key
+from .serializers import build_serializer
+from .tiered import build_default_cache
 
 
 class CacheFacade:
+    # Seconds an expired value is still served while one worker refreshes it
+    STALE_TTL = 300
+    # Upper bound on a recompute; the lock frees itself after this long
+    LOCK_TIMEOUT = 10
+    POLL_INTERVAL = 0.05
+    # XFetch aggressiveness: > 1 refreshes earlier, < 1 later
+    EARLY_EXPIRY_BETA = 1.0
+
+    def __init__(self, backend=None, serializer=None):
+        """
+        Args:
+            backend: Cache to use; defaults to the Django cache, or a
+                TieredCache when CACHE_LOCAL_TIER is configured.
+            serializer: Object with dumps/loads (see core.cache.serializers)
+                applied to cached values; defaults to CACHE_SERIALIZER, and
+                without one values are handed to the backend unchanged.
+        """
+        self.cache = backend if backend is not None else build_default_cache()
+        if serializer is None:
+            options = getattr(settings, "CACHE_SERIALIZER", None)
+            if options:
+                serializer = build_serializer(
+                    options["FORMAT"], options.get("COMPRESS_THRESHOLD")
+                )
+        self.serializer = serializer
+
     def get_list(self, model, filters: dict, timeout=60):
         """
         Retrieve a list of model instances from Redis cache or store if missing.
@@ -18,20 +52,126 @@ class CacheFacade:
         """
 
         key = build_list_key(model, filters)
+        return self._get_or_compute(
+            key, lambda: list(model.objects.filter(**filters).values()), timeout
+        )
+
+    def get_generation(self, namespace: str) -> int:
+        """
+        Return the current generation of a namespace of versioned keys.
+
+        A missing generation (first use, or evicted) restarts from the current
+        time in milliseconds so it can never fall back onto entries cached
+        under an older generation.
+        """
+        key = build_generation_key(namespace)
+        generation = self.cache.get(key)
+        if generation is None:
+            self.cache.add(key, int(time.time() * 1000), timeout=None)
+            generation = self.cache.get(key)
+        return generation
+
+    def bump_generation(self, namespace: str) -> None:
+        """
+        Invalidate every versioned entry in a namespace at once.
+
+        Old entries are never deleted, they just stop being addressed and
+        expire on their own TTL. When called inside a transaction the bump is
+        repeated on commit, so a reader that re-cached the pre-commit state in
+        between cannot keep serving it.
+        """
+        self._incr_generation(namespace)
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: self._incr_generation(namespace))
 
-        # 1. Try cache
-        cached_data = cache.get(key)
-        if cached_data is not None:
-            return cached_data
+    def get_versioned(self, namespace: str, params: dict, compute, timeout=60):
+        """
+        Read-through lookup of a value cached under the namespace generation.
+
+        Args:
+            namespace: Group of keys invalidated together by bump_generation.
+            params: Values identifying the entry within the namespace.
+            compute: Zero-argument callable producing the value on a miss.
+            timeout: TTL for the cache in seconds (default 60).
+        """
+        generation = self.get_generation(namespace)
+        key = build_versioned_key(namespace, generation, params)
+        return self._get_or_compute(key, compute, timeout)
+
+    def _get_or_compute(self, key: str, compute, timeout):
+        """
+        Read-through lookup with single-flight recomputation.
 
-        # 2. Query DB on cache miss
-        queryset = model.objects.filter(**filters)
-        data = list(queryset.values())
+        The value is kept STALE_TTL seconds past its timeout next to a
+        "<key>:expiry" marker holding (soft expiry, recompute duration).
+        Only the worker holding "<key>:lock" recomputes; everyone else keeps
+        serving the stale value, or on a cold miss waits for the winner.
+        Values are also refreshed early with a probability that rises as the
+        soft expiry approaches (XFetch), so hot keys rarely expire at all.
+        """
+        expiry_key = f"{key}:expiry"
+        cached = self.cache.get_many([key, expiry_key])
+        data = self._decode(cached.get(key))
+        if data is not None and not self._should_refresh(cached.get(expiry_key)):
+            return data
 
-        # 3. Write back to cache
-        cache.set(key, data, timeout)
+        lock_key = f"{key}:lock"
+        if self.cache.add(lock_key, 1, self.LOCK_TIMEOUT):
+            try:
+                return self._compute_and_store(key, compute, timeout)
+            finally:
+                self.cache.delete(lock_key)
 
+        if data is not None:
+            # Someone else is refreshing; stale is good enough meanwhile
+            return data
+
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            data = self._decode(self.cache.get(key))
+            if data is not None:
+                return data
+            if self.cache.get(lock_key) is None:
+                break
+
+        # The winner failed or timed out; compute without the lock
+        return self._compute_and_store(key, compute, timeout)
+
+    def _compute_and_store(self, key: str, compute, timeout):
+        started = time.monotonic()
+        data = compute()
+        delta = time.monotonic() - started
+        self.cache.set_many(
+            {key: self._encode(data), f"{key}:expiry": (time.time() + timeout, delta)},
+            timeout + self.STALE_TTL,
+        )
         return data
 
+    def _encode(self, value):
+        return self.serializer.dumps(value) if self.serializer else value
+
+    def _decode(self, value):
+        if value is None or not self.serializer:
+            return value
+        return self.serializer.loads(value)
+
+    def _should_refresh(self, expiry) -> bool:
+        if expiry is None:
+            # Written without a marker; trust the cache TTL
+            return False
+        soft_expiry, delta = expiry
+        # 1 - random() is in (0, 1], so the log is finite and <= 0
+        jitter = -delta * self.EARLY_EXPIRY_BETA * math.log(1.0 - random.random())
+        return time.time() + jitter >= soft_expiry
+
+    def _incr_generation(self, namespace: str) -> None:
+        key = build_generation_key(namespace)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # Missing generation: get_generation seeds a fresh one
+            self.get_generation(namespace)
+
 
 cache_facade = CacheFacade()
@@ -6,3 +6,23 @@ def build_list_key(model, filters: dict):
     filter_str = "&".join(parts) if parts else "all"
 
     return f"list:{model_name}:{filter_str}"
+
+
+def build_generation_key(namespace: str):
+    return f"gen:{namespace}"
+
+
+def build_versioned_key(namespace: str, generation: int, params: dict):
+    # sort for consistency
+    parts = [f"{k}={v}" for k, v in sorted(params.items())]
+    param_str = "&".join(parts) if parts else "all"
+
+    return f"{namespace}:v{generation}:{param_str}"
+
+
+def build_counter_key(name: str, owner_id):
+    return f"counter:{name}:{owner_id}"
+
+
+def build_throttle_key(name: str, owner_id):
+    return f"throttle:{name}:{owner_id}"
@@ -0,0 +1,94 @@
+import json
+import pickle
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class PickleSerializer:
+    """Lossless for any picklable value; the Django cache default."""
+
+    def dumps(self, value) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes):
+        return pickle.loads(data)
+
+
+class JSONSerializer:
+    """
+    Portable, but lossy: datetimes, UUIDs and Decimals come back as strings
+    and tuples as lists.
+    """
+
+    def dumps(self, value) -> bytes:
+        return json.dumps(value, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+
+class MsgpackSerializer:
+    """Compact binary JSON; lossy in the same way as JSONSerializer."""
+
+    def __init__(self):
+        import msgpack
+
+        self._msgpack = msgpack
+        self._encoder = DjangoJSONEncoder()
+
+    def dumps(self, value) -> bytes:
+        return self._msgpack.packb(value, default=self._encoder.default)
+
+    def loads(self, data: bytes):
+        return self._msgpack.unpackb(data)
+
+
+class CompressedSerializer:
+    """
+    Wraps another serializer and zlib-compresses payloads above a threshold.
+
+    A one-byte header records whether the payload was compressed, so the
+    threshold can change without invalidating what is already cached.
+    """
+
+    RAW = b"\x00"
+    ZLIB = b"\x01"
+
+    def __init__(self, inner, threshold: int = 1024, level: int = 6):
+        self.inner = inner
+        self.threshold = threshold
+        self.level = level
+
+    def dumps(self, value) -> bytes:
+        data = self.inner.dumps(value)
+        if len(data) >= self.threshold:
+            return self.ZLIB + zlib.compress(data, self.level)
+        return self.RAW + data
+
+    def loads(self, data: bytes):
+        header, payload = data[:1], data[1:]
+        if header == self.ZLIB:
+            payload = zlib.decompress(payload)
+        return self.inner.loads(payload)
+
+
+SERIALIZERS = {
+    "pickle": PickleSerializer,
+    "json": JSONSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+def build_serializer(name: str, compress_threshold: int = None):
+    """
+    Build a serializer by name ("pickle", "json" or "msgpack"), optionally
+    compressing payloads of compress_threshold bytes or more.
+    """
+    try:
+        serializer = SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown cache serializer: {name}")
+    if compress_threshold is not None:
+        serializer = CompressedSerializer(serializer, compress_threshold)
+    return serializer
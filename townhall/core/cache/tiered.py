@@ -0,0 +1,207 @@
+import json
+import logging
+import pickle
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class LocalInvalidationBus:
+    """Bus for a single process, where the local tier is the only copy."""
+
+    def subscribe(self, handler) -> None:
+        pass
+
+    def publish(self, keys) -> None:
+        pass
+
+
+class RedisInvalidationBus:
+    """
+    Broadcasts invalidated keys to every worker over Redis pub/sub.
+
+    keys=None means "clear everything". A worker ignores its own messages,
+    it has already updated its local tier by the time it publishes.
+    """
+
+    CHANNEL = "core.cache.invalidate"
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, url: str, channel: str = CHANNEL):
+        import redis
+
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._origin = uuid.uuid4().hex
+        self._handlers = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler) -> None:
+        with self._lock:
+            self._handlers.append(handler)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._listen, name="cache-invalidation", daemon=True
+                )
+                self._thread.start()
+
+    def publish(self, keys) -> None:
+        message = json.dumps({"origin": self._origin, "keys": keys})
+        try:
+            self._client.publish(self.channel, message)
+        except self._redis.RedisError:
+            # Other workers catch up when their local entries expire
+            logger.warning("Failed to broadcast cache invalidation", exc_info=True)
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self._dispatch(message["data"])
+            except self._redis.RedisError:
+                logger.warning("Cache invalidation listener lost Redis, retrying")
+                time.sleep(self.RECONNECT_DELAY)
+
+    def _dispatch(self, data) -> None:
+        payload = json.loads(data)
+        if payload["origin"] == self._origin:
+            return
+        for handler in self._handlers:
+            handler(payload["keys"])
+
+
+class TieredCache:
+    """
+    In-process LRU tier in front of the shared Django cache.
+
+    Reads try the local tier first and fill it from the shared one. Writes
+    go to both and broadcast the touched keys so other workers drop their
+    local copies. Atomic operations (add, incr) only run against the shared
+    tier. The local ttl bounds staleness if a broadcast is missed.
+
+    The local tier holds pickled copies, so callers always get a fresh
+    object they may modify, as with any out-of-process cache.
+    """
+
+    def __init__(self, shared, local: LRUCache, bus):
+        self.shared = shared
+        self.local = local
+        self.bus = bus
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self._stats_lock = threading.Lock()
+        bus.subscribe(self._invalidate_local)
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys) -> dict:
+        found = {
+            key: pickle.loads(data) for key, data in self.local.get_many(keys).items()
+        }
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.shared.get_many(missing)
+            self._count_shared(len(fetched), len(missing) - len(fetched))
+            if fetched:
+                self._set_local(fetched)
+                found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT) -> None:
+        self.set_many({key: value}, timeout)
+
+    def set_many(self, mapping: dict, timeout=DEFAULT_TIMEOUT) -> None:
+        self.shared.set_many(mapping, timeout)
+        self._set_local(mapping)
+        self.bus.publish(list(mapping))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT) -> bool:
+        added = self.shared.add(key, value, timeout)
+        if added:
+            self._forget([key])
+        return added
+
+    def incr(self, key, delta: int = 1) -> int:
+        value = self.shared.incr(key, delta)
+        self._forget([key])
+        return value
+
+    def delete(self, key) -> None:
+        self.delete_many([key])
+
+    def delete_many(self, keys) -> None:
+        keys = list(keys)
+        self.shared.delete_many(keys)
+        self._forget(keys)
+
+    def clear(self) -> None:
+        self.shared.clear()
+        self.local.clear()
+        self.bus.publish(None)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            shared = {"hits": self.shared_hits, "misses": self.shared_misses}
+        return {"local": self.local.stats(), "shared": shared}
+
+    def _set_local(self, mapping: dict) -> None:
+        self.local.set_many(
+            {
+                key: pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                for key, value in mapping.items()
+            }
+        )
+
+    def _forget(self, keys) -> None:
+        self.local.delete_many(keys)
+        self.bus.publish(keys)
+
+    def _invalidate_local(self, keys) -> None:
+        if keys is None:
+            self.local.clear()
+        else:
+            self.local.delete_many(keys)
+
+    def _count_shared(self, hits: int, misses: int) -> None:
+        with self._stats_lock:
+            self.shared_hits += hits
+            self.shared_misses += misses
+
+
+def build_invalidation_bus(channel: str = RedisInvalidationBus.CHANNEL):
+    """
+    Bus for in-process caches: Redis pub/sub on the given channel when
+    CACHE_LOCAL_TIER names a REDIS_URL, otherwise a no-op local bus.
+    """
+    options = getattr(settings, "CACHE_LOCAL_TIER", None) or {}
+    redis_url = options.get("REDIS_URL")
+    if redis_url:
+        return RedisInvalidationBus(redis_url, channel)
+    return LocalInvalidationBus()
+
+
+def build_default_cache():
+    """
+    Return the cache CacheFacade should talk to.
+
+    The local tier only pays off in front of a shared cache, so it is
+    enabled by settings.CACHE_LOCAL_TIER, which is set when REDIS_URL is.
+    """
+    options = getattr(settings, "CACHE_LOCAL_TIER", None)
+    if not options:
+        return cache
+    local = LRUCache(maxsize=options["MAXSIZE"], ttl=options["TTL"])
+    return TieredCache(cache, local, build_invalidation_bus())
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+# Sends awaited together; bounds the connections a single batch can hold
+BATCH_SIZE = 500
+
+
+def fan_out(messages, channel_layer=None) -> int:
+    """
+    Send many ``(group, event)`` pairs over the channel layer in one batch.
+
+    All sends share a single async_to_sync bridge and run concurrently, so
+    N recipients cost about one round trip per batch instead of N. Best
+    effort: failures are logged, never raised. Returns the number of sends
+    that succeeded.
+    """
+    channel_layer = channel_layer or get_channel_layer()
+    messages = list(messages)
+    if channel_layer is None or not messages:
+        return 0
+    try:
+        return async_to_sync(_send_all)(channel_layer, messages)
+    except Exception as error:
+        logger.warning("Channel layer fan-out failed: %s", error)
+        return 0
+
+
+def send_to_users(user_ids, event: dict, channel_layer=None) -> int:
+    """Send the same event to the ``user_<id>`` group of every user."""
+    return fan_out(((f"user_{uid}", event) for uid in user_ids), channel_layer)
+
+
+async def _send_all(channel_layer, messages) -> int:
+    sent = 0
+    for start in range(0, len(messages), BATCH_SIZE):
+        batch = messages[start : start + BATCH_SIZE]
+        results = await asyncio.gather(
+            *(channel_layer.group_send(group, event) for group, event in batch),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.warning(
+                "%d of %d channel layer sends failed: %s",
+                len(errors),
+                len(batch),
+                errors[0],
+            )
+        sent += len(batch) - len(errors)
+    return sent
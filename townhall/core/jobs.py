@@ -0,0 +1,103 @@
+import functools
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    A function that can also be run in the background with ``.delay()``.
+
+    Jobs are addressed by dotted path, so they must live at module level and
+    take JSON-serializable arguments (ids rather than model instances).
+    """
+
+    def __init__(self, func):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs) -> None:
+        enqueue(self.name, args, kwargs)
+
+
+def job(func) -> Job:
+    return Job(func)
+
+
+def enqueue(name: str, args=(), kwargs=None) -> None:
+    """
+    Queue a job once the current transaction commits, so the worker sees
+    the rows the request wrote (immediately when not in a transaction).
+    """
+    payload = json.dumps({"name": name, "args": list(args), "kwargs": kwargs or {}})
+    transaction.on_commit(lambda: get_backend().enqueue(payload))
+
+
+def run_job(payload: str) -> None:
+    """Execute one queued job; failures are logged and never propagate."""
+    close_old_connections()
+    try:
+        message = json.loads(payload)
+        import_string(message["name"])(*message["args"], **message["kwargs"])
+    except Exception:
+        logger.exception("Background job failed: %s", payload)
+    finally:
+        close_old_connections()
+
+
+class LocalBackend:
+    """
+    In-process backend. With workers=0 jobs run inline on enqueue, which
+    keeps tests deterministic; otherwise they run on a thread pool.
+    """
+
+    def __init__(self, workers: int = 0):
+        self._executor = ThreadPoolExecutor(workers) if workers else None
+
+    def enqueue(self, payload: str) -> None:
+        if self._executor is None:
+            run_job(payload)
+        else:
+            self._executor.submit(run_job, payload)
+
+
+class RedisBackend:
+    """Redis list backend; jobs are consumed by ``manage.py run_jobs``."""
+
+    def __init__(self, url: str, queue: str = "jobs"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.queue = queue
+
+    def enqueue(self, payload: str) -> None:
+        self._client.lpush(self.queue, payload)
+
+    def dequeue(self, timeout: int = 5):
+        item = self._client.brpop([self.queue], timeout=timeout)
+        return item[1].decode() if item else None
+
+
+_backend = None
+
+
+def get_backend():
+    """Backend configured by settings.JOB_QUEUE (inline LocalBackend if unset)."""
+    global _backend
+    if _backend is None:
+        options = getattr(settings, "JOB_QUEUE", None) or {"BACKEND": "local"}
+        if options["BACKEND"] == "redis":
+            _backend = RedisBackend(options["REDIS_URL"], options.get("QUEUE", "jobs"))
+        else:
+            _backend = LocalBackend(options.get("WORKERS", 0))
+    return _backend
@@ -0,0 +1,99 @@
+import timeit
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.cache.serializers import SERIALIZERS, build_serializer
+
+
+def sample_users(count: int) -> list:
+    """Rows shaped like User.objects.values() for a directory page."""
+    joined = timezone.now() - timedelta(days=400)
+    return [
+        {
+            "id": i,
+            "email": f"member{i}@example.org",
+            "full_name": f"Community Member {i}",
+            "pronouns": "they/them",
+            "title": "Volunteer coordinator",
+            "primary_organization": "Atria Housing Cooperative",
+            "other_organizations": "Tenants' union, food bank",
+            "other_networks": "",
+            "about_me": "Organizing shared meals and repair cafes. " * 4,
+            "skills_interests": "gardening, bookkeeping, facilitation",
+            "date_joined": joined + timedelta(hours=i),
+            "receive_emails": True,
+            "show_email": i % 2 == 0,
+            "show_in_directory": True,
+            "allow_dms": True,
+            "linkedin_url": f"https://www.linkedin.com/in/member{i}",
+            "facebook_url": None,
+            "x_url": None,
+            "instagram_url": None,
+            "bluesky_url": None,
+            "email_verified": True,
+            "is_active": True,
+            "is_staff": False,
+            "failed_login_attempts": 0,
+            "locked_until": None,
+            "is_verified": True,
+        }
+        for i in range(count)
+    ]
+
+
+def sample_posts(count: int) -> list:
+    """Rows shaped like Post.objects.values() for a feed page."""
+    now = timezone.now()
+    return [
+        {
+            "id": i,
+            "user_id": i % 25,
+            "content": (
+                "Reminder: the community garden work day is this Saturday. "
+                "Bring gloves, we have tools and snacks. "
+            )
+            * (1 + i % 3),
+            "created_at": now - timedelta(minutes=7 * i),
+            "likes": i % 40,
+            "pinned": i == 0,
+            "anonymous": i % 9 == 0,
+            "comment_count": i % 12,
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare encode/decode time and payload size of the cache serializers "
+        "on User and Post value lists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--compress-threshold", type=int, default=1024)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        datasets = {"users": sample_users(rows), "posts": sample_posts(rows)}
+
+        header = f"{'dataset':<8}{'serializer':<16}{'bytes':>9}{'enc us':>10}"
+        self.stdout.write(f"{header}{'dec us':>10}")
+        for dataset, value in datasets.items():
+            for name in SERIALIZERS:
+                for threshold in (None, options["compress_threshold"]):
+                    serializer = build_serializer(name, threshold)
+                    label = name if threshold is None else f"{name}+zlib"
+                    self._report(dataset, label, serializer, value, repeat)
+
+    def _report(self, dataset, label, serializer, value, repeat):
+        payload = serializer.dumps(value)
+        encode = timeit.timeit(lambda: serializer.dumps(value), number=repeat)
+        decode = timeit.timeit(lambda: serializer.loads(payload), number=repeat)
+        self.stdout.write(
+            f"{dataset:<8}{label:<16}{len(payload):>9}"
+            f"{encode / repeat * 1e6:>10.1f}{decode / repeat * 1e6:>10.1f}"
+        )
@@ -0,0 +1,50 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand
+
+from core.fanout import send_to_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-recipient group_send calls with core.fanout batches on the "
+        "in-memory channel layer, across recipient counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recipients", type=int, nargs="+", default=[10, 100, 1000, 5000]
+        )
+
+    def handle(self, *args, **options):
+        event = {"type": "notification_push", "notification": {"id": 1}}
+
+        self.stdout.write(f"{'recipients':>10}{'loop ms':>12}{'fan_out ms':>12}")
+        for count in options["recipients"]:
+            user_ids = range(count)
+
+            layer = self._layer_with_members(user_ids)
+            started = time.perf_counter()
+            for uid in user_ids:
+                async_to_sync(layer.group_send)(f"user_{uid}", event)
+            loop = time.perf_counter() - started
+
+            layer = self._layer_with_members(user_ids)
+            started = time.perf_counter()
+            send_to_users(user_ids, event, channel_layer=layer)
+            batched = time.perf_counter() - started
+
+            self.stdout.write(f"{count:>10}{loop * 1e3:>12.1f}{batched * 1e3:>12.1f}")
+
+    def _layer_with_members(self, user_ids):
+        # One connected socket per user so every send is actually delivered
+        layer = InMemoryChannelLayer(capacity=10)
+
+        async def join():
+            for uid in user_ids:
+                await layer.group_add(f"user_{uid}", f"socket.{uid}")
+
+        async_to_sync(join)()
+        return layer
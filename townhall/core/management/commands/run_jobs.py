@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.jobs import RedisBackend, get_backend, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs queued with Job.delay(). Only needed with the "
+        "Redis JOB_QUEUE backend; the local backend runs jobs in-process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for jobs.",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if not isinstance(backend, RedisBackend):
+            raise CommandError("JOB_QUEUE is not using the Redis backend.")
+
+        self.stdout.write(f"Waiting for jobs on '{backend.queue}'")
+        processed = 0
+        while True:
+            payload = backend.dequeue(timeout=1 if options["burst"] else 5)
+            if payload is None:
+                if options["burst"]:
+                    break
+                continue
+            run_job(payload)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
@@ -1,5 +1,11 @@
-from django.test import TestCase
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
 from django.core.cache import cache
+from django.db import connection
 
 from core.cache.cache_facade import cache_facade
 from users.models import Tag
@@ -62,3 +68,95 @@ class TestCacheFacade(TestCase):
         result = cache_facade.get_list(Tag, self.filters)
 
         self.assertEqual(result, expected_list)
+
+    def test_get_versioned_computes_once_per_generation(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return ["page"]
+
+        first = cache_facade.get_versioned("feed", {"page": 1}, compute)
+        second = cache_facade.get_versioned("feed", {"page": 1}, compute)
+
+        self.assertEqual(first, ["page"])
+        self.assertEqual(second, ["page"])
+        self.assertEqual(len(calls), 1)
+
+    def test_bump_generation_invalidates_versioned_entries(self):
+        cache_facade.get_versioned("feed", {"page": 1}, lambda: ["old"])
+        generation = cache_facade.get_generation("feed")
+
+        cache_facade.bump_generation("feed")
+
+        self.assertGreater(cache_facade.get_generation("feed"), generation)
+        result = cache_facade.get_versioned("feed", {"page": 1}, lambda: ["new"])
+        self.assertEqual(result, ["new"])
+
+    def test_expired_entry_is_served_stale_while_locked(self):
+        key = "list:Tag:name=Alice"
+        cache.set(key, [{"id": 999, "name": "Stale"}], 60)
+        cache.set(f"{key}:expiry", (time.time() - 1, 0.0), 60)
+        cache.add(f"{key}:lock", 1)
+
+        with self.assertNumQueries(0):
+            result = cache_facade.get_list(Tag, self.filters)
+
+        self.assertEqual(result, [{"id": 999, "name": "Stale"}])
+
+    def test_expired_entry_is_refreshed_by_lock_holder(self):
+        key = "list:Tag:name=Alice"
+        cache.set(key, [{"id": 999, "name": "Stale"}], 60)
+        cache.set(f"{key}:expiry", (time.time() - 1, 0.0), 60)
+
+        with self.assertNumQueries(1):
+            result = cache_facade.get_list(Tag, self.filters)
+
+        self.assertEqual(result, list(Tag.objects.filter(**self.filters).values()))
+        self.assertIsNone(cache.get(f"{key}:lock"))
+
+    def test_entry_is_refreshed_early_near_expiry(self):
+        key = "list:Tag:name=Alice"
+        cache_facade.get_list(Tag, self.filters)
+        # A slow recompute 5s before expiry, with an unlucky draw
+        cache.set(f"{key}:expiry", (time.time() + 5, 2.0), 60)
+
+        with mock.patch("core.cache.cache_facade.random.random", return_value=0.99):
+            with self.assertNumQueries(1):
+                cache_facade.get_list(Tag, self.filters)
+
+        soft_expiry, _ = cache.get(f"{key}:expiry")
+        self.assertGreater(soft_expiry, time.time() + 50)
+
+
+class TestCacheFacadeStampede(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        Tag.objects.create(name="Alice")
+        self.queries = []
+
+    def _slow_query(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        # Keep the recompute in flight while the other workers arrive
+        time.sleep(0.2)
+        return execute(sql, params, many, context)
+
+    def _get_list(self, barrier):
+        try:
+            with connection.execute_wrapper(self._slow_query):
+                barrier.wait()
+                return cache_facade.get_list(Tag, {"name": "Alice"})
+        finally:
+            connection.close()
+
+    def test_concurrent_misses_run_one_query(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self._get_list, [barrier] * workers))
+
+        self.assertEqual(len(self.queries), 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(results[0][0]["name"], "Alice")
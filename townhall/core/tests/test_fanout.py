@@ -0,0 +1,67 @@
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from django.test import SimpleTestCase
+
+from core.fanout import fan_out, send_to_users
+
+
+class FailingLayer(InMemoryChannelLayer):
+    async def group_send(self, group, message):
+        if group == "user_2":
+            raise ConnectionError("redis down")
+        await super().group_send(group, message)
+
+
+class TestFanOut(SimpleTestCase):
+    def _layer(self, layer, user_ids):
+        async def join():
+            for uid in user_ids:
+                await layer.group_add(f"user_{uid}", f"socket.{uid}")
+
+        async_to_sync(join)()
+        return layer
+
+    def _received(self, layer, uid):
+        return async_to_sync(layer.receive)(f"socket.{uid}")
+
+    def test_sends_each_event_to_its_group(self):
+        # Arrange
+        layer = self._layer(InMemoryChannelLayer(), [1, 2])
+
+        # Act
+        sent = fan_out(
+            [
+                ("user_1", {"type": "ping", "n": 1}),
+                ("user_2", {"type": "ping", "n": 2}),
+            ],
+            channel_layer=layer,
+        )
+
+        # Assert
+        self.assertEqual(sent, 2)
+        self.assertEqual(self._received(layer, 1)["n"], 1)
+        self.assertEqual(self._received(layer, 2)["n"], 2)
+
+    def test_send_to_users_reaches_every_user_group(self):
+        # Arrange
+        user_ids = list(range(1200))
+        layer = self._layer(InMemoryChannelLayer(), user_ids)
+
+        # Act
+        sent = send_to_users(user_ids, {"type": "ping"}, channel_layer=layer)
+
+        # Assert
+        self.assertEqual(sent, len(user_ids))
+        self.assertEqual(self._received(layer, 1199), {"type": "ping"})
+
+    def test_failed_sends_are_skipped_not_raised(self):
+        # Arrange
+        layer = self._layer(FailingLayer(), [1, 2, 3])
+
+        # Act
+        with self.assertLogs("core.fanout", level="WARNING"):
+            sent = send_to_users([1, 2, 3], {"type": "ping"}, channel_layer=layer)
+
+        # Assert
+        self.assertEqual(sent, 2)
+        self.assertEqual(self._received(layer, 3), {"type": "ping"})
@@ -0,0 +1,62 @@
+import json
+
+from django.test import TestCase
+
+from core.jobs import LocalBackend, job, run_job
+
+calls = []
+
+
+@job
+def record(value, label=""):
+    calls.append((value, label))
+
+
+@job
+def explode():
+    raise RuntimeError("boom")
+
+
+class TestJobs(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_runs_after_commit(self):
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delay(1, label="queued")
+            self.assertEqual(calls, [])
+
+        # Assert
+        self.assertEqual(calls, [(1, "queued")])
+
+    def test_job_can_still_be_called_directly(self):
+        # Act
+        record(2)
+
+        # Assert
+        self.assertEqual(calls, [(2, "")])
+
+    def test_arguments_must_be_json_serializable(self):
+        with self.assertRaises(TypeError):
+            record.delay(object())
+
+    def test_failing_job_is_logged_not_raised(self):
+        # Arrange
+        payload = json.dumps({"name": explode.name, "args": [], "kwargs": {}})
+
+        # Act / Assert
+        with self.assertLogs("core.jobs", level="ERROR"):
+            run_job(payload)
+
+    def test_threaded_local_backend_runs_jobs(self):
+        # Arrange
+        backend = LocalBackend(workers=2)
+        payload = json.dumps({"name": record.name, "args": [3], "kwargs": {}})
+
+        # Act
+        backend.enqueue(payload)
+        backend._executor.shutdown(wait=True)
+
+        # Assert
+        self.assertEqual(calls, [(3, "")])
@@ -1,5 +1,9 @@
 from django.test import TestCase
-from core.cache.key_builder import build_list_key
+from core.cache.key_builder import (
+    build_generation_key,
+    build_list_key,
+    build_versioned_key,
+)
 from users.models import Tag
 
 
@@ -45,3 +49,11 @@ class TestKeyBuilder(TestCase):
 
         # Assert
         self.assertEqual(key1, key2)
+
+    def test_build_versioned_key(self):
+        # Act
+        key = build_versioned_key("feed", 3, {"limit": 10, "page": 2})
+
+        # Assert
+        self.assertEqual(key, "feed:v3:limit=10&page=2")
+        self.assertEqual(build_generation_key("feed"), "gen:feed")
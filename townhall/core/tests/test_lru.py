@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase
+
+from core.cache.lru import LRUCache
+
+
+class TestLRUCache(SimpleTestCase):
+    def test_get_many_returns_only_hits(self):
+        # Arrange
+        lru = LRUCache(maxsize=4)
+        lru.set_many({"a": 1, "b": 2})
+
+        # Act
+        result = lru.get_many(["a", "c"])
+
+        # Assert
+        self.assertEqual(result, {"a": 1})
+
+    def test_evicts_least_recently_used(self):
+        # Arrange
+        lru = LRUCache(maxsize=2)
+        lru.set_many({"a": 1, "b": 2})
+        lru.get_many(["a"])
+
+        # Act
+        lru.set_many({"c": 3})
+
+        # Assert
+        self.assertEqual(lru.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+        self.assertEqual(len(lru), 2)
+
+    def test_expired_entries_are_misses(self):
+        # Arrange
+        lru = LRUCache(maxsize=4, ttl=0)
+        lru.set_many({"a": 1})
+
+        # Act
+        result = lru.get_many(["a"])
+
+        # Assert
+        self.assertEqual(result, {})
+        self.assertEqual(len(lru), 0)
+
+    def test_stats_count_hits_misses_and_evictions(self):
+        # Arrange
+        lru = LRUCache(maxsize=1)
+        lru.set_many({"a": 1, "b": 2})
+
+        # Act
+        lru.get_many(["a", "b"])
+
+        # Assert
+        self.assertEqual(
+            lru.stats(), {"size": 1, "hits": 1, "misses": 1, "evictions": 1}
+        )
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from core.cache.cache_facade import CacheFacade
+from core.cache.serializers import (
+    CompressedSerializer,
+    JSONSerializer,
+    build_serializer,
+)
+
+
+class TestCacheSerializers(SimpleTestCase):
+    def setUp(self):
+        self.rows = [
+            {"id": i, "content": "Garden work day " * 10, "pinned": False}
+            for i in range(20)
+        ]
+
+    def test_every_format_round_trips_plain_rows(self):
+        for name in ("pickle", "json", "msgpack"):
+            with self.subTest(serializer=name):
+                serializer = build_serializer(name)
+
+                self.assertEqual(
+                    serializer.loads(serializer.dumps(self.rows)), self.rows
+                )
+
+    def test_json_encodes_datetimes_as_strings(self):
+        # Arrange
+        created_at = datetime(2025, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+        # Act
+        result = JSONSerializer().loads(JSONSerializer().dumps([created_at]))
+
+        # Assert
+        self.assertEqual(result, ["2025-05-01T12:30:00Z"])
+
+    def test_compression_applies_above_threshold_only(self):
+        # Arrange
+        serializer = CompressedSerializer(JSONSerializer(), threshold=100)
+
+        # Act
+        small = serializer.dumps([1])
+        large = serializer.dumps(self.rows)
+
+        # Assert
+        self.assertEqual(small[:1], CompressedSerializer.RAW)
+        self.assertEqual(large[:1], CompressedSerializer.ZLIB)
+        self.assertLess(len(large), len(JSONSerializer().dumps(self.rows)))
+        self.assertEqual(serializer.loads(large), self.rows)
+
+    def test_unknown_serializer_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_serializer("yaml")
+
+    def test_facade_stores_encoded_values(self):
+        # Arrange
+        backend = LocMemCache("serializer-test", {})
+        backend.clear()
+        facade = CacheFacade(backend, build_serializer("msgpack", 64))
+
+        # Act
+        first = facade.get_versioned("feed", {}, lambda: self.rows)
+        second = facade.get_versioned("feed", {}, lambda: [])
+
+        # Assert
+        self.assertEqual(first, self.rows)
+        self.assertEqual(second, self.rows)
+        key = f"feed:v{facade.get_generation('feed')}:all"
+        self.assertIsInstance(backend.get(key), bytes)
@@ -0,0 +1,128 @@
+import json
+from unittest.mock import patch
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from core.cache.cache_facade import CacheFacade
+from core.cache.lru import LRUCache
+from core.cache.tiered import RedisInvalidationBus, TieredCache
+
+
+class SharedBus:
+    """Delivers invalidations between workers of one test, like pub/sub."""
+
+    def __init__(self):
+        self.handlers = []
+
+    def worker(self):
+        bus = self
+
+        class WorkerBus:
+            def subscribe(self, handler):
+                self.handler = handler
+                bus.handlers.append(handler)
+
+            def publish(self, keys):
+                for handler in bus.handlers:
+                    if handler is not self.handler:
+                        handler(keys)
+
+        return WorkerBus()
+
+
+class TestTieredCache(SimpleTestCase):
+    def setUp(self):
+        self.shared = LocMemCache("tiered-test", {})
+        self.shared.clear()
+        bus = SharedBus()
+        self.worker_a = TieredCache(self.shared, LRUCache(16, ttl=60), bus.worker())
+        self.worker_b = TieredCache(self.shared, LRUCache(16, ttl=60), bus.worker())
+
+    def test_second_read_is_served_locally(self):
+        # Arrange
+        self.shared.set("key", "value")
+
+        # Act
+        self.worker_a.get("key")
+        self.worker_a.get("key")
+
+        # Assert
+        stats = self.worker_a.stats()
+        self.assertEqual(stats["shared"], {"hits": 1, "misses": 0})
+        self.assertEqual(stats["local"]["hits"], 1)
+        self.assertEqual(stats["local"]["misses"], 1)
+
+    def test_local_hits_are_copies(self):
+        # Arrange
+        self.worker_a.set("page", [{"user": None}])
+        self.worker_a.get("page")[0]["user"] = "leaked"
+
+        # Act
+        page = self.worker_a.get("page")
+
+        # Assert
+        self.assertEqual(page, [{"user": None}])
+        self.assertEqual(self.worker_a.stats()["local"]["hits"], 2)
+
+    def test_write_invalidates_other_workers(self):
+        # Arrange
+        self.worker_a.set("key", "old")
+        self.assertEqual(self.worker_b.get("key"), "old")
+
+        # Act
+        self.worker_a.set("key", "new")
+
+        # Assert
+        self.assertEqual(self.worker_b.get("key"), "new")
+
+    def test_incr_invalidates_every_local_copy(self):
+        # Arrange
+        self.worker_a.set("generation", 1)
+        self.worker_b.get("generation")
+
+        # Act
+        self.worker_b.incr("generation")
+
+        # Assert
+        self.assertEqual(self.worker_a.get("generation"), 2)
+        self.assertEqual(self.worker_b.get("generation"), 2)
+
+    def test_delete_many_publishes_one_invalidation(self):
+        # Arrange
+        self.worker_a.set_many({"a": 1, "b": 2})
+        self.worker_b.get_many(["a", "b"])
+        bus = self.worker_a.bus
+
+        # Act
+        with patch.object(bus, "publish", wraps=bus.publish) as publish:
+            self.worker_a.delete_many(["a", "b"])
+
+        # Assert
+        publish.assert_called_once_with(["a", "b"])
+        self.assertEqual(self.worker_b.get_many(["a", "b"]), {})
+
+    def test_bump_generation_reaches_other_workers(self):
+        # Arrange
+        facade_a = CacheFacade(self.worker_a)
+        facade_b = CacheFacade(self.worker_b)
+        facade_b.get_versioned("feed", {}, lambda: "old")
+
+        # Act
+        facade_a.bump_generation("feed")
+
+        # Assert
+        self.assertEqual(facade_b.get_versioned("feed", {}, lambda: "new"), "new")
+
+    def test_redis_bus_ignores_its_own_messages(self):
+        # Arrange
+        bus = RedisInvalidationBus("redis://127.0.0.1:6379")
+        received = []
+        bus._handlers.append(received.append)
+
+        # Act
+        bus._dispatch(json.dumps({"origin": bus._origin, "keys": ["a"]}))
+        bus._dispatch(json.dumps({"origin": "other-worker", "keys": ["b"]}))
+
+        # Assert
+        self.assertEqual(received, [["b"]])
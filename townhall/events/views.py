@@ -77,27 +77,15 @@ class EventViewSet(viewsets.GenericViewSet):
             event = EventServices.create_event(create_data)
 
             try:
-                from notifications.services import NotificationServices
-                from notifications.types import CreateNotificationData
-                from users.models import User
-
-                user_ids = list(
-                    User.objects.filter(is_active=True)
-                    .exclude(id=request.user.id)
-                    .values_list("id", flat=True)
+                from notifications.jobs import notify_active_users
+
+                # Queued: with thousands of members the fan-out must not
+                # hold up the response
+                notify_active_users.delay(
+                    "new_event", request.user.id, event.id, event.title
                 )
-                for uid in user_ids:
-                    NotificationServices.create_and_push(
-                        CreateNotificationData(
-                            recipient_id=uid,
-                            actor_id=request.user.id,
-                            notification_type="new_event",
-                            target_id=event.id,
-                            detail=event.title,
-                        )
-                    )
             except Exception:
-                logger.exception("Failed to send new_event notifications")
+                logger.exception("Failed to queue new_event notifications")
 
             response_serializer = EventSerializer(event, context={"request": request})
             return Response(
@@ -149,24 +137,20 @@ class EventViewSet(viewsets.GenericViewSet):
             )
 
             try:
-                from notifications.services import NotificationServices
-                from notifications.types import CreateNotificationData
+                from notifications.jobs import notify_users
 
                 participant_ids = list(
                     updated_event.participants.values_list("id", flat=True)
                 )
-                for uid in participant_ids:
-                    NotificationServices.create_and_push(
-                        CreateNotificationData(
-                            recipient_id=uid,
-                            actor_id=request.user.id,
-                            notification_type="event_update",
-                            target_id=updated_event.id,
-                            detail=updated_event.title,
-                        )
-                    )
+                notify_users.delay(
+                    participant_ids,
+                    "event_update",
+                    request.user.id,
+                    updated_event.id,
+                    updated_event.title,
+                )
             except Exception:
-                logger.exception("Failed to send event_update notifications")
+                logger.exception("Failed to queue event_update notifications")
 
             response_serializer = EventSerializer(
                 updated_event, context={"request": request}
@@ -210,21 +194,17 @@ class EventViewSet(viewsets.GenericViewSet):
         EventServices.delete_event(event=event)
 
         try:
-            from notifications.services import NotificationServices
-            from notifications.types import CreateNotificationData
-
-            for uid in participant_ids:
-                NotificationServices.create_and_push(
-                    CreateNotificationData(
-                        recipient_id=uid,
-                        actor_id=request.user.id,
-                        notification_type="event_cancel",
-                        target_id=event_id,
-                        detail=event_title,
-                    )
-                )
+            from notifications.jobs import notify_users
+
+            notify_users.delay(
+                participant_ids,
+                "event_cancel",
+                request.user.id,
+                event_id,
+                event_title,
+            )
         except Exception:
-            logger.exception("Failed to send event_cancel notifications")
+            logger.exception("Failed to queue event_cancel notifications")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=["post"], url_path="participate")
@@ -1,4 +1,6 @@
 import typing
+from datetime import datetime
+from users.models import User
 from .models import Notification
 from .types import CreateNotificationData
 
@@ -12,8 +14,63 @@ class NotificationDao:
             notification_type=data.notification_type,
             target_id=data.target_id,
             detail=data.detail,
+            recent_actor_ids=[data.actor_id] if data.actor_id else [],
         )
 
+    @staticmethod
+    def bulk_create_notifications(
+        data: typing.List[CreateNotificationData],
+        batch_size: typing.Optional[int] = None,
+    ) -> typing.List[Notification]:
+        return Notification.objects.bulk_create(
+            [
+                Notification(
+                    recipient_id=item.recipient_id,
+                    actor_id=item.actor_id,
+                    notification_type=item.notification_type,
+                    target_id=item.target_id,
+                    detail=item.detail,
+                    recent_actor_ids=[item.actor_id] if item.actor_id else [],
+                )
+                for item in data
+            ],
+            batch_size=batch_size,
+        )
+
+    @staticmethod
+    def get_coalescable_notification(
+        recipient_id: int,
+        notification_type: str,
+        target_id: typing.Optional[int],
+        since: datetime,
+    ) -> typing.Optional[Notification]:
+        """Latest unread matching row created since `since`, locked for update."""
+        return (
+            Notification.objects.select_for_update()
+            .filter(
+                recipient_id=recipient_id,
+                notification_type=notification_type,
+                target_id=target_id,
+                is_read=False,
+                created_at__gte=since,
+            )
+            .order_by("-created_at")
+            .first()
+        )
+
+    @staticmethod
+    def lock_recipient(recipient_id: int) -> None:
+        """Hold the recipient's row lock until the transaction ends."""
+        list(User.objects.select_for_update().filter(id=recipient_id).values("id"))
+
+    @staticmethod
+    def save_notification(notification: Notification, fields: typing.List[str]):
+        notification.save(update_fields=fields)
+
+    @staticmethod
+    def get_actor(actor_id: int) -> typing.Optional[User]:
+        return User.objects.filter(id=actor_id).first()
+
     @staticmethod
     def get_notifications(
         user_id: int, limit: int = 30
@@ -35,6 +92,13 @@ class NotificationDao:
             recipient_id=user_id, is_read=False
         ).update(is_read=True)
 
+    @staticmethod
+    def mark_unread_as_read(notification_id: int, user_id: int) -> bool:
+        updated = Notification.objects.filter(
+            id=notification_id, recipient_id=user_id, is_read=False
+        ).update(is_read=True)
+        return updated > 0
+
     @staticmethod
     def mark_read(notification_id: int, user_id: int) -> bool:
         updated = Notification.objects.filter(
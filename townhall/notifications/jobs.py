@@ -0,0 +1,23 @@
+from core.jobs import job
+from users.models import User
+
+from .services import NotificationServices
+
+
+@job
+def notify_users(recipient_ids, notification_type, actor_id, target_id, detail=""):
+    """Background fan-out of one notification to a list of users."""
+    NotificationServices.create_and_push_many(
+        recipient_ids,
+        notification_type=notification_type,
+        actor_id=actor_id,
+        target_id=target_id,
+        detail=detail,
+    )
+
+
+@job
+def notify_active_users(notification_type, actor_id, target_id, detail=""):
+    """Background fan-out of one notification to every active user."""
+    recipient_ids = User.objects.filter(is_active=True).values_list("id", flat=True)
+    notify_users(list(recipient_ids), notification_type, actor_id, target_id, detail)
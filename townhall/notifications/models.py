@@ -29,6 +29,9 @@ class Notification(models.Model):
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     target_id = models.IntegerField(null=True, blank=True)
     detail = models.CharField(max_length=255, blank=True, default="")
+    # Coalesced rows stand for several actors; actor is the latest of them
+    actor_count = models.PositiveIntegerField(default=1)
+    recent_actor_ids = models.JSONField(default=list, blank=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
 
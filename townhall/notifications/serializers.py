@@ -14,6 +14,8 @@ class NotificationSerializer(serializers.ModelSerializer):
             "notification_type",
             "target_id",
             "detail",
+            "actor_count",
+            "recent_actor_ids",
             "is_read",
             "created_at",
         ]
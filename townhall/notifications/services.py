@@ -1,12 +1,28 @@
 import typing
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache.cache_facade import cache_facade
+from core.cache.key_builder import build_throttle_key
+from core.fanout import fan_out
 from .models import Notification
 from .types import CreateNotificationData
 from .daos import NotificationDao
+from .unread_counter import UnreadNotificationCounter
 
 
 class NotificationServices:
+    # Rows per INSERT in create_and_push_many
+    BULK_BATCH_SIZE = 500
+    # Post activity folded into one unread row per (recipient, type, target)
+    COALESCED_TYPES = {"like", "reaction", "comment"}
+    COALESCE_WINDOW = timedelta(hours=1)
+    RECENT_ACTORS = 3
+    # Minimum seconds between pushes of the same coalesced row
+    PUSH_THROTTLE = 30
+
     @staticmethod
     def get_notifications(
         user_id: int, limit: int = 30
@@ -15,14 +31,20 @@ class NotificationServices:
 
     @staticmethod
     def get_unread_count(user_id: int) -> int:
-        return NotificationDao.get_unread_count(user_id)
+        return UnreadNotificationCounter.get(user_id)
 
     @staticmethod
     def mark_all_read(user_id: int) -> int:
-        return NotificationDao.mark_all_read(user_id)
+        updated = NotificationDao.mark_all_read(user_id)
+        UnreadNotificationCounter.reset(user_id)
+        return updated
 
     @staticmethod
     def mark_read(notification_id: int, user_id: int) -> bool:
+        if NotificationDao.mark_unread_as_read(notification_id, user_id):
+            UnreadNotificationCounter.add([user_id], -1)
+            return True
+        # Already read, or not this user's notification
         return NotificationDao.mark_read(notification_id, user_id)
 
     @staticmethod
@@ -31,42 +53,177 @@ class NotificationServices:
         Create a notification in the database and push it
         to the recipient's WebSocket channel in real time.
 
+        Likes, reactions and comments are coalesced (see _coalesce), and
+        pushes of a coalesced row are throttled to one per PUSH_THROTTLE
+        seconds; clients pick up the latest state on their next fetch.
+
         Returns None if the actor is the same as the recipient.
         """
         if data.actor_id is not None and data.actor_id == data.recipient_id:
             return None
 
-        notification = NotificationDao.create_notification(data)
+        if (
+            data.notification_type in NotificationServices.COALESCED_TYPES
+            and data.actor_id is not None
+        ):
+            notification, created = NotificationServices._coalesce(data)
+        else:
+            notification, created = NotificationDao.create_notification(data), True
+
+        if created:
+            UnreadNotificationCounter.add([data.recipient_id], 1)
+        if NotificationServices._claim_push(notification.id) or created:
+            NotificationServices.push([notification])
+        return notification
+
+    @staticmethod
+    def create_and_push_many(
+        recipient_ids: typing.Iterable[int],
+        notification_type: str,
+        actor_id: typing.Optional[int] = None,
+        target_id: typing.Optional[int] = None,
+        detail: str = "",
+        batch_size: typing.Optional[int] = None,
+    ) -> typing.List[Notification]:
+        """
+        Create the same notification for many recipients and push them all.
+
+        Rows are inserted with bulk_create in chunks of batch_size (default
+        BULK_BATCH_SIZE), the actor is loaded once for every payload, and
+        the actor and duplicate ids are dropped from the recipients. Runs a
+        constant number of queries per chunk, whatever the recipient count.
+        """
+        recipients = [
+            recipient_id
+            for recipient_id in dict.fromkeys(recipient_ids)
+            if actor_id is None or recipient_id != actor_id
+        ]
+        if not recipients:
+            return []
 
-        actor_obj = None
-        if notification.actor:
-            actor_obj = {
-                "id": notification.actor_id,
-                "full_name": notification.actor.full_name or "",
-                "profile_image": (
-                    notification.actor.profile_image.url
-                    if notification.actor.profile_image else ""
-                ),
-            }
+        notifications = NotificationDao.bulk_create_notifications(
+            [
+                CreateNotificationData(
+                    recipient_id=recipient_id,
+                    notification_type=notification_type,
+                    actor_id=actor_id,
+                    target_id=target_id,
+                    detail=detail,
+                )
+                for recipient_id in recipients
+            ],
+            batch_size=batch_size or NotificationServices.BULK_BATCH_SIZE,
+        )
+
+        UnreadNotificationCounter.add(recipients, 1)
+
+        actor = NotificationDao.get_actor(actor_id) if actor_id else None
+        NotificationServices.push(
+            notifications, NotificationServices._actor_payload(actor)
+        )
+        return notifications
+
+    @staticmethod
+    def push(
+        notifications: typing.List[Notification],
+        actor_payload: typing.Optional[dict] = None,
+    ) -> None:
+        """
+        Push notifications to their recipients' user_<id> groups.
+
+        Pass actor_payload when every notification shares one actor, to
+        avoid loading notification.actor once per row.
+        """
+        fan_out(
+            (
+                f"user_{notification.recipient_id}",
+                {
+                    "type": "notification_push",
+                    "notification": NotificationServices._payload(
+                        notification,
+                        actor_payload
+                        or NotificationServices._actor_payload(notification.actor),
+                    ),
+                },
+            )
+            for notification in notifications
+        )
 
-        payload = {
+    @staticmethod
+    def _coalesce(
+        data: CreateNotificationData,
+    ) -> typing.Tuple[Notification, bool]:
+        """
+        Fold data into the recipient's unread notification of the same type
+        and target from the last COALESCE_WINDOW, or create one. The row
+        keeps the latest RECENT_ACTORS actors, newest first, and moves to
+        the top of the list. actor_count counts distinct actors as far as
+        the recent list can tell, so a repeat actor who already dropped off
+        it is counted again.
+
+        Returns (notification, created).
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Row locks cannot cover a row that does not exist yet, so take
+            # the recipient's lock first: concurrent activity for the same
+            # recipient then finds the row the first one created
+            NotificationDao.lock_recipient(data.recipient_id)
+            notification = NotificationDao.get_coalescable_notification(
+                data.recipient_id,
+                data.notification_type,
+                data.target_id,
+                now - NotificationServices.COALESCE_WINDOW,
+            )
+            if notification is None:
+                return NotificationDao.create_notification(data), True
+
+            recent = notification.recent_actor_ids or [notification.actor_id]
+            if data.actor_id not in recent:
+                notification.actor_count += 1
+            notification.recent_actor_ids = [data.actor_id] + [
+                actor_id for actor_id in recent if actor_id != data.actor_id
+            ][: NotificationServices.RECENT_ACTORS - 1]
+            notification.actor_id = data.actor_id
+            notification.detail = data.detail
+            notification.created_at = now
+            NotificationDao.save_notification(
+                notification,
+                ["actor", "actor_count", "recent_actor_ids", "detail", "created_at"],
+            )
+            return notification, False
+
+    @staticmethod
+    def _claim_push(notification_id: int) -> bool:
+        """True at most once per PUSH_THROTTLE seconds for a notification."""
+        return cache_facade.cache.add(
+            build_throttle_key("notifications_push", notification_id),
+            1,
+            NotificationServices.PUSH_THROTTLE,
+        )
+
+    @staticmethod
+    def _actor_payload(actor) -> typing.Optional[dict]:
+        if actor is None:
+            return None
+        return {
+            "id": actor.id,
+            "full_name": actor.full_name or "",
+            "profile_image": actor.profile_image.url if actor.profile_image else "",
+        }
+
+    @staticmethod
+    def _payload(
+        notification: Notification, actor_payload: typing.Optional[dict]
+    ) -> dict:
+        return {
             "id": notification.id,
             "notification_type": notification.notification_type,
-            "actor": actor_obj,
+            "actor": actor_payload,
             "target_id": notification.target_id,
             "detail": notification.detail,
+            "actor_count": notification.actor_count,
+            "recent_actor_ids": notification.recent_actor_ids,
             "is_read": False,
             "created_at": str(notification.created_at),
         }
-
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            async_to_sync(channel_layer.group_send)(
-                f"user_{data.recipient_id}",
-                {
-                    "type": "notification_push",
-                    "notification": payload,
-                },
-            )
-
-        return notification
@@ -0,0 +1,360 @@
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from events.models import Event
+from notifications.daos import NotificationDao
+from notifications.models import Notification
+from notifications.services import NotificationServices
+from notifications.types import CreateNotificationData
+from users.models import User
+
+# Running only this specific test file:
+#   python3 manage.py test notifications.tests
+
+
+class TestEventNotifications(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = User.objects.create(
+            email="organizer@example.com", full_name="Organizer", is_staff=True
+        )
+        self.members = [
+            User.objects.create(email=f"member{i}@example.com") for i in range(5)
+        ]
+        User.objects.create(email="inactive@example.com", is_active=False)
+        self.client.force_authenticate(user=self.organizer)
+
+    def _create_event(self):
+        return self.client.post(
+            "/event/",
+            {
+                "title": "Work day",
+                "date": date(2030, 5, 1),
+                "time": "9:00 AM",
+                "location": "Garden",
+            },
+            format="json",
+        )
+
+    def test_create_event_queues_notifications_until_commit(self):
+        # Act
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self._create_event()
+
+        # Assert - nothing is written inside the request
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_create_event_notifies_every_other_active_user(self):
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._create_event()
+
+        # Assert
+        notified = set(
+            Notification.objects.filter(
+                notification_type="new_event",
+                target_id=response.data["event"]["id"],
+            ).values_list("recipient_id", flat=True)
+        )
+        self.assertEqual(notified, {member.id for member in self.members})
+
+    def test_cancel_notifies_participants(self):
+        # Arrange
+        event = Event.objects.create(
+            title="Work day",
+            date=date(2030, 5, 1),
+            time="9:00 AM",
+            location="Garden",
+            admin=self.organizer,
+        )
+        event.participants.add(*self.members[:2])
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/event/{event.id}/")
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            set(
+                Notification.objects.filter(
+                    notification_type="event_cancel"
+                ).values_list("recipient_id", flat=True)
+            ),
+            {self.members[0].id, self.members[1].id},
+        )
+
+
+class TestCreateAndPushMany(TestCase):
+    def setUp(self):
+        self.actor = User.objects.create(email="actor@example.com", full_name="Ann")
+
+    def _users(self, count):
+        start = User.objects.count()
+        return [
+            User.objects.create(email=f"user{start + i}@example.com").id
+            for i in range(count)
+        ]
+
+    def _create(self, recipient_ids, **kwargs):
+        with patch("notifications.services.fan_out") as fan_out:
+            notifications = NotificationServices.create_and_push_many(
+                recipient_ids,
+                notification_type="new_event",
+                actor_id=self.actor.id,
+                target_id=7,
+                detail="Work day",
+                **kwargs,
+            )
+        return notifications, list(fan_out.call_args.args[0])
+
+    def test_query_count_is_constant_in_recipients(self):
+        # Arrange
+        few, many = self._users(3), self._users(40)
+
+        # Act / Assert - one INSERT and one actor lookup either way
+        with self.assertNumQueries(2):
+            self._create(few)
+        with self.assertNumQueries(2):
+            self._create(many)
+
+    def test_inserts_in_configured_chunks(self):
+        # Arrange
+        recipients = self._users(25)
+
+        # Act / Assert - three INSERTs of at most 10 rows, one actor lookup
+        with self.assertNumQueries(4):
+            notifications, _ = self._create(recipients, batch_size=10)
+        self.assertEqual(len(notifications), 25)
+
+    def test_skips_actor_and_duplicate_recipients(self):
+        # Arrange
+        recipients = self._users(2)
+
+        # Act
+        notifications, _ = self._create([self.actor.id, *recipients, recipients[0]])
+
+        # Assert
+        self.assertEqual([n.recipient_id for n in notifications], recipients)
+
+    def test_pushes_one_payload_per_recipient_with_shared_actor(self):
+        # Arrange
+        recipients = self._users(2)
+
+        # Act
+        notifications, messages = self._create(recipients)
+
+        # Assert
+        self.assertEqual(
+            [group for group, _ in messages], [f"user_{r}" for r in recipients]
+        )
+        payload = messages[0][1]["notification"]
+        self.assertEqual(payload["id"], notifications[0].id)
+        self.assertEqual(payload["actor"]["full_name"], "Ann")
+        self.assertEqual(payload["detail"], "Work day")
+
+
+@patch("notifications.services.fan_out")
+class TestUnreadNotificationCounter(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.actor = User.objects.create(email="actor@example.com")
+        self.user = User.objects.create(email="reader@example.com")
+        self.client.force_authenticate(user=self.user)
+
+    def _notify(self):
+        return NotificationServices.create_and_push(
+            CreateNotificationData(
+                recipient_id=self.user.id,
+                notification_type="post_like",
+                actor_id=self.actor.id,
+                target_id=1,
+            )
+        )
+
+    def _poll(self):
+        response = self.client.get("/notifications/unread-count/")
+        return response.data["unread_count"]
+
+    def test_polling_a_warm_counter_skips_the_database(self, _):
+        # Arrange
+        self._notify()
+        self._poll()
+
+        # Act / Assert
+        with self.assertNumQueries(0):
+            count = NotificationServices.get_unread_count(self.user.id)
+        self.assertEqual(count, 1)
+
+    def test_counter_follows_creates_and_reads(self, _):
+        # Arrange
+        first = self._notify()
+        self._notify()
+        self.assertEqual(self._poll(), 2)
+
+        # Act / Assert
+        NotificationServices.mark_read(first.id, self.user.id)
+        self.assertEqual(self._poll(), 1)
+        NotificationServices.mark_read(first.id, self.user.id)
+        self.assertEqual(self._poll(), 1)
+        self._notify()
+        NotificationServices.create_and_push_many(
+            [self.user.id], "new_event", actor_id=self.actor.id, target_id=2
+        )
+        self.assertEqual(self._poll(), 3)
+        NotificationServices.mark_all_read(self.user.id)
+        self.assertEqual(self._poll(), 0)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+    def test_missing_counter_is_recounted(self, _):
+        # Arrange
+        Notification.objects.create(recipient=self.user, notification_type="x")
+        cache.clear()
+
+        # Act / Assert
+        self.assertEqual(self._poll(), 1)
+
+    def test_negative_drift_is_reconciled(self, _):
+        # Arrange - the counter missed a notification that was then read
+        self._poll()
+        notification = Notification.objects.create(
+            recipient=self.user, notification_type="x"
+        )
+
+        # Act
+        NotificationServices.mark_read(notification.id, self.user.id)
+        self._notify()
+
+        # Assert
+        self.assertEqual(self._poll(), 1)
+
+    def test_fan_out_drops_counters_in_one_call(self, _):
+        # Arrange
+        other = User.objects.create(email="other@example.com")
+        self._poll()
+        NotificationServices.get_unread_count(other.id)
+
+        # Act
+        with patch.object(cache, "delete_many", wraps=cache.delete_many) as delete:
+            NotificationServices.create_and_push_many(
+                [self.user.id, other.id], "new_event", actor_id=self.actor.id
+            )
+
+        # Assert
+        self.assertEqual(delete.call_count, 1)
+        self.assertEqual(self._poll(), 1)
+        self.assertEqual(NotificationServices.get_unread_count(other.id), 1)
+
+
+@patch("notifications.services.fan_out")
+class TestNotificationCoalescing(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(email="author@example.com")
+        self.fans = [User.objects.create(email=f"fan{i}@example.com") for i in range(5)]
+
+    def _like(self, actor, target_id=1, notification_type="like"):
+        return NotificationServices.create_and_push(
+            CreateNotificationData(
+                recipient_id=self.author.id,
+                notification_type=notification_type,
+                actor_id=actor.id,
+                target_id=target_id,
+            )
+        )
+
+    def test_activity_on_a_target_updates_one_row(self, fan_out):
+        # Act
+        for fan in self.fans:
+            self._like(fan)
+
+        # Assert
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 5)
+        self.assertEqual(notification.actor_id, self.fans[4].id)
+        self.assertEqual(
+            notification.recent_actor_ids, [fan.id for fan in self.fans[:1:-1]]
+        )
+        self.assertEqual(NotificationServices.get_unread_count(self.author.id), 1)
+
+    def test_repeat_actor_is_not_counted_twice(self, fan_out):
+        # Act
+        self._like(self.fans[0])
+        self._like(self.fans[1])
+        notification = self._like(self.fans[0])
+
+        # Assert
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(
+            notification.recent_actor_ids, [self.fans[0].id, self.fans[1].id]
+        )
+
+    def test_pushes_for_a_row_are_throttled(self, fan_out):
+        # Act
+        for fan in self.fans:
+            self._like(fan)
+
+        # Assert - only the first event pushes within the throttle window
+        self.assertEqual(fan_out.call_count, 1)
+        cache.clear()
+        self._like(User.objects.create(email="late@example.com"))
+        self.assertEqual(fan_out.call_count, 2)
+        payload = list(fan_out.call_args.args[0])[0][1]["notification"]
+        self.assertEqual(payload["actor_count"], 6)
+
+    def test_recipient_is_locked_before_looking_for_a_row(self, fan_out):
+        # Arrange
+        dao = Mock()
+        dao.lookup.return_value = None
+
+        # Act
+        with patch.object(NotificationDao, "lock_recipient", dao.lock):
+            with patch.object(
+                NotificationDao, "get_coalescable_notification", dao.lookup
+            ):
+                self._like(self.fans[0])
+
+        # Assert
+        self.assertEqual([call[0] for call in dao.mock_calls], ["lock", "lookup"])
+        dao.lock.assert_called_once_with(self.author.id)
+
+    def test_new_row_for_read_stale_or_different_notifications(self, fan_out):
+        # Arrange
+        first = self._like(self.fans[0])
+        NotificationServices.mark_read(first.id, self.author.id)
+        second = self._like(self.fans[1])
+        Notification.objects.filter(id=second.id).update(
+            created_at=second.created_at - timedelta(hours=2)
+        )
+
+        # Act
+        self._like(self.fans[2])
+        self._like(self.fans[2], target_id=2)
+        self._like(self.fans[2], notification_type="comment")
+
+        # Assert
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(fan_out.call_count, 5)
+
+    def test_like_endpoint_coalesces(self, fan_out):
+        # Arrange
+        from posts.models import Post
+
+        post = Post.objects.create(user=self.author, content="Garden day")
+        client = APIClient()
+
+        # Act
+        for fan in self.fans[:3]:
+            client.force_authenticate(user=fan)
+            client.patch(f"/post/{post.id}/like/")
+
+        # Assert
+        notification = Notification.objects.get(target_id=post.id)
+        self.assertEqual(notification.actor_count, 3)
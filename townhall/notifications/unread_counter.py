@@ -0,0 +1,63 @@
+import typing
+
+from core.cache.cache_facade import cache_facade
+from core.cache.key_builder import build_counter_key
+
+from .daos import NotificationDao
+
+
+class UnreadNotificationCounter:
+    """
+    Per-user unread notification count kept in the cache.
+
+    NotificationServices adjusts it as notifications are created and read,
+    so polling the count does not touch the notifications table. It heals
+    itself from the database: a missing counter is recounted on read, one
+    that drifts below zero is dropped and recounted, and every counter is
+    recounted at least once per TIMEOUT, which bounds the error a race
+    between a recount and a concurrent write can leave behind.
+    """
+
+    NAME = "notifications_unread"
+    TIMEOUT = 600
+
+    @staticmethod
+    def get(user_id: int) -> int:
+        cache = cache_facade.cache
+        key = build_counter_key(UnreadNotificationCounter.NAME, user_id)
+        count = cache.get(key)
+        if count is None or count < 0:
+            count = NotificationDao.get_unread_count(user_id)
+            cache.set(key, count, UnreadNotificationCounter.TIMEOUT)
+        return count
+
+    @staticmethod
+    def add(user_ids: typing.Iterable[int], delta: int) -> None:
+        """
+        Adjust the counter of a single user in place. For several users the
+        counters are dropped in one delete_many, with one invalidation, and
+        recounted on their next read; missing counters are never created.
+        """
+        cache = cache_facade.cache
+        keys = [
+            build_counter_key(UnreadNotificationCounter.NAME, user_id)
+            for user_id in dict.fromkeys(user_ids)
+        ]
+        if len(keys) != 1:
+            if keys:
+                cache.delete_many(keys)
+            return
+        try:
+            count = cache.incr(keys[0], delta)
+        except ValueError:
+            return
+        if count < 0:
+            cache.delete(keys[0])
+
+    @staticmethod
+    def reset(user_id: int) -> None:
+        cache_facade.cache.set(
+            build_counter_key(UnreadNotificationCounter.NAME, user_id),
+            0,
+            UnreadNotificationCounter.TIMEOUT,
+        )
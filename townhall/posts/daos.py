@@ -1,10 +1,22 @@
 import re
 import typing
+from collections import defaultdict
+from datetime import datetime, timedelta
 
-from django.db.models import Count
+from django.db.models import F, Prefetch, Q, QuerySet
 from django.forms import ValidationError
-from django.db import IntegrityError
-from .models import Post, Comment, ReportedPost, Reaction, Tag
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import (
+    Post,
+    Comment,
+    ReportedPost,
+    Reaction,
+    PostReactionCount,
+    TrendingTag,
+)
+from core.cache.cache_facade import cache_facade
+from users.daos import TagDao
 from .types import (
     CreatePostData,
     UpdatePostData,
@@ -16,30 +28,118 @@ from .types import (
 
 
 class PostDao:
+    # "-id" breaks ties between posts created in the same instant so the
+    # ordering is total, which keyset pagination relies on.
+    FEED_ORDERING = ("-pinned", "-created_at", "-id")
+    # Generation namespace of the cached feed pages (see posts.feed_cache)
+    FEED_CACHE_NAMESPACE = "post_feed"
+
+    def feed_queryset() -> QuerySet[Post]:
+        """Posts with everything PostSerializer renders loaded up front.
+
+        A page of posts costs a fixed number of queries (one per relation)
+        no matter how many posts, comments, reactions or likes it holds.
+        """
+        return Post.objects.select_related("user").prefetch_related(
+            "tags",
+            "liked_by",
+            Prefetch("comment_set", queryset=Comment.objects.select_related("user")),
+            Prefetch("reactions", queryset=Reaction.objects.select_related("user")),
+        )
+
+    def compact_feed_queryset() -> QuerySet[Post]:
+        """Posts loaded for PostFeedSerializer: counters instead of user lists.
+
+        Nothing here depends on the viewer; see get_viewer_state.
+        """
+        return Post.objects.select_related("user").prefetch_related(
+            "tags", "reaction_counts"
+        )
+
+    def get_viewer_state(
+        viewer_id: int, post_ids: list[int]
+    ) -> tuple[set[int], dict[int, list[str]]]:
+        """Return which of post_ids the viewer liked and their reactions."""
+        liked = set(
+            Post.liked_by.through.objects.filter(
+                user_id=viewer_id, post_id__in=post_ids
+            ).values_list("post_id", flat=True)
+        )
+        reactions = defaultdict(list)
+        for post_id, reaction_type in Reaction.objects.filter(
+            user_id=viewer_id, post_id__in=post_ids
+        ).values_list("post_id", "reaction_type"):
+            reactions[post_id].append(reaction_type)
+        return liked, dict(reactions)
 
     def get_post(id: int) -> typing.Optional[Post]:
-        return Post.objects.prefetch_related('tags').get(id=id)
+        return PostDao.feed_queryset().get(id=id)
+
+    def get_post_reactions(id: int) -> Post:
+        """The post's author id and reactions only, for the reaction toggle."""
+        return (
+            Post.objects.only("id", "user_id")
+            .prefetch_related(
+                Prefetch("reactions", queryset=Reaction.objects.select_related("user"))
+            )
+            .get(id=id)
+        )
 
     def get_all_posts(
-        offset: int, limit: int, tag_names: list[str] | None = None
+        offset: int,
+        limit: int,
+        tag_names: list[str] | None = None,
+        compact: bool = False,
     ) -> tuple[typing.List[Post], int]:
         """Return recent posts paginated with total count,
         optionally filtered by tags."""
-        qs = Post.objects.prefetch_related('tags').order_by("-pinned", "-created_at")
-        if tag_names:
-            qs = qs.filter(tags__name__in=tag_names).distinct()
+        qs = PostDao._feed_page_queryset(tag_names, compact)
         total_count = qs.count()
         items = list(qs[offset : offset + limit])
         return items, total_count
 
+    def get_posts_after_cursor(
+        cursor: tuple[bool, datetime, int] | None,
+        limit: int,
+        tag_names: list[str] | None = None,
+        compact: bool = False,
+    ) -> typing.List[Post]:
+        """Return up to ``limit`` posts that sort strictly after ``cursor``.
+
+        ``cursor`` is the ``(pinned, created_at, id)`` of the last post the
+        client has seen, so the query seeks straight to the next page instead
+        of scanning and discarding an OFFSET worth of rows.
+        """
+        qs = PostDao._feed_page_queryset(tag_names, compact)
+        if cursor is not None:
+            pinned, created_at, post_id = cursor
+            qs = qs.filter(
+                Q(pinned__lt=pinned)
+                | Q(pinned=pinned, created_at__lt=created_at)
+                | Q(pinned=pinned, created_at=created_at, id__lt=post_id)
+            )
+        return list(qs[:limit])
+
+    def _feed_page_queryset(
+        tag_names: list[str] | None, compact: bool
+    ) -> QuerySet[Post]:
+        if compact:
+            qs = PostDao.compact_feed_queryset()
+        else:
+            qs = PostDao.feed_queryset()
+        qs = qs.order_by(*PostDao.FEED_ORDERING)
+        if tag_names:
+            qs = qs.filter(tags__name__in=tag_names).distinct()
+        return qs
+
     def get_trending_tags(limit: int = 10) -> list[dict]:
-        """Return tags sorted by post usage count."""
-        tags = (
-            Tag.objects.annotate(post_count=Count("posts", distinct=True))
-            .filter(post_count__gte=2)
-            .order_by("-post_count")[:limit]
+        """Return tags sorted by their materialized trending score."""
+        trending = (
+            TrendingTag.objects.select_related("tag")
+            .filter(post_count__gte=TrendingTagDao.MIN_POSTS)
+            .order_by("-score")[:limit]
         )
-        return [{"name": t.name, "count": t.post_count} for t in tags]
+        return [{"name": t.tag.name, "count": t.post_count} for t in trending]
 
     def create_post(post_data: CreatePostData) -> Post:
         post = Post.objects.create(
@@ -51,8 +151,7 @@ class PostDao:
             anonymous=post_data.anonymous,
         )
 
-        tag_objects = PostDao._create_tag_objects(post_data.tags)
-        post.tags.set(tag_objects)
+        post.tags.set(PostDao._resolve_tag_ids(post_data.tags))
 
         return post
 
@@ -69,13 +168,40 @@ class PostDao:
         if post_data.pinned is not None:
             post.pinned = post_data.pinned
 
-        tag_objects = PostDao._create_tag_objects(post_data.tags)
-        post.tags.set(tag_objects)
+        post.tags.set(PostDao._resolve_tag_ids(post_data.tags))
 
         post.save()
 
         return post
 
+    def toggle_like(post_id: int, user_id: int) -> tuple[bool, int]:
+        """Like or unlike a post without loading its likers or saving the model.
+
+        The through-table row decides the outcome and ``likes`` moves with an
+        F() update, so concurrent toggles cannot lose counts and no
+        HistoricalPost row is written. Returns (liked, likes).
+        """
+        Like = Post.liked_by.through
+        with transaction.atomic():
+            removed, _ = Like.objects.filter(post_id=post_id, user_id=user_id).delete()
+            if removed:
+                liked, delta = False, -1
+            else:
+                try:
+                    with transaction.atomic():
+                        Like.objects.create(post_id=post_id, user_id=user_id)
+                    liked, delta = True, 1
+                except IntegrityError:
+                    # A concurrent request from the same user already liked it
+                    liked, delta = True, 0
+            if delta:
+                Post.objects.filter(id=post_id).update(likes=F("likes") + delta)
+            likes = Post.objects.values_list("likes", flat=True).get(id=post_id)
+        if delta:
+            # Neither the through row nor update() sends a model signal
+            cache_facade.bump_generation(PostDao.FEED_CACHE_NAMESPACE)
+        return liked, likes
+
     def delete_post(post_id):
         try:
             post = Post.objects.get(id=post_id)
@@ -83,21 +209,82 @@ class PostDao:
         except Post.DoesNotExist:
             raise ValueError(f"Post with ID {post_id} does not exist.")
 
-    def _create_tag_objects(tags: list[str]) -> list[Tag]:
-        """Convert tag strings to Tag objects, normalizing and deduplicating."""
-        tag_objects = []
-        if tags is not None:
-            seen = set()
-            for tag_name in tags[:5]:  # hard cap at 5
-                clean = re.sub(r"[^a-z0-9-]", "", tag_name.strip().lower())
-                if len(clean) < 2 or len(clean) > 20:
-                    continue
-                if clean in seen:
-                    continue
-                seen.add(clean)
-                tag_obj, _ = Tag.objects.get_or_create(name=clean)
-                tag_objects.append(tag_obj)
-        return tag_objects
+    def _resolve_tag_ids(tags: list[str]) -> list[int]:
+        """Normalize and deduplicate tag strings, creating missing tags in bulk."""
+        if tags is None:
+            return []
+        names = []
+        for tag_name in tags[:5]:  # hard cap at 5
+            clean = re.sub(r"[^a-z0-9-]", "", tag_name.strip().lower())
+            if len(clean) < 2 or len(clean) > 20:
+                continue
+            names.append(clean)
+        return TagDao.resolve_tag_ids(names)
+
+
+class TrendingTagDao:
+    """Maintains the TrendingTag table.
+
+    A tag scores the sum of its posts from the last WINDOW, each weighted by
+    0.5 ** (age / HALF_LIFE), so fresh activity outranks a burst last week.
+    """
+
+    WINDOW = timedelta(days=7)
+    HALF_LIFE = timedelta(days=2)
+    MIN_POSTS = 2
+
+    @staticmethod
+    def refresh_tags(tag_ids: typing.Iterable[int]) -> None:
+        """Recompute the trending rows for the given tags only."""
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return
+        TrendingTagDao._store_scores(tag_ids)
+
+    @staticmethod
+    def rebuild() -> int:
+        """Recompute every trending row. Returns the number of trending tags."""
+        return TrendingTagDao._store_scores(None)
+
+    @staticmethod
+    def _store_scores(tag_ids: set[int] | None) -> int:
+        now = timezone.now()
+        tagged_posts = Post.tags.through.objects.filter(
+            post__created_at__gte=now - TrendingTagDao.WINDOW
+        )
+        if tag_ids is not None:
+            tagged_posts = tagged_posts.filter(tag_id__in=tag_ids)
+
+        counts = defaultdict(int)
+        scores = defaultdict(float)
+        for tag_id, created_at in tagged_posts.values_list(
+            "tag_id", "post__created_at"
+        ):
+            age = max(now - created_at, timedelta(0))
+            counts[tag_id] += 1
+            scores[tag_id] += 0.5 ** (age / TrendingTagDao.HALF_LIFE)
+
+        stale = TrendingTag.objects.exclude(tag_id__in=counts.keys())
+        if tag_ids is not None:
+            stale = stale.filter(tag_id__in=tag_ids)
+
+        with transaction.atomic():
+            stale.delete()
+            TrendingTag.objects.bulk_create(
+                [
+                    TrendingTag(
+                        tag_id=tag_id,
+                        post_count=counts[tag_id],
+                        score=scores[tag_id],
+                        refreshed_at=now,
+                    )
+                    for tag_id in counts
+                ],
+                update_conflicts=True,
+                unique_fields=["tag"],
+                update_fields=["post_count", "score", "refreshed_at"],
+            )
+        return len(counts)
 
 
 class CommentDao:
@@ -106,16 +293,27 @@ class CommentDao:
         return Comment.objects.get(id=id)
 
     def create_comment(create_comment_data: CreateCommentData) -> None:
-        comment = Comment.objects.create(
-            user_id=create_comment_data.user_id,
-            post_id=create_comment_data.post_id,
-            content=create_comment_data.content,
-            created_at=create_comment_data.created_at,
-            anonymous=create_comment_data.anonymous,
-        )
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                user_id=create_comment_data.user_id,
+                post_id=create_comment_data.post_id,
+                content=create_comment_data.content,
+                created_at=create_comment_data.created_at,
+                anonymous=create_comment_data.anonymous,
+            )
+            Post.objects.filter(id=create_comment_data.post_id).update(
+                comment_count=F("comment_count") + 1
+            )
 
         return comment
 
+    def delete_comment(id: int) -> None:
+        # The post_delete signal decrements comment_count
+        Comment.objects.get(id=id).delete()
+
+    def decrement_count(post_id: int) -> None:
+        Post.objects.filter(id=post_id).update(comment_count=F("comment_count") - 1)
+
     def update_comment(id: int, update_content_data: UpdateCommentData) -> Comment:
         try:
             comment = Comment.objects.get(id=id)
@@ -163,14 +361,31 @@ class ReactionDao:
 
     @staticmethod
     def create_reaction(reaction_data: ToggleReactionData) -> Reaction:
-        """Create a new reaction."""
-        return Reaction.objects.create(
-            post_id=reaction_data.post_id,
-            user_id=reaction_data.user_id,
-            reaction_type=reaction_data.reaction_type,
-        )
+        """Create a new reaction and bump the post's counter for its type."""
+        with transaction.atomic():
+            reaction = Reaction.objects.create(
+                post_id=reaction_data.post_id,
+                user_id=reaction_data.user_id,
+                reaction_type=reaction_data.reaction_type,
+            )
+            ReactionDao._adjust_count(reaction.post_id, reaction.reaction_type, delta=1)
+        return reaction
 
     @staticmethod
     def delete_reaction(reaction: Reaction) -> None:
-        """Delete a reaction."""
+        """Delete a reaction; the post_delete signal decrements its counter."""
         reaction.delete()
+
+    @staticmethod
+    def decrement_count(post_id: int, reaction_type: str) -> None:
+        # Never creates a counter: the post may be being deleted with it
+        PostReactionCount.objects.filter(
+            post_id=post_id, reaction_type=reaction_type
+        ).update(count=F("count") - 1)
+
+    @staticmethod
+    def _adjust_count(post_id: int, reaction_type: str, delta: int) -> None:
+        counter, _ = PostReactionCount.objects.get_or_create(
+            post_id=post_id, reaction_type=reaction_type
+        )
+        PostReactionCount.objects.filter(id=counter.id).update(count=F("count") + delta)
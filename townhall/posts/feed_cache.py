@@ -0,0 +1,114 @@
+import copy
+
+from core.cache.cache_facade import cache_facade
+from users.serializers import UserMiniSerializer
+
+from .daos import PostDao
+from .serializers import (
+    CommentUserMiniSerializer,
+    PostFeedSerializer,
+    PostSerializer,
+)
+from .services import PostServices
+
+
+class PostFeedCache:
+    """
+    Read-through cache of rendered feed pages.
+
+    Pages are rendered once for an anonymous viewer and cached under the
+    post_feed generation, which posts/signals.py (and PostDao.toggle_like)
+    bump on every change to posts, comments, reactions, likes or post tags.
+    personalize() then splices the viewer-dependent fields into the shared
+    page.
+    """
+
+    TIMEOUT = 60
+
+    @staticmethod
+    def get_page(
+        limit: int,
+        tag_names: list[str] | None,
+        compact: bool,
+        page: int = 1,
+        cursor: str | None = None,
+    ) -> dict:
+        """Return {"posts", "total_pages"}, or {"posts", "next_cursor"} when
+        cursor is not None."""
+        params = {
+            "limit": limit,
+            "tags": ",".join(tag_names or []),
+            "compact": compact,
+        }
+        if cursor is not None:
+            params["cursor"] = cursor
+        else:
+            params["page"] = page
+
+        def render():
+            if cursor is not None:
+                posts, next_cursor = PostServices.get_posts_by_cursor(
+                    cursor or None, limit, tag_names, compact
+                )
+                extra = {"next_cursor": next_cursor}
+            else:
+                posts, total_pages = PostServices.get_all_posts(
+                    page, limit, tag_names, compact
+                )
+                extra = {"total_pages": total_pages}
+            return {"posts": PostFeedCache._render_shared(posts, compact), **extra}
+
+        return cache_facade.get_versioned(
+            PostDao.FEED_CACHE_NAMESPACE, params, render, PostFeedCache.TIMEOUT
+        )
+
+    @staticmethod
+    def personalize(posts: list[dict], viewer_id: int | None, compact: bool):
+        """
+        Return a copy of a shared page with the fields that depend on the
+        viewer filled in. The cached page itself is never modified.
+        """
+        posts = copy.deepcopy(posts)
+        for item in posts:
+            PostFeedCache._reveal_to_owner(item, viewer_id)
+            for comment in item.get("comments", []):
+                PostFeedCache._reveal_to_owner(comment, viewer_id)
+
+        if compact and viewer_id is not None and posts:
+            liked, reactions = PostServices.get_viewer_state(
+                viewer_id, [item["id"] for item in posts]
+            )
+            for item in posts:
+                item["liked"] = item["id"] in liked
+                item["my_reactions"] = reactions.get(item["id"], [])
+        return posts
+
+    @staticmethod
+    def _render_shared(posts, compact: bool) -> list[dict]:
+        serializer_class = PostFeedSerializer if compact else PostSerializer
+        data = list(serializer_class(posts, many=True, context={}).data)
+
+        # Anonymous authors are hidden from everyone but themselves, so keep
+        # their profile aside for personalize() to reveal to the owner
+        for post, item in zip(posts, data):
+            if post.anonymous and post.user_id:
+                item["_owner_id"] = post.user_id
+                item["_owner"] = dict(UserMiniSerializer(post.user).data)
+            if compact:
+                continue
+            comments = {comment.id: comment for comment in post.comment_set.all()}
+            for comment_item in item["comments"]:
+                comment = comments[comment_item["id"]]
+                if comment.anonymous and comment.user_id:
+                    comment_item["_owner_id"] = comment.user_id
+                    comment_item["_owner"] = dict(
+                        CommentUserMiniSerializer(comment.user).data
+                    )
+        return data
+
+    @staticmethod
+    def _reveal_to_owner(item: dict, viewer_id: int | None) -> None:
+        owner_id = item.pop("_owner_id", None)
+        owner = item.pop("_owner", None)
+        if owner_id is not None and owner_id == viewer_id:
+            item["user"] = owner
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from posts.daos import TrendingTagDao
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the trending tag table from posts in the recency window. "
+        "Run periodically (e.g. hourly) so scores decay and old posts age out, "
+        "either from cron or as a long-running process with --interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running, rebuilding every this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = TrendingTagDao.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} trending tags."))
+            if options["interval"] <= 0:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
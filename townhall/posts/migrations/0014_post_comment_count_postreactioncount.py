@@ -0,0 +1,102 @@
+# Generated by Django 5.2 on 2026-10-17 22:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    """Seed the new counters from the existing comment and reaction rows."""
+    Post = apps.get_model("posts", "Post")
+    Comment = apps.get_model("posts", "Comment")
+    Reaction = apps.get_model("posts", "Reaction")
+    PostReactionCount = apps.get_model("posts", "PostReactionCount")
+
+    comment_counts = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .values("post")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    Post.objects.update(comment_count=Coalesce(Subquery(comment_counts), 0))
+
+    PostReactionCount.objects.bulk_create(
+        [
+            PostReactionCount(
+                post_id=row["post_id"],
+                reaction_type=row["reaction_type"],
+                count=row["n"],
+            )
+            for row in Reaction.objects.values("post_id", "reaction_type").annotate(
+                n=Count("id")
+            )
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0013_post_anonymous"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="historicalpost",
+            name="comment_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="PostReactionCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reaction_type",
+                    models.CharField(
+                        choices=[
+                            ("love", "Love"),
+                            ("appreciate", "Appreciate"),
+                            ("respect", "Respect"),
+                            ("support", "Support"),
+                            ("inspired", "Inspired"),
+                            ("helpful", "Helpful"),
+                            ("celebrate", "Celebrate"),
+                            ("laugh", "Laugh"),
+                            ("fire", "Fire"),
+                            ("clap", "Clap"),
+                            ("grateful", "Grateful"),
+                            ("mindblown", "Mind Blown"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reaction_counts",
+                        to="posts.post",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("post", "reaction_type")},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
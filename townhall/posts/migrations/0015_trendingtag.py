@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-17 22:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0014_post_comment_count_postreactioncount"),
+        ("users", "0019_historicaluser_bluesky_url_user_bluesky_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("post_count", models.IntegerField(default=0)),
+                ("score", models.FloatField(db_index=True, default=0)),
+                (
+                    "refreshed_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "tag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trending",
+                        to="users.tag",
+                    ),
+                ),
+            ],
+        ),
+    ]
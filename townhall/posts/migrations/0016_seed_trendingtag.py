@@ -0,0 +1,49 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+# TrendingTagDao.WINDOW and HALF_LIFE when the table was introduced
+WINDOW = timedelta(days=7)
+HALF_LIFE = timedelta(days=2)
+
+
+def seed_trending_tags(apps, schema_editor):
+    """Score the tags of recent posts, as TrendingTagDao.rebuild() does."""
+    Post = apps.get_model("posts", "Post")
+    TrendingTag = apps.get_model("posts", "TrendingTag")
+
+    now = timezone.now()
+    counts = defaultdict(int)
+    scores = defaultdict(float)
+    for tag_id, created_at in Post.tags.through.objects.filter(
+        post__created_at__gte=now - WINDOW
+    ).values_list("tag_id", "post__created_at"):
+        age = max(now - created_at, timedelta(0))
+        counts[tag_id] += 1
+        scores[tag_id] += 0.5 ** (age / HALF_LIFE)
+
+    TrendingTag.objects.all().delete()
+    TrendingTag.objects.bulk_create(
+        [
+            TrendingTag(
+                tag_id=tag_id,
+                post_count=counts[tag_id],
+                score=scores[tag_id],
+                refreshed_at=now,
+            )
+            for tag_id in counts
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0015_trendingtag"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_trending_tags, migrations.RunPython.noop),
+    ]
@@ -17,6 +17,7 @@ class Post(models.Model):
     pinned = models.BooleanField(default=False)
     tags = models.ManyToManyField(Tag, blank=True, related_name="posts")
     anonymous = models.BooleanField(default=False)
+    comment_count = models.IntegerField(default=0)
 
     def __str__(self):
         return str(self.id)
@@ -75,3 +76,35 @@ class Reaction(models.Model):
         return (
             f"{self.user.full_name} - {self.reaction_type} on Post " f"{self.post.id}"
         )
+
+
+class PostReactionCount(models.Model):
+    """Number of reactions of one type on a post, maintained on write."""
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="reaction_counts"
+    )
+    reaction_type = models.CharField(max_length=20, choices=Reaction.Reaction_Choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ["post", "reaction_type"]
+
+    def __str__(self):
+        return f"{self.reaction_type} x{self.count} on Post {self.post_id}"
+
+
+class TrendingTag(models.Model):
+    """Materialized trending score for a tag over its recent posts.
+
+    Refreshed per tag whenever posts are tagged or untagged and rebuilt in
+    full by the ``rebuild_trending_tags`` management command.
+    """
+
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, related_name="trending")
+    post_count = models.IntegerField(default=0)
+    score = models.FloatField(default=0, db_index=True)
+    refreshed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.tag_id} ({self.score:.2f})"
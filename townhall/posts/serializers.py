@@ -106,7 +106,9 @@ class PostSerializer(serializers.ModelSerializer):
 
     def get_reactions(self, obj):
         reactions_by_type = {}
-        for reaction in obj.reactions.select_related("user").all():
+        # .all() reads the prefetched reactions; filtering or select_related
+        # here would bypass PostDao.feed_queryset and query once per post.
+        for reaction in obj.reactions.all():
             if reaction.reaction_type not in reactions_by_type:
                 reactions_by_type[reaction.reaction_type] = []
             reactions_by_type[reaction.reaction_type].append(
@@ -137,6 +139,54 @@ class PostSerializer(serializers.ModelSerializer):
         return censor_text(obj.content)
 
 
+class PostFeedSerializer(PostSerializer):
+    """Compact feed entry: counters instead of full comment and user lists.
+
+    Expects posts from PostDao.compact_feed_queryset. The viewer's own likes
+    and reactions come from the "liked_post_ids" and "viewer_reactions"
+    context entries (see PostServices.get_viewer_state).
+    """
+
+    comments = None
+    liked_by = None
+    reactions = None
+
+    reaction_counts = serializers.SerializerMethodField()
+    liked = serializers.SerializerMethodField()
+    my_reactions = serializers.SerializerMethodField()
+
+    class Meta(PostSerializer.Meta):
+        fields = [
+            "id",
+            "user",
+            "content",
+            "created_at",
+            "image",
+            "likes",
+            "liked",
+            "comment_count",
+            "reaction_counts",
+            "my_reactions",
+            "pinned",
+            "tags",
+            "anonymous",
+        ]
+        read_only_fields = fields
+
+    def get_reaction_counts(self, obj):
+        return {
+            counter.reaction_type: counter.count
+            for counter in obj.reaction_counts.all()
+            if counter.count > 0
+        }
+
+    def get_liked(self, obj):
+        return obj.id in self.context.get("liked_post_ids", ())
+
+    def get_my_reactions(self, obj):
+        return self.context.get("viewer_reactions", {}).get(obj.id, [])
+
+
 class ReportedPostSerializer(serializers.ModelSerializer):
     user = UserMiniSerializer(read_only=True)
 
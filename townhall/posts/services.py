@@ -1,3 +1,8 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
 from django.core.exceptions import PermissionDenied
 from django.db import IntegrityError
 from django.forms import ValidationError
@@ -31,18 +36,67 @@ class PostServices:
 
     @staticmethod
     def get_all_posts(
-        page: int = 1, limit: int = 10, tag_names: list[str] | None = None
+        page: int = 1,
+        limit: int = 10,
+        tag_names: list[str] | None = None,
+        compact: bool = False,
     ) -> tuple[typing.List[Post], int]:
         """Return a paginated list of posts for a given page and limit.
-        Also returns total number of pages based on limit."""
+        Also returns total number of pages based on limit.
+
+        With compact=True the posts are loaded for PostFeedSerializer."""
         page = max(1, page)
         limit = max(1, min(limit, 100))
         offset = (page - 1) * limit
 
-        posts, total_count = PostDao.get_all_posts(offset, limit, tag_names)
+        posts, total_count = PostDao.get_all_posts(offset, limit, tag_names, compact)
         total_pages = (total_count + limit - 1) // limit
         return posts, total_pages
 
+    @staticmethod
+    def get_posts_by_cursor(
+        cursor: str | None = None,
+        limit: int = 10,
+        tag_names: list[str] | None = None,
+        compact: bool = False,
+    ) -> tuple[typing.List[Post], str | None]:
+        """Return a page of posts following an opaque cursor.
+
+        Unlike get_all_posts this never counts the whole feed, and pages stay
+        stable when new posts are created while a client is scrolling.
+        next_cursor is None once the last page has been reached."""
+        limit = max(1, min(limit, 100))
+        position = PostServices._decode_cursor(cursor) if cursor else None
+
+        # Fetch one extra row to learn whether another page exists
+        posts = PostDao.get_posts_after_cursor(position, limit + 1, tag_names, compact)
+        if len(posts) <= limit:
+            return posts, None
+
+        posts = posts[:limit]
+        return posts, PostServices._encode_cursor(posts[-1])
+
+    @staticmethod
+    def get_viewer_state(
+        viewer_id: int, post_ids: list[int]
+    ) -> tuple[set[int], dict[int, list[str]]]:
+        """Return (liked post ids, reaction types by post id) for a viewer."""
+        return PostDao.get_viewer_state(viewer_id, post_ids)
+
+    @staticmethod
+    def _encode_cursor(post: Post) -> str:
+        raw = json.dumps([post.pinned, post.created_at.isoformat(), post.id])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[bool, datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode())
+            pinned, created_at, post_id = json.loads(raw)
+            return bool(pinned), datetime.fromisoformat(created_at), int(post_id)
+        except (binascii.Error, UnicodeError, TypeError, ValueError):
+            raise ValidationError("Invalid cursor.")
+
     @staticmethod
     def get_trending_tags(limit: int = 10) -> list[dict]:
         return PostDao.get_trending_tags(limit)
@@ -75,6 +129,11 @@ class PostServices:
 
         return post
 
+    @staticmethod
+    def toggle_like(post_id: int, user_id: int) -> tuple[bool, int]:
+        """Toggle user_id's like on a post. Returns (liked, likes)."""
+        return PostDao.toggle_like(post_id, user_id)
+
     @staticmethod
     def delete_post(post_id: int) -> None:
         try:
@@ -135,6 +194,13 @@ class CommentServices:
     def update_comment(id: int, update_comment_data: UpdateCommentData) -> Comment:
         return CommentDao.update_comment(id, update_comment_data)
 
+    @staticmethod
+    def delete_comment(id: int) -> None:
+        try:
+            CommentDao.delete_comment(id)
+        except Comment.DoesNotExist:
+            raise ValidationError(f"Comment with ID {id} does not exist.")
+
 
 class ReportedPostServices:
     @staticmethod
@@ -174,12 +240,15 @@ class ReportedPostServices:
 
 
 class ReactionServices:
+    @staticmethod
+    def get_post_reactions(post_id: int) -> Post:
+        """Post with only its author and reactions; raises Post.DoesNotExist."""
+        return PostDao.get_post_reactions(id=post_id)
+
     @staticmethod
     def toggle_reaction(reaction_data: ToggleReactionData) -> typing.Tuple[bool, str]:
         # Validate that the post exists
-        try:
-            PostDao.get_post(id=reaction_data.post_id)
-        except Post.DoesNotExist:
+        if not Post.objects.filter(id=reaction_data.post_id).exists():
             raise ValidationError(
                 f"Post with id {reaction_data.post_id} does not exist."
             )
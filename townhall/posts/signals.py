@@ -0,0 +1,61 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.cache.cache_facade import cache_facade
+from .daos import CommentDao, PostDao, ReactionDao, TrendingTagDao
+from .models import Comment, Post, Reaction
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_trending_on_tag_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep TrendingTag current whenever a post gains or loses tags."""
+    if action == "pre_clear":
+        # The cleared ids are gone by post_clear, so remember them now
+        if reverse:
+            instance._trending_tag_ids = {instance.id}
+        else:
+            instance._trending_tag_ids = set(instance.tags.values_list("id", flat=True))
+    elif action == "post_clear":
+        TrendingTagDao.refresh_tags(getattr(instance, "_trending_tag_ids", ()))
+    elif action in ("post_add", "post_remove"):
+        TrendingTagDao.refresh_tags({instance.id} if reverse else pk_set)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post_tags(sender, instance, **kwargs):
+    instance._trending_tag_ids = set(instance.tags.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def refresh_trending_on_post_delete(sender, instance, **kwargs):
+    TrendingTagDao.refresh_tags(getattr(instance, "_trending_tag_ids", ()))
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """
+    Keep Post.comment_count in step with every comment deletion, including
+    cascades from a deleted user and queryset deletes.
+    """
+    if instance.post_id is not None:
+        CommentDao.decrement_count(instance.post_id)
+
+
+@receiver(post_delete, sender=Reaction)
+def decrement_reaction_count(sender, instance, **kwargs):
+    """Same as decrement_comment_count, for PostReactionCount."""
+    ReactionDao.decrement_count(instance.post_id, instance.reaction_type)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Reaction)
+@receiver(post_delete, sender=Reaction)
+@receiver(m2m_changed, sender=Post.liked_by.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_feed(sender, action="post_save", **kwargs):
+    """Any change to what a feed page renders retires every cached page."""
+    if action.startswith("post_"):
+        cache_facade.bump_generation(PostDao.FEED_CACHE_NAMESPACE)
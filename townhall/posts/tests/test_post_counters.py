@@ -0,0 +1,150 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from posts.models import Post, PostReactionCount
+from posts.services import CommentServices, ReactionServices
+from posts.types import CreateCommentData, ToggleReactionData
+from users.models import User
+
+# Running only this specific test file:
+# python3 manage.py test posts.tests.test_post_counters
+
+
+class TestPostCounters(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(email="author@example.com")
+        self.reader = User.objects.create(email="reader@example.com")
+        self.post = Post.objects.create(user=self.author, content="Counted post")
+        self.client = APIClient()
+
+    def _toggle(self, user, reaction_type):
+        return ReactionServices.toggle_reaction(
+            ToggleReactionData(
+                user_id=user.id, post_id=self.post.id, reaction_type=reaction_type
+            )
+        )
+
+    def _comment(self, user):
+        return CommentServices.create_comment(
+            CreateCommentData(
+                user_id=user.id,
+                post_id=self.post.id,
+                content="Hello",
+                created_at=timezone.now(),
+            )
+        )
+
+    def _reaction_count(self, reaction_type):
+        return PostReactionCount.objects.get(
+            post=self.post, reaction_type=reaction_type
+        ).count
+
+    def test_toggle_reaction_maintains_per_type_counts(self):
+        # Act
+        self._toggle(self.author, "love")
+        self._toggle(self.reader, "love")
+        self._toggle(self.reader, "fire")
+
+        # Assert
+        self.assertEqual(self._reaction_count("love"), 2)
+        self.assertEqual(self._reaction_count("fire"), 1)
+
+        # Act - toggling again removes the reaction
+        self._toggle(self.reader, "love")
+
+        # Assert
+        self.assertEqual(self._reaction_count("love"), 1)
+
+    def test_comment_create_and_delete_maintain_comment_count(self):
+        # Act
+        first = self._comment(self.author)
+        self._comment(self.reader)
+
+        # Assert
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+
+        # Act
+        CommentServices.delete_comment(first.id)
+
+        # Assert
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_comment_delete_endpoint_decrements_count(self):
+        # Arrange
+        comment = self._comment(self.reader)
+        self.client.force_authenticate(user=self.reader)
+
+        # Act
+        response = self.client.delete(f"/comment/{comment.id}/")
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_cascade_deletes_decrement_counters(self):
+        # Arrange
+        self._comment(self.author)
+        self._comment(self.reader)
+        self._toggle(self.author, "love")
+        self._toggle(self.reader, "love")
+
+        # Act - the reader's comment and reaction go with their account
+        self.reader.delete()
+
+        # Assert
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self._reaction_count("love"), 1)
+
+    def test_deleting_a_post_with_comments_and_reactions(self):
+        # Arrange
+        self._comment(self.reader)
+        self._toggle(self.reader, "love")
+
+        # Act
+        self.post.delete()
+
+        # Assert
+        self.assertFalse(PostReactionCount.objects.exists())
+
+    def test_compact_feed_returns_counts_and_viewer_state(self):
+        # Arrange
+        self._toggle(self.author, "love")
+        self._toggle(self.reader, "love")
+        self._comment(self.author)
+        self.client.force_authenticate(user=self.reader)
+
+        # Act
+        response = self.client.get("/post/?compact=1")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        post = response.data["posts"][0]
+        self.assertEqual(post["reaction_counts"], {"love": 2})
+        self.assertEqual(post["my_reactions"], ["love"])
+        self.assertEqual(post["comment_count"], 1)
+        self.assertFalse(post["liked"])
+        self.assertNotIn("comments", post)
+        self.assertNotIn("liked_by", post)
+        self.assertNotIn("reactions", post)
+
+    def test_compact_feed_query_count_is_constant(self):
+        # Arrange - posts + authors, tags, counters, viewer reactions, likes
+        self.client.force_authenticate(user=self.reader)
+        with self.assertNumQueries(5):
+            self.client.get("/post/?compact=1&cursor=")
+
+        for i in range(5):
+            post = Post.objects.create(user=self.author, content=f"Post {i}")
+            post.liked_by.add(self.reader)
+
+        # Act / Assert
+        with self.assertNumQueries(5):
+            response = self.client.get("/post/?compact=1&cursor=")
+        self.assertTrue(all(p["liked"] for p in response.data["posts"][:5]))
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.forms import ValidationError
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from posts.services import PostServices
+from users.models import User
+
+
+class TestPostCursorPagination(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("loaddata", "fixtures/user_fixture.json", verbosity=0)
+        call_command("loaddata", "fixtures/post_fixture.json", verbosity=0)
+        self.client = APIClient()
+
+    def _walk_feed(self, limit):
+        ids = []
+        cursor = None
+        # More pages than the feed can fill means the cursor never ends
+        for _ in range(Post.objects.count() // limit + 2):
+            posts, cursor = PostServices.get_posts_by_cursor(cursor, limit)
+            ids.extend(post.id for post in posts)
+            if cursor is None:
+                return ids
+        self.fail("Cursor pagination did not reach the end of the feed")
+
+    def test_cursor_pages_cover_feed_in_order(self):
+        # Arrange
+        expected_ids = list(
+            Post.objects.order_by("-pinned", "-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+        # Act
+        ids = self._walk_feed(limit=3)
+
+        # Assert
+        self.assertEqual(ids, expected_ids)
+
+    def test_cursor_last_page_has_no_next_cursor(self):
+        # Act
+        posts, next_cursor = PostServices.get_posts_by_cursor(None, limit=1000)
+
+        # Assert
+        self.assertEqual(len(posts), Post.objects.count())
+        self.assertIsNone(next_cursor)
+
+    def test_cursor_pages_skip_count_query(self):
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            PostServices.get_posts_by_cursor(None, limit=5)
+
+        # Assert
+        self.assertFalse(
+            any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+        )
+
+    def test_cursor_stable_when_new_post_is_inserted(self):
+        # Arrange
+        first_page, cursor = PostServices.get_posts_by_cursor(None, limit=5)
+        Post.objects.create(
+            user=User.objects.first(),
+            content="Brand new post",
+            created_at=timezone.now() + timedelta(days=1),
+        )
+
+        # Act
+        second_page, _ = PostServices.get_posts_by_cursor(cursor, limit=5)
+
+        # Assert
+        first_ids = {post.id for post in first_page}
+        self.assertTrue(first_ids.isdisjoint(post.id for post in second_page))
+        self.assertTrue(first_page[-1].created_at >= second_page[0].created_at)
+
+    def test_cursor_breaks_created_at_ties_by_id(self):
+        # Arrange
+        Post.objects.all().delete()
+        same_time = timezone.now()
+        user = User.objects.first()
+        for i in range(5):
+            Post.objects.create(user=user, content=f"Tie {i}", created_at=same_time)
+        expected_ids = list(Post.objects.order_by("-id").values_list("id", flat=True))
+
+        # Act
+        ids = self._walk_feed(limit=2)
+
+        # Assert
+        self.assertEqual(ids, expected_ids)
+
+    def test_invalid_cursor_raises_validation_error(self):
+        with self.assertRaises(ValidationError):
+            PostServices.get_posts_by_cursor("not-a-cursor", limit=5)
+
+    def test_cursor_endpoint_returns_next_cursor(self):
+        # Act
+        response = self.client.get("/post/?cursor=&limit=5")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["posts"]), 5)
+        self.assertIsNotNone(response.data["next_cursor"])
+        self.assertNotIn("total_pages", response.data)
+
+        next_response = self.client.get(
+            "/post/", {"cursor": response.data["next_cursor"], "limit": 5}
+        )
+        self.assertEqual(next_response.status_code, 200)
+        self.assertNotEqual(
+            response.data["posts"][0]["id"], next_response.data["posts"][0]["id"]
+        )
+
+    def test_cursor_endpoint_rejects_invalid_cursor(self):
+        # Act
+        response = self.client.get("/post/?cursor=garbage")
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,181 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.cache.cache_facade import cache_facade
+from core.cache.lru import LRUCache
+from core.cache.tiered import LocalInvalidationBus, TieredCache
+from posts.feed_cache import PostFeedCache
+from posts.models import Post
+from posts.services import CommentServices, PostServices, ReactionServices
+from posts.types import CreateCommentData, ToggleReactionData
+from users.models import User
+
+# Running only this specific test file:
+# python3 manage.py test posts.tests.test_post_feed_cache
+
+
+class TestPostFeedCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(email="author@example.com", full_name="A")
+        self.reader = User.objects.create(email="reader@example.com", full_name="R")
+        self.post = Post.objects.create(user=self.author, content="Cached post")
+        self.client = APIClient()
+
+    def _feed(self, query="/post/"):
+        return self.client.get(query).data["posts"]
+
+    def test_repeat_request_is_served_from_cache(self):
+        # Arrange
+        self._feed()
+
+        # Act / Assert
+        with self.assertNumQueries(0):
+            posts = self._feed()
+        self.assertEqual(posts[0]["id"], self.post.id)
+
+    def test_cache_is_keyed_by_page_parameters(self):
+        # Arrange
+        Post.objects.create(user=self.author, content="Second post")
+        self._feed("/post/?limit=1")
+
+        # Act
+        posts = self._feed("/post/?limit=2")
+
+        # Assert
+        self.assertEqual(len(posts), 2)
+
+    def test_new_post_invalidates_feed(self):
+        # Arrange
+        self._feed()
+
+        # Act
+        Post.objects.create(user=self.author, content="Fresh post")
+
+        # Assert
+        self.assertEqual(self._feed()[0]["content"], "Fresh post")
+
+    def test_like_invalidates_feed(self):
+        # Arrange
+        self._feed()
+
+        # Act
+        PostServices.toggle_like(self.post.id, self.reader.id)
+
+        # Assert
+        self.assertEqual(self._feed()[0]["likes"], 1)
+
+    def test_comment_and_reaction_invalidate_feed(self):
+        # Arrange
+        self._feed()
+
+        # Act
+        CommentServices.create_comment(
+            CreateCommentData(
+                user_id=self.reader.id,
+                post_id=self.post.id,
+                content="Hi",
+                created_at=timezone.now(),
+            )
+        )
+        ReactionServices.toggle_reaction(
+            ToggleReactionData(
+                user_id=self.reader.id, post_id=self.post.id, reaction_type="love"
+            )
+        )
+
+        # Assert
+        post = self._feed()[0]
+        self.assertEqual(len(post["comments"]), 1)
+        self.assertEqual(list(post["reactions"]), ["love"])
+
+    def test_anonymous_post_revealed_only_to_owner(self):
+        # Arrange
+        self.post.anonymous = True
+        self.post.save()
+        self.client.force_authenticate(user=self.reader)
+        reader_view = self._feed()[0]
+
+        # Act - same cached page, different viewer
+        self.client.force_authenticate(user=self.author)
+        owner_view = self._feed()[0]
+
+        # Assert
+        self.assertIsNone(reader_view["user"])
+        self.assertEqual(owner_view["user"]["id"], self.author.id)
+        self.assertNotIn("_owner", owner_view)
+        self.assertNotIn("_owner_id", reader_view)
+
+    def test_owner_view_does_not_leak_through_the_local_tier(self):
+        # Arrange - objects in the in-process tier are shared by reference
+        tiered = TieredCache(cache, LRUCache(16, ttl=60), LocalInvalidationBus())
+        self.post.anonymous = True
+        self.post.save()
+
+        with patch.object(cache_facade, "cache", tiered), patch.object(
+            cache_facade, "serializer", None
+        ):
+            # Act - the owner renders the page first
+            self.client.force_authenticate(user=self.author)
+            owner_view = self._feed()[0]
+            self.client.force_authenticate(user=self.reader)
+            reader_view = self._feed()[0]
+            self.client.force_authenticate(user=self.author)
+            owner_again = self._feed()[0]
+
+        # Assert
+        self.assertEqual(owner_view["user"]["id"], self.author.id)
+        self.assertIsNone(reader_view["user"])
+        self.assertEqual(owner_again["user"]["id"], self.author.id)
+
+    def test_personalize_leaves_shared_page_untouched(self):
+        # Arrange
+        page = [{"id": 1, "user": None, "_owner_id": 7, "_owner": {"id": 7}}]
+
+        # Act
+        owner_page = PostFeedCache.personalize(page, 7, compact=False)
+
+        # Assert
+        self.assertEqual(owner_page[0]["user"], {"id": 7})
+        self.assertEqual(
+            page, [{"id": 1, "user": None, "_owner_id": 7, "_owner": {"id": 7}}]
+        )
+
+    def test_anonymous_comment_revealed_only_to_owner(self):
+        # Arrange
+        CommentServices.create_comment(
+            CreateCommentData(
+                user_id=self.reader.id,
+                post_id=self.post.id,
+                content="Secret",
+                created_at=timezone.now(),
+                anonymous=True,
+            )
+        )
+
+        # Act
+        anonymous_view = self._feed()[0]["comments"][0]
+        self.client.force_authenticate(user=self.reader)
+        owner_view = self._feed()[0]["comments"][0]
+
+        # Assert
+        self.assertIsNone(anonymous_view["user"])
+        self.assertEqual(owner_view["user"]["id"], self.reader.id)
+
+    def test_compact_feed_splices_viewer_state(self):
+        # Arrange
+        PostServices.toggle_like(self.post.id, self.reader.id)
+        self._feed("/post/?compact=1")
+
+        # Act
+        self.client.force_authenticate(user=self.reader)
+        with self.assertNumQueries(2):
+            post = self._feed("/post/?compact=1")[0]
+
+        # Assert
+        self.assertTrue(post["liked"])
+        self.assertEqual(post["my_reactions"], [])
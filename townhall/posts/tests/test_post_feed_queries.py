@@ -0,0 +1,77 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from posts.models import Comment, Post, Reaction
+from posts.serializers import PostSerializer
+from posts.services import PostServices
+from users.models import User
+
+
+class TestPostFeedQueries(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(email=f"user{i}@example.com", full_name=f"User {i}")
+            for i in range(3)
+        ]
+        self.request = APIRequestFactory().get("/post/")
+        self.request.user = self.users[0]
+
+    def _create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(user=self.users[i % 3], content=f"Post {i}")
+            for user in self.users:
+                Comment.objects.create(user=user, post=post, content="Nice")
+                Reaction.objects.create(post=post, user=user, reaction_type="love")
+                post.liked_by.add(user)
+            Comment.objects.create(
+                user=self.users[1], post=post, content="Hidden", anonymous=True
+            )
+
+    def _render_feed_page(self, limit):
+        with CaptureQueriesContext(connection) as ctx:
+            posts, _ = PostServices.get_all_posts(page=1, limit=limit)
+            data = PostSerializer(
+                posts, many=True, context={"request": self.request}
+            ).data
+        return data, len(ctx.captured_queries)
+
+    def test_feed_query_count_is_constant(self):
+        # Arrange
+        self._create_posts(2)
+        _, small_page_queries = self._render_feed_page(limit=2)
+        self._create_posts(8)
+
+        # Act
+        data, large_page_queries = self._render_feed_page(limit=10)
+
+        # Assert
+        self.assertEqual(len(data), 10)
+        self.assertEqual(small_page_queries, large_page_queries)
+
+    def test_feed_page_uses_one_query_per_relation(self):
+        # Arrange
+        self._create_posts(5)
+
+        # Act - count, posts + authors, tags, likers, comments, reactions
+        with self.assertNumQueries(6):
+            posts, _ = PostServices.get_all_posts(page=1, limit=5)
+            data = PostSerializer(
+                posts, many=True, context={"request": self.request}
+            ).data
+
+        # Assert
+        self.assertEqual(len(data[0]["comments"]), 4)
+        self.assertEqual(len(data[0]["reactions"]["love"]), 3)
+        self.assertEqual(len(data[0]["liked_by"]), 3)
+
+    def test_single_post_reads_from_prefetch_cache(self):
+        # Arrange
+        self._create_posts(1)
+        post_id = Post.objects.get().id
+
+        # Act
+        with self.assertNumQueries(5):
+            post = PostServices.get_post(id=post_id)
+            PostSerializer(post, context={"request": self.request}).data
@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from posts.services import PostServices
+from users.models import User
+
+# Running only this specific test file:
+# python3 manage.py test posts.tests.test_post_likes
+
+
+class TestPostLikes(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(email="author@example.com")
+        self.reader = User.objects.create(email="reader@example.com")
+        self.post = Post.objects.create(user=self.author, content="Like me")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.reader)
+        self.url = f"/post/{self.post.id}/like/"
+
+    def test_like_then_unlike(self):
+        # Act
+        liked = self.client.patch(self.url)
+        unliked = self.client.patch(self.url)
+
+        # Assert
+        self.assertEqual(liked.status_code, 200)
+        self.assertEqual(liked.data, {"message": "Post liked", "likes": 1})
+        self.assertEqual(unliked.data, {"message": "Post unliked", "likes": 0})
+        self.assertFalse(self.post.liked_by.exists())
+
+    def test_like_does_not_write_history(self):
+        # Arrange
+        history_rows = self.post.history.count()
+
+        # Act
+        PostServices.toggle_like(self.post.id, self.reader.id)
+
+        # Assert
+        self.assertEqual(self.post.history.count(), history_rows)
+
+    def test_like_does_not_load_likers(self):
+        # Arrange
+        for i in range(20):
+            user = User.objects.create(email=f"fan{i}@example.com")
+            PostServices.toggle_like(self.post.id, user.id)
+
+        # Act / Assert - remove, re-add, increment and read back the count
+        with self.assertNumQueries(8):
+            PostServices.toggle_like(self.post.id, self.reader.id)
+
+    def test_like_missing_post_returns_404(self):
+        # Act
+        response = self.client.patch("/post/9999/like/")
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+
+
+class TestConcurrentPostLikes(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create(email="author@example.com")
+        self.post = Post.objects.create(user=self.author, content="Popular post")
+        self.fans = [
+            User.objects.create(email=f"fan{i}@example.com") for i in range(20)
+        ]
+
+    def _like(self, user_id, attempts=50):
+        try:
+            for _ in range(attempts):
+                try:
+                    return PostServices.toggle_like(self.post.id, user_id)
+                except OperationalError:
+                    # SQLite allows one writer at a time; retry when locked
+                    time.sleep(0.01)
+            self.fail(f"Like by user {user_id} still locked after {attempts} tries")
+        finally:
+            connection.close()
+
+    def test_parallel_likes_are_counted_exactly(self):
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(self._like, [fan.id for fan in self.fans]))
+
+        # Assert
+        self.post.refresh_from_db()
+        self.assertTrue(all(liked for liked, _ in results))
+        self.assertEqual(self.post.likes, len(self.fans))
+        self.assertEqual(self.post.liked_by.count(), len(self.fans))
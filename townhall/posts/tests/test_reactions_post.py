@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 from rest_framework.test import APITestCase
 from rest_framework import status
 
 from posts.models import Post, Reaction
+from posts.services import ReactionServices
 from users.models import User
 
 
@@ -83,3 +86,25 @@ class ReactionTests(APITestCase):
 
         response = self.client.patch(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_toggle_returns_updated_reactions(self):
+        """The response lists every reaction on the post, grouped by type"""
+        Reaction.objects.create(post=self.post, user=self.user2, reaction_type="fire")
+        url = f"/post/{self.post.id}/reaction/"
+
+        with patch("notifications.services.fan_out"):
+            response = self.client.patch(url, {"reaction_type": "love"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data["reactions"]), ["fire", "love"])
+
+    def test_post_deleted_mid_toggle_returns_404(self):
+        """A post deleted before the reactions are read is a 404"""
+        url = f"/post/{self.post.id}/reaction/"
+
+        with patch.object(
+            ReactionServices, "get_post_reactions", side_effect=Post.DoesNotExist
+        ):
+            response = self.client.patch(url, {"reaction_type": "love"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
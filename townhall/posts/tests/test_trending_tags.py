@@ -0,0 +1,132 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from posts.models import Post, TrendingTag
+from posts.services import PostServices
+from users.models import Tag, User
+
+# Running only this specific test file:
+# python3 manage.py test posts.tests.test_trending_tags
+
+
+class TestTrendingTags(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="poster@example.com")
+        self.client = APIClient()
+
+    def _post(self, tags, age=timedelta(0)):
+        post = Post.objects.create(
+            user=self.user, content="Tagged", created_at=timezone.now() - age
+        )
+        post.tags.set([Tag.objects.get_or_create(name=name)[0] for name in tags])
+        return post
+
+    def test_tagging_posts_updates_trending_incrementally(self):
+        # Arrange
+        self._post(["garden", "food"])
+        self._post(["garden"])
+
+        # Act
+        tags = PostServices.get_trending_tags()
+
+        # Assert
+        self.assertEqual(tags, [{"name": "garden", "count": 2}])
+
+    def test_untagging_post_updates_trending(self):
+        # Arrange
+        first = self._post(["garden"])
+        self._post(["garden"])
+
+        # Act
+        first.tags.clear()
+
+        # Assert
+        self.assertEqual(PostServices.get_trending_tags(), [])
+        self.assertEqual(TrendingTag.objects.get(tag__name="garden").post_count, 1)
+
+    def test_deleting_post_updates_trending(self):
+        # Arrange
+        first = self._post(["garden"])
+        self._post(["garden"])
+
+        # Act
+        first.delete()
+
+        # Assert
+        self.assertEqual(TrendingTag.objects.get(tag__name="garden").post_count, 1)
+
+    def test_posts_outside_window_are_ignored(self):
+        # Arrange
+        self._post(["archive"], age=timedelta(days=30))
+        self._post(["archive"], age=timedelta(days=30))
+
+        # Act
+        tags = PostServices.get_trending_tags()
+
+        # Assert
+        self.assertEqual(tags, [])
+        self.assertFalse(TrendingTag.objects.filter(tag__name="archive").exists())
+
+    def test_recent_activity_outranks_older_activity(self):
+        # Arrange - "old" has more posts, but they are days older
+        for _ in range(3):
+            self._post(["old"], age=timedelta(days=6))
+        for _ in range(2):
+            self._post(["fresh"])
+
+        # Act
+        names = [t["name"] for t in PostServices.get_trending_tags()]
+
+        # Assert
+        self.assertEqual(names, ["fresh", "old"])
+
+    def test_rebuild_command_ages_out_posts(self):
+        # Arrange
+        self._post(["garden"])
+        self._post(["garden"])
+        Post.objects.update(created_at=timezone.now() - timedelta(days=30))
+
+        # Act
+        out = StringIO()
+        call_command("rebuild_trending_tags", stdout=out)
+
+        # Assert
+        self.assertIn("Rebuilt 0 trending tags", out.getvalue())
+        self.assertFalse(TrendingTag.objects.exists())
+
+    def test_migration_seeds_trending_from_existing_posts(self):
+        # Arrange - posts tagged before the table was maintained
+        self._post(["garden"])
+        self._post(["garden"])
+        TrendingTag.objects.all().delete()
+        migration = import_module("posts.migrations.0016_seed_trendingtag")
+
+        # Act
+        migration.seed_trending_tags(apps, None)
+
+        # Assert
+        self.assertEqual(
+            PostServices.get_trending_tags(), [{"name": "garden", "count": 2}]
+        )
+
+    def test_trending_endpoint_reads_materialized_rows(self):
+        # Arrange
+        for i in range(5):
+            self._post([f"tag{i}", "shared"])
+            self._post([f"tag{i}"])
+
+        # Act
+        with self.assertNumQueries(1):
+            response = self.client.get("/post/tags/trending/?limit=3")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["tags"]), 3)
+        self.assertEqual(response.data["tags"][0], {"name": "shared", "count": 5})
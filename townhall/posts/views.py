@@ -31,6 +31,7 @@ from .services import (
     ReactionServices,
 )
 from .types import ToggleReactionData
+from .feed_cache import PostFeedCache
 
 logger = logging.getLogger(__name__)
 
@@ -70,19 +71,51 @@ class PostViewSet(viewsets.ModelViewSet):
                 if tags_param
                 else None
             )
+            # Compact mode: counters and the viewer's own reactions only
+            compact = request.query_params.get("compact", "").lower() in (
+                "1",
+                "true",
+            )
+            viewer_id = request.user.id if request.user.is_authenticated else None
 
-            posts, total_pages = PostServices.get_all_posts(page, limit, tag_names)
-            serializer = PostSerializer(posts, context={"request": request}, many=True)
+            # Cursor mode: "?cursor=" (empty) requests the first page
+            if "cursor" in request.query_params:
+                feed_page = PostFeedCache.get_page(
+                    limit,
+                    tag_names,
+                    compact,
+                    cursor=request.query_params.get("cursor"),
+                )
+                return Response(
+                    {
+                        "message": "Posts fetched successfully",
+                        "posts": PostFeedCache.personalize(
+                            feed_page["posts"], viewer_id, compact
+                        ),
+                        "limit": limit,
+                        "next_cursor": feed_page["next_cursor"],
+                    },
+                    status=status.HTTP_200_OK,
+                )
+
+            feed_page = PostFeedCache.get_page(limit, tag_names, compact, page=page)
             return Response(
                 {
                     "message": "Posts fetched successfully",
-                    "posts": serializer.data,
+                    "posts": PostFeedCache.personalize(
+                        feed_page["posts"], viewer_id, compact
+                    ),
                     "page": page,
                     "limit": limit,
-                    "total_pages": total_pages,
+                    "total_pages": feed_page["total_pages"],
                 },
                 status=status.HTTP_200_OK,
             )
+        except ValidationError as e:
+            return Response(
+                {"error": e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -257,21 +290,15 @@ class PostViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            post = Post.objects.get(pk=pk)
+            post = Post.objects.only("id", "user_id").get(pk=pk)
 
-            if request.user in post.liked_by.all():
-                post.liked_by.remove(request.user)
-                post.likes -= 1
-                post.save()
+            liked, likes = PostServices.toggle_like(post.id, request.user.id)
+            if not liked:
                 return Response(
-                    {"message": "Post unliked", "likes": post.likes},
+                    {"message": "Post unliked", "likes": likes},
                     status=status.HTTP_200_OK,
                 )
             else:
-                post.liked_by.add(request.user)
-                post.likes += 1
-                post.save()
-
                 try:
                     from notifications.services import NotificationServices
                     from notifications.types import CreateNotificationData
@@ -288,7 +315,7 @@ class PostViewSet(viewsets.ModelViewSet):
                     pass
 
                 return Response(
-                    {"message": "Post liked", "likes": post.likes},
+                    {"message": "Post liked", "likes": likes},
                     status=status.HTTP_200_OK,
                 )
 
@@ -379,8 +406,9 @@ class PostViewSet(viewsets.ModelViewSet):
             # Delegate business logic to service layer
             was_added, message = ReactionServices.toggle_reaction(reaction_data)
 
-            # Get updated post with reactions
-            post = Post.objects.get(pk=pk)
+            # Only the author and reactions are needed; a post deleted in
+            # the meantime raises Post.DoesNotExist (404)
+            post = ReactionServices.get_post_reactions(post_id=int(pk))
 
             if was_added:
                 try:
@@ -399,12 +427,12 @@ class PostViewSet(viewsets.ModelViewSet):
                 except Exception:
                     pass
 
-            serializer = PostSerializer(post, context={"request": request})
+            serializer = PostSerializer(context={"request": request})
 
             return Response(
                 {
                     "message": message,
-                    "reactions": serializer.data["reactions"],
+                    "reactions": serializer.get_reactions(post),
                 },
                 status=status.HTTP_200_OK,
             )
@@ -582,7 +610,7 @@ class CommentViewSet(viewsets.ModelViewSet):
             )
 
         # Authorized – delete it
-        comment.delete()
+        CommentServices.delete_comment(comment.id)
         return Response(
             {"message": "Comment deleted"},
             status=status.HTTP_204_NO_CONTENT,
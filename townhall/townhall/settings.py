@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 import dj_database_url
 import cloudinary
@@ -366,6 +367,67 @@ else:
         },
     }
 
+# Shared Redis cache when REDIS_URL is set. Tests (and setups without Redis)
+# use a per-process local-memory cache so they never touch a real instance.
+REDIS_URL = os.environ.get("REDIS_URL")
+# `manage.py test` or pytest (pytest-django imports settings under pytest)
+TESTING = (len(sys.argv) > 1 and sys.argv[1] == "test") or "pytest" in sys.modules
+
+if REDIS_URL and not TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+    }
+    # Value encoding used by core.cache.CacheFacade: pickle, json or msgpack,
+    # zlib-compressed from COMPRESS_THRESHOLD bytes (see
+    # `manage.py benchmark_cache_serializers` for the trade-offs)
+    CACHE_SERIALIZER = {
+        "FORMAT": os.getenv("CACHE_SERIALIZER", "pickle"),
+        "COMPRESS_THRESHOLD": 1024,
+    }
+    # In-process LRU tier in front of the shared cache (core.cache.tiered)
+    CACHE_LOCAL_TIER = {
+        "MAXSIZE": 2048,
+        "TTL": 5,
+        "REDIS_URL": REDIS_URL,
+    }
+    # Background jobs (core.jobs), consumed by `manage.py run_jobs`
+    JOB_QUEUE = {
+        "BACKEND": "redis",
+        "REDIS_URL": REDIS_URL,
+        "QUEUE": "townhall:jobs",
+    }
+    # Online status and typing throttles (chats.presence), kept in Redis only
+    PRESENCE = {
+        "BACKEND": "redis",
+        "REDIS_URL": REDIS_URL,
+        "TTL": 60,
+        "TYPING_INTERVAL": 3,
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+    # Jobs run inline on enqueue (after commit); set WORKERS for a thread pool
+    JOB_QUEUE = {"BACKEND": "local", "WORKERS": 0}
+    # Presence per process; only accurate with a single worker
+    PRESENCE = {"BACKEND": "memory", "TTL": 60, "TYPING_INTERVAL": 3}
+
+# Write-behind batching of group messages (chats.group_writer); opt in with
+# GROUP_MESSAGE_WRITER=true, see `manage.py benchmark_group_writes`
+GROUP_MESSAGE_WRITER = {
+    "ENABLED": not TESTING
+    and os.getenv("GROUP_MESSAGE_WRITER", "False").lower() in ("true", "1", "yes"),
+    "MAX_BATCH": 200,
+    "FLUSH_INTERVAL": 0.005,
+    "MAX_QUEUE": 10000,
+    # Seconds a request waits for its batch before reporting a failure
+    "RESULT_TIMEOUT": 10.0,
+}
 
 # Debug information (only in development)
 if DEBUG:
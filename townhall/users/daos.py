@@ -1,6 +1,7 @@
 from django.db.models.query import QuerySet
 from django.db import transaction
 import typing
+from core.cache.lru import LRUCache
 from .models import User
 from .models import Tag, Report
 from .types import CreateUserData, CreateReportData
@@ -112,3 +113,44 @@ class ReportDao:
     @staticmethod
     def get_report(id: int) -> typing.Optional[Report]:
         return Report.objects.get(id=id)
+
+
+class TagDao:
+    # name -> id for hot tags, filled only from committed rows so a rolled
+    # back insert can never leave a dangling id behind
+    _id_cache = LRUCache(maxsize=1024)
+
+    @staticmethod
+    def resolve_tag_ids(
+        names: typing.List[str], create: bool = True
+    ) -> typing.List[int]:
+        """
+        Map tag names to ids in input order, skipping duplicates.
+
+        Costs at most three queries however many names are given: one lookup,
+        one bulk insert of the missing names (when create is True) and one
+        re-select of what was inserted. Unknown names are dropped when create
+        is False.
+        """
+        names = list(dict.fromkeys(names))
+        ids = TagDao._id_cache.get_many(names)
+
+        missing = [name for name in names if name not in ids]
+        if missing:
+            found = dict(Tag.objects.filter(name__in=missing).values_list("name", "id"))
+            missing = [name for name in missing if name not in found]
+            if create and missing:
+                Tag.objects.bulk_create(
+                    [Tag(name=name) for name in missing], ignore_conflicts=True
+                )
+                found.update(
+                    Tag.objects.filter(name__in=missing).values_list("name", "id")
+                )
+            ids.update(found)
+            transaction.on_commit(lambda: TagDao._id_cache.set_many(found))
+
+        return [ids[name] for name in names if name in ids]
+
+    @staticmethod
+    def clear_id_cache() -> None:
+        TagDao._id_cache.clear()
@@ -0,0 +1,81 @@
+import threading
+import typing
+
+from core.cache.lru import LRUCache
+from core.cache.tiered import build_invalidation_bus
+
+from .models import User
+
+
+class SenderProfileCache:
+    """
+    Process-wide cache of the profile fields chat broadcasts carry.
+
+    Websocket consumers load the profiles they expect on connect, then read
+    them with get(), which never touches the database, so broadcasting a
+    message costs no query or thread hop. Entries expire after ttl seconds;
+    UserServices.update_user invalidates them sooner, in every worker when
+    the invalidation bus runs over Redis.
+    """
+
+    CHANNEL = "users.profile.invalidate"
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300, bus=None):
+        self._profiles = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._bus = bus
+        self._bus_lock = threading.Lock()
+        if bus is not None:
+            bus.subscribe(self._on_invalidate)
+
+    def get(self, user_id: int) -> typing.Optional[dict]:
+        """Cached profile of a user, or None; never queries."""
+        return self._profiles.get_many([int(user_id)]).get(int(user_id))
+
+    def load(self, user_ids: typing.Iterable[int]) -> typing.Dict[int, dict]:
+        """Profiles of user_ids, fetching the uncached ones in one query."""
+        self._get_bus()
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        profiles = self._profiles.get_many(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in profiles]
+        if missing:
+            fetched = {
+                user.id: self._profile(user)
+                for user in User.objects.filter(id__in=missing).only(
+                    "id", "full_name", "primary_organization", "profile_image"
+                )
+            }
+            self._profiles.set_many(fetched)
+            profiles.update(fetched)
+        return profiles
+
+    def invalidate(self, user_id: int) -> None:
+        self._profiles.delete_many([int(user_id)])
+        self._get_bus().publish([int(user_id)])
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+    def _get_bus(self):
+        # Built on first use so importing this module never opens a connection
+        with self._bus_lock:
+            if self._bus is None:
+                self._bus = build_invalidation_bus(self.CHANNEL)
+                self._bus.subscribe(self._on_invalidate)
+        return self._bus
+
+    def _on_invalidate(self, user_ids) -> None:
+        if user_ids is None:
+            self._profiles.clear()
+        else:
+            self._profiles.delete_many(user_ids)
+
+    @staticmethod
+    def _profile(user: User) -> dict:
+        return {
+            "full_name": user.full_name,
+            "organization": user.primary_organization,
+            "profile_image": user.profile_image.url if user.profile_image else None,
+        }
+
+
+sender_profiles = SenderProfileCache()
@@ -3,6 +3,7 @@ from django.forms import ValidationError
 from django.core.validators import EmailValidator
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from django.db.models.query import QuerySet
 import typing
 from .models import User, Report, Tag
@@ -12,7 +13,8 @@ from .types import (
     FilterUserData,
     CreateReportData,
 )
-from .daos import UserDao, ReportDao
+from .daos import UserDao, ReportDao, TagDao
+from .profile_cache import sender_profiles
 
 
 logger = logging.getLogger(__name__)
@@ -162,13 +164,23 @@ class UserServices:
             user.allow_dms = update_user_data.allow_dms
 
         if update_user_data.tags is not None:
-            tags = Tag.objects.filter(name__in=update_user_data.tags)
-            user.tags.set(tags)
+            # Profiles may only pick existing tags, never create new ones
+            user.tags.set(TagDao.resolve_tag_ids(update_user_data.tags, create=False))
 
         if update_user_data.is_verified is not None:
             user.is_verified = update_user_data.is_verified
 
         user.save()
+        if any(
+            value is not None
+            for value in (
+                update_user_data.full_name,
+                update_user_data.primary_organization,
+                update_user_data.profile_image,
+            )
+        ):
+            # Chat broadcasts carry these fields from the sender profile cache
+            transaction.on_commit(lambda: sender_profiles.invalidate(user.id))
         return user
 
     def delete_user(id: int) -> None:
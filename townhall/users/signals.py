@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .daos import TagDao
+from .models import Tag
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def clear_tag_id_cache(sender, **kwargs):
+    """Renamed or deleted tags would leave stale name -> id entries."""
+    TagDao.clear_id_cache()
@@ -0,0 +1,70 @@
+from django.test import TestCase
+
+from users.daos import TagDao
+from users.models import Tag
+
+
+class ResolveTagIdsTests(TestCase):
+    def setUp(self):
+        TagDao.clear_id_cache()
+        self.existing = Tag.objects.create(name="python")
+        TagDao.clear_id_cache()
+
+    def tearDown(self):
+        TagDao.clear_id_cache()
+
+    def test_resolves_in_order_and_creates_missing(self):
+        # Act
+        with self.assertNumQueries(3):
+            ids = TagDao.resolve_tag_ids(["django", "python", "django", "react"])
+
+        # Assert
+        names = dict(Tag.objects.values_list("id", "name"))
+        self.assertEqual([names[i] for i in ids], ["django", "python", "react"])
+
+    def test_bulk_created_tags_skip_history(self):
+        # Act
+        TagDao.resolve_tag_ids(["django", "react"])
+
+        # Assert
+        self.assertFalse(Tag.history.filter(name__in=["django", "react"]).exists())
+
+    def test_existing_tags_need_one_query(self):
+        # Act / Assert
+        with self.assertNumQueries(1):
+            ids = TagDao.resolve_tag_ids(["python"])
+        self.assertEqual(ids, [self.existing.id])
+
+    def test_committed_tags_are_served_from_lru(self):
+        # Arrange
+        with self.captureOnCommitCallbacks(execute=True):
+            TagDao.resolve_tag_ids(["python", "django"])
+
+        # Act / Assert
+        with self.assertNumQueries(0):
+            ids = TagDao.resolve_tag_ids(["django", "python"])
+        self.assertEqual(
+            ids,
+            list(Tag.objects.filter(name="django").values_list("id", flat=True))
+            + [self.existing.id],
+        )
+
+    def test_renaming_tag_clears_lru(self):
+        # Arrange
+        with self.captureOnCommitCallbacks(execute=True):
+            TagDao.resolve_tag_ids(["python"])
+
+        # Act
+        self.existing.name = "python3"
+        self.existing.save()
+
+        # Assert
+        self.assertEqual(TagDao.resolve_tag_ids(["python"], create=False), [])
+
+    def test_create_false_drops_unknown_names(self):
+        # Act
+        ids = TagDao.resolve_tag_ids(["python", "unknown"], create=False)
+
+        # Assert
+        self.assertEqual(ids, [self.existing.id])
+        self.assertFalse(Tag.objects.filter(name="unknown").exists())
@@ -0,0 +1,87 @@
+from django.test import TestCase
+
+from users.models import User
+from users.profile_cache import SenderProfileCache, sender_profiles
+from users.services import UserServices
+from users.types import UpdateUserData
+
+# Running only this specific test file:
+#   python3 manage.py test users.tests.test_sender_profile_cache
+
+
+class SenderProfileCacheTests(TestCase):
+    def setUp(self):
+        self.cache = SenderProfileCache()
+        self.users = [
+            User.objects.create(
+                email=f"member{i}@example.com",
+                full_name=f"Member {i}",
+                primary_organization="Food bank",
+            )
+            for i in range(3)
+        ]
+
+    def test_load_fetches_missing_profiles_in_one_query(self):
+        # Arrange
+        ids = [user.id for user in self.users]
+        self.cache.load(ids[:1])
+
+        # Act / Assert
+        with self.assertNumQueries(1):
+            profiles = self.cache.load(ids)
+        with self.assertNumQueries(0):
+            self.cache.load(ids)
+        self.assertEqual(
+            profiles[ids[2]],
+            {
+                "full_name": "Member 2",
+                "organization": "Food bank",
+                "profile_image": None,
+            },
+        )
+
+    def test_get_never_queries(self):
+        # Arrange
+        self.cache.load([self.users[0].id])
+
+        # Act / Assert
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.get(self.users[0].id)["full_name"], "Member 0")
+            self.assertIsNone(self.cache.get(self.users[1].id))
+
+    def test_entries_expire(self):
+        # Arrange
+        cache = SenderProfileCache(ttl=0)
+
+        # Act
+        cache.load([self.users[0].id])
+
+        # Assert
+        self.assertIsNone(cache.get(self.users[0].id))
+
+    def test_update_user_invalidates_profile_on_commit(self):
+        # Arrange
+        user = self.users[0]
+        sender_profiles.load([user.id])
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            UserServices.update_user(UpdateUserData(id=user.id, full_name="Renamed"))
+
+        # Assert
+        self.assertIsNone(sender_profiles.get(user.id))
+        self.assertEqual(
+            sender_profiles.load([user.id])[user.id]["full_name"], "Renamed"
+        )
+
+    def test_unrelated_update_keeps_profile(self):
+        # Arrange
+        user = self.users[1]
+        sender_profiles.load([user.id])
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            UserServices.update_user(UpdateUserData(id=user.id, receive_emails=False))
+
+        # Assert
+        self.assertIsNotNone(sender_profiles.get(user.id))